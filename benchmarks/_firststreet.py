@@ -0,0 +1,62 @@
+"""Import the integration's modules without importing Home Assistant.
+
+The package `__init__` pulls in Home Assistant, which benchmarks don't need.
+Registering a bare package module lets the submodules (and their relative
+imports) load on their own.
+"""
+import importlib
+import os
+import sys
+import types
+
+PACKAGE_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "custom_components",
+    "firststreet",
+)
+
+
+def load(module: str):
+    """Import `firststreet.<module>` from the source tree."""
+    if "firststreet" not in sys.modules:
+        package = types.ModuleType("firststreet")
+        package.__path__ = [PACKAGE_DIR]
+        sys.modules["firststreet"] = package
+    return importlib.import_module(f"firststreet.{module}")
+
+
+GEOGRAPHIES = ("state", "city", "county", "neighborhood", "zcta")
+
+
+def synthetic_property(fsid: int, buildings: int = 2, seed: int = 0, geographies: int = 0) -> dict:
+    """
+    Build a property document with every field `PROPERTY_BY_FSID_QUERY` selects.
+
+    The fields come from the query's selection (see
+    `test_support.sample_document`), so the key names and nesting match
+    what the client asks for; the values, list lengths and so the size are
+    made up. `geographies` keeps the state, city, county, neighborhood and
+    zcta blocks, with a county boundary of that many vertices (real ones
+    run to tens of thousands); without it they are left out.
+    """
+    import copy
+    import random
+
+    queries = load("property_queries")
+    rng = random.Random(seed * 1_000_003 + fsid)
+    document = load("test_support").sample_document(queries.PROPERTY_BY_FSID_QUERY, seed=rng.getrandbits(32))
+    document["fsid"] = fsid
+    template = document["buildingConnection"]["edges"][0]
+    edges = [copy.deepcopy(template) for _ in range(buildings)]
+    for building_id, edge in enumerate(edges, start=1):
+        edge["node"]["buildingId"] = building_id
+    document["buildingConnection"] = {"totalCount": buildings, "edges": edges}
+    document["buildingConnectionTotalCount"] = {"totalCount": buildings}
+    if not geographies:
+        for key in GEOGRAPHIES:
+            del document[key]
+        return document
+    lon, lat = document["geometry"]["center"]["coordinates"]
+    boundary = [[lon + rng.uniform(-0.5, 0.5), lat + rng.uniform(-0.5, 0.5)] for _ in range(geographies)]
+    document["county"]["geometry"]["polygon"]["coordinates"] = [boundary]
+    return document
@@ -0,0 +1,117 @@
+"""A cleartext HTTP/2 (h2c, prior knowledge) stand-in for the FirstStreet API."""
+import asyncio
+import gzip
+import json
+import threading
+
+from h2.config import H2Configuration
+from h2.connection import H2Connection
+from h2.events import ConnectionTerminated, DataReceived, RequestReceived, StreamEnded, StreamReset, WindowUpdated
+from h2.exceptions import StreamClosedError
+from h2.settings import SettingCodes
+
+from _stub_server import StubStats
+
+
+class _Protocol(asyncio.Protocol):
+    def __init__(self, stub: "H2StubServer"):
+        self.stub = stub
+        self.conn = H2Connection(config=H2Configuration(client_side=False, header_encoding="utf-8"))
+        self.transport = None
+        self.requests = {}
+        self.pending = {}
+
+    def connection_made(self, transport):
+        with self.stub.stats.lock:
+            self.stub.stats.connections += 1
+        self.transport = transport
+        self.conn.initiate_connection()
+        # Let many concurrent streams upload full query bodies without waiting
+        # for WINDOW_UPDATEs, as production servers do
+        self.conn.update_settings({SettingCodes.INITIAL_WINDOW_SIZE: 2**24})
+        self.conn.increment_flow_control_window(2**30)
+        self.transport.write(self.conn.data_to_send())
+
+    def data_received(self, data):
+        for event in self.conn.receive_data(data):
+            if isinstance(event, RequestReceived):
+                self.requests[event.stream_id] = (dict(event.headers), bytearray())
+            elif isinstance(event, DataReceived):
+                self.requests[event.stream_id][1].extend(event.data)
+                self.conn.acknowledge_received_data(event.flow_controlled_length, event.stream_id)
+            elif isinstance(event, StreamEnded):
+                headers, body = self.requests.pop(event.stream_id)
+                asyncio.get_running_loop().call_later(self.stub.latency, self.respond, event.stream_id, headers, bytes(body))
+            elif isinstance(event, WindowUpdated):
+                self.flush()
+            elif isinstance(event, StreamReset):
+                self.pending.pop(event.stream_id, None)
+            elif isinstance(event, ConnectionTerminated):
+                self.transport.close()
+        self.transport.write(self.conn.data_to_send())
+
+    def respond(self, stream_id, headers, raw):
+        if headers.get("content-encoding") == "gzip":
+            raw = gzip.decompress(raw)
+        json.loads(raw)
+        gzipped = "gzip" in headers.get("accept-encoding", "")
+        body = self.stub.gzip_body if gzipped else self.stub.body
+        response_headers = [(":status", "200"), ("content-type", "application/json"), ("content-length", str(len(body)))]
+        if gzipped:
+            response_headers.append(("content-encoding", "gzip"))
+        try:
+            self.conn.send_headers(stream_id, response_headers)
+        except StreamClosedError:
+            return
+        self.pending[stream_id] = memoryview(body)
+        with self.stub.stats.lock:
+            self.stub.stats.requests += 1
+            self.stub.stats.bytes_in += len(raw) if not headers.get("content-encoding") else int(headers.get("content-length", 0))
+            self.stub.stats.bytes_out += len(body)
+        self.flush()
+
+    def flush(self):
+        # Send as much of each pending body as the flow-control windows allow
+        for stream_id in list(self.pending):
+            body = self.pending[stream_id]
+            window = min(self.conn.local_flow_control_window(stream_id), self.conn.max_outbound_frame_size)
+            while body and window > 0:
+                chunk, body = body[:window], body[window:]
+                self.conn.send_data(stream_id, chunk.tobytes())
+                window = min(self.conn.local_flow_control_window(stream_id), self.conn.max_outbound_frame_size)
+            if body:
+                self.pending[stream_id] = body
+            else:
+                self.conn.end_stream(stream_id)
+                del self.pending[stream_id]
+        self.transport.write(self.conn.data_to_send())
+
+
+class H2StubServer:
+    """Serve one canned GraphQL response over h2c on localhost, `latency` seconds late."""
+
+    def __init__(self, document: dict, latency: float = 0.0):
+        self.stats = StubStats()
+        self.latency = latency
+        self.body = json.dumps({"data": {"property": document}}).encode("utf-8")
+        self.gzip_body = gzip.compress(self.body, 6, mtime=0)
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._server = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.sockets[0].getsockname()[:2]
+        return f"http://{host}:{port}/"
+
+    def __enter__(self):
+        self._thread.start()
+        self._server = asyncio.run_coroutine_threadsafe(
+            self._loop.create_server(lambda: _Protocol(self), "127.0.0.1", 0), self._loop
+        ).result()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._loop.call_soon_threadsafe(self._server.close)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
@@ -0,0 +1,146 @@
+"""A local stand-in for the FirstStreet API endpoint, for transport benchmarks."""
+import gzip
+import json
+import threading
+import time
+import zlib
+from typing import Optional
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubStats:
+    """Bytes and connections seen by the stub server."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.connections = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.throttled = 0
+
+    def reset(self):
+        with self.lock:
+            self.requests = self.connections = self.bytes_in = self.bytes_out = 0
+            self.peak_in_flight = self.throttled = 0
+
+
+def exists_body(variables: dict) -> bytes:
+    """Answer a `PropertiesExist` query as if every property and building exists."""
+    found = {
+        f"p{index}": {"fsid": int(variables[f"fsid{index}"]), "buildingConnection": {"totalCount": 1}}
+        for index in range(len(variables) // 2)
+    }
+    return json.dumps({"data": found}).encode("utf-8")
+
+
+class StubServer:
+    """
+    Serve one canned GraphQL response over HTTP/1.1 keep-alive on localhost.
+
+    Gzip-encoded request bodies are accepted and responses are gzipped when
+    the client asks for it. `latency` seconds are added to every response.
+    `PropertiesExist` batch queries are answered with every property found.
+    With a `capacity`, requests arriving while that many are being served
+    are answered 429 at once, like a rate-limited API. With `outlier_every`,
+    every that many requests takes `outlier_latency` seconds instead, like a
+    slow backend replica or a garbage-collection pause.
+    """
+
+    def __init__(
+        self,
+        document: dict,
+        latency: float = 0.0,
+        capacity: Optional[int] = None,
+        outlier_every: Optional[int] = None,
+        outlier_latency: float = 0.0,
+    ):
+        self.stats = StubStats()
+        self.latency = latency
+        self.capacity = capacity
+        self.outlier_every = outlier_every
+        self.outlier_latency = outlier_latency
+        self._arrivals = 0
+        body = json.dumps({"data": {"property": document}}).encode("utf-8")
+        self.bodies = {"identity": body, "gzip": gzip.compress(body, 6, mtime=0), "deflate": zlib.compress(body, 6)}
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address
+        return f"http://{host}:{port}/"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def setup(self):
+                super().setup()
+                with stub.stats.lock:
+                    stub.stats.connections += 1
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                raw = self.rfile.read(length)
+                if self.headers.get("Content-Encoding") == "gzip":
+                    raw = gzip.decompress(raw)
+                request = json.loads(raw)
+                with stub.stats.lock:
+                    throttle = stub.capacity is not None and stub.stats.in_flight >= stub.capacity
+                    if throttle:
+                        stub.stats.throttled += 1
+                    else:
+                        stub.stats.in_flight += 1
+                        stub.stats.peak_in_flight = max(stub.stats.peak_in_flight, stub.stats.in_flight)
+                    stub._arrivals += 1
+                    outlier = stub.outlier_every is not None and stub._arrivals % stub.outlier_every == 0
+                if throttle:
+                    self.send_response(429)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+
+                accepted = [part.strip() for part in self.headers.get("Accept-Encoding", "").split(",")]
+                encoding = next((name for name in ("gzip", "deflate") if name in accepted), "identity")
+                if request.get("query", "").startswith("query PropertiesExist"):
+                    encoding = "identity"
+                    body = exists_body(request["variables"])
+                else:
+                    body = stub.bodies[encoding]
+                latency = stub.outlier_latency if outlier else stub.latency
+                if latency:
+                    time.sleep(latency)
+
+                # Counted before the response goes out, so a client never sees stale stats
+                with stub.stats.lock:
+                    stub.stats.in_flight -= 1
+                    stub.stats.requests += 1
+                    stub.stats.bytes_in += length
+                    stub.stats.bytes_out += len(body)
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                if encoding != "identity":
+                    self.send_header("Content-Encoding", encoding)
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
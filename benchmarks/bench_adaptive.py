@@ -0,0 +1,45 @@
+"""Compare fixed worker counts with the adaptive concurrency limit on a throttling API.
+
+`fetch_properties` runs against a local stub server that serves
+`capacity` requests at once and answers 429 past that. Fixed rows pin the
+AIMD limiter to one value; 429s are retried the same way in every row.
+Too few workers leave the API idle; too many spend requests on 429s.
+
+Usage: python benchmarks/bench_adaptive.py [properties] [server latency ms] [capacity]
+"""
+import logging
+import sys
+import time
+
+from _firststreet import load, synthetic_property
+from _stub_server import StubServer
+
+firststreet_api = load("firststreet_api")
+concurrency = load("concurrency")
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    latency = float(sys.argv[2]) / 1000 if len(sys.argv) > 2 else 0.05
+    capacity = int(sys.argv[3]) if len(sys.argv) > 3 else 6
+    logging.disable(logging.CRITICAL)  # FirstStreetAPIError logs every 429
+    targets = [(fsid, 0) for fsid in range(count)]
+    print(f"{count} properties, {latency * 1000:.0f} ms server latency, {capacity} served at once")
+    print(f"{'workers':<10}{'seconds':>9}{'429s':>7}{'failed':>8}{'final limit':>13}")
+    limiters = [(str(n), lambda n=n: concurrency.AIMDLimiter(n, n, n)) for n in (2, 4, 16)]
+    limiters.append(("adaptive", lambda: concurrency.AIMDLimiter(initial=1, max_limit=16)))
+    with StubServer(synthetic_property(1), latency, capacity) as server:
+        for name, create in limiters:
+            api = firststreet_api.FirstStreetAPI(base_url=server.url)
+            limiter = create()
+            server.stats.reset()
+            start = time.perf_counter()
+            results = api.fetch_properties(targets, limiter=limiter, retries=20)
+            elapsed = time.perf_counter() - start
+            failed = sum(1 for result in results if result.error is not None)
+            print(f"{name:<10}{elapsed:>9.2f}{server.stats.throttled:>7}{failed:>8}{limiter.limit:>13}")
+            api.session.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Compare re-parsing raw responses kept as individual JSON files vs. in a ResponseArchive.
+
+Usage: python benchmarks/bench_archive.py [documents]
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+
+from _firststreet import load, synthetic_property
+
+archive = load("archive")
+bulk = load("bulk")
+
+
+def timed(label, count, func):
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<34}{elapsed * 1000:>10.1f} ms{count / elapsed:>10.0f} docs/s")
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    distinct = [json.dumps({"data": {"property": synthetic_property(fsid)}}).encode() for fsid in range(256)]
+
+    with tempfile.TemporaryDirectory() as directory:
+        files = []
+        path = os.path.join(directory, "responses.bin")
+        with archive.ResponseArchive(path) as responses:
+            for fsid in range(count):
+                raw = distinct[fsid % len(distinct)]
+                files.append(os.path.join(directory, f"{fsid}.json"))
+                with open(files[-1], "wb") as document:
+                    document.write(raw)
+                responses.append(fsid, 0, raw)
+        print(f"{count} documents, {os.path.getsize(path) / 1024 / 1024:.1f} MB archived")
+
+        def read_files():
+            for name in files:
+                with open(name, "rb") as document:
+                    document.read()
+
+        def read_archive():
+            with archive.ResponseArchive(path) as responses:
+                for _entry, raw in responses:
+                    raw[-1:]
+
+        def parse_files():
+            def documents():
+                for name in files:
+                    with open(name, "rb") as document:
+                        yield document.read()
+            bulk._parse_all(documents(), summary=True)
+
+        def parse_archive():
+            with archive.ResponseArchive(path) as responses:
+                bulk.bulk_parse_archive(responses, workers=1)
+
+        timed("open + read, JSON files", count, read_files)
+        timed("open + read, archive", count, read_archive)
+        with archive.ResponseArchive(path) as responses:
+            start = time.perf_counter()
+            responses.latest(count // 2)
+            print(f"{'latest() on a freshly opened archive':<34}{(time.perf_counter() - start) * 1e6:>10.0f} µs")
+        timed("read + parse, JSON files", count, parse_files)
+        timed("read + parse, archive", count, parse_archive)
+
+
+if __name__ == "__main__":
+    main()
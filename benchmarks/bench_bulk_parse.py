@@ -0,0 +1,41 @@
+"""Measure bulk parsing throughput of raw property documents by worker count.
+
+Usage: python benchmarks/bench_bulk_parse.py [documents] [max workers]
+"""
+import json
+import os
+import pickle
+import sys
+import time
+
+from _firststreet import load, synthetic_property
+
+bulk = load("bulk")
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count() or 1
+    # A few hundred distinct documents, repeated, keep generation time down
+    distinct = [json.dumps({"data": {"property": synthetic_property(fsid)}}).encode() for fsid in range(256)]
+    raw = [distinct[index % len(distinct)] for index in range(count)]
+    print(f"{count} documents, {sum(map(len, distinct)) / len(distinct) / 1024:.1f} KB each, {os.cpu_count()} CPUs")
+
+    summary = bulk.bulk_parse(raw[:1], workers=1)[0]
+    full = bulk.bulk_parse(raw[:1], workers=1, summary=False)[0]
+    print(f"result size: summary {len(pickle.dumps(summary))} B, full {len(pickle.dumps(full))} B pickled")
+
+    print(f"{'workers':>8}{'docs/s':>10}{'speedup':>9}")
+    baseline = None
+    workers = 1
+    while workers <= max_workers:
+        start = time.perf_counter()
+        bulk.bulk_parse(raw, workers=workers)
+        rate = count / (time.perf_counter() - start)
+        baseline = baseline or rate
+        print(f"{workers:>8}{rate:>10.0f}{rate / baseline:>9.2f}")
+        workers *= 2
+
+
+if __name__ == "__main__":
+    main()
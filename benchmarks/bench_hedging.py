@@ -0,0 +1,56 @@
+"""Compare property fetch latency with and without hedged requests on an API with outliers.
+
+Properties are fetched one after another from a local stub server that
+answers in `latency`, except every `outlier_every`-th request, which takes
+`outlier_latency`. With hedging, a request outliving the observed p95 gets
+a duplicate, within a 5% extra-load budget.
+
+Usage: python benchmarks/bench_hedging.py [requests] [latency ms] [outlier ms] [outlier every]
+"""
+import statistics
+import sys
+import time
+
+from _firststreet import load, synthetic_property
+from _stub_server import StubServer
+
+firststreet_api = load("firststreet_api")
+hedging = load("hedging")
+
+
+def percentile(ordered, fraction):
+    return ordered[int(fraction * (len(ordered) - 1))]
+
+
+def run(server, count, hedge_policy):
+    api = firststreet_api.FirstStreetAPI(base_url=server.url, hedge_policy=hedge_policy)
+    api.get_property_data(1)  # warm up the connection and the lazy imports
+    server.stats.reset()
+    latencies = []
+    for fsid in range(count):
+        start = time.perf_counter()
+        api.get_property_data(fsid)
+        latencies.append(time.perf_counter() - start)
+    api.session.close()
+    return sorted(latencies), server.stats.requests
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    latency = float(sys.argv[2]) / 1000 if len(sys.argv) > 2 else 0.01
+    outlier = float(sys.argv[3]) / 1000 if len(sys.argv) > 3 else 0.3
+    every = int(sys.argv[4]) if len(sys.argv) > 4 else 50
+    print(f"{count} requests, {latency * 1000:.0f} ms latency, every {every}th takes {outlier * 1000:.0f} ms")
+    print(f"{'':<10}{'p50 ms':>8}{'p95 ms':>8}{'p99 ms':>8}{'max ms':>8}{'mean ms':>9}{'requests':>10}")
+    with StubServer(synthetic_property(1), latency, outlier_every=every, outlier_latency=outlier) as server:
+        for name, policy in (("plain", None), ("hedged", hedging.HedgePolicy())):
+            latencies, requests = run(server, count, policy)
+            row = [percentile(latencies, p) * 1000 for p in (0.5, 0.95, 0.99)] + [latencies[-1] * 1000]
+            print(f"{name:<10}" + "".join(f"{value:>8.1f}" for value in row)
+                  + f"{statistics.mean(latencies) * 1000:>9.1f}{requests:>10}")
+            if policy is not None:
+                policy.close()
+
+
+if __name__ == "__main__":
+    main()
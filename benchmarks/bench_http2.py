@@ -0,0 +1,64 @@
+"""Compare a bulk refresh over pooled HTTP/1.1 with one multiplexed HTTP/2 connection.
+
+Runs `get_property_data` for many FSIDs from a thread pool through one shared
+client, against local stub servers that add the same per-response latency.
+Needs `httpx[http2]`. Usage:
+
+    python benchmarks/bench_http2.py [fsids] [server latency ms]
+"""
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from _firststreet import load, synthetic_property
+from _h2_stub_server import H2StubServer
+from _stub_server import StubServer
+
+firststreet_api = load("firststreet_api")
+transport = load("transport")
+
+CONCURRENCY = (8, 32, 64)
+
+
+def run(server, config, concurrency, fsids):
+    server.stats.reset()
+    api = firststreet_api.FirstStreetAPI(base_url=server.url, transport=config)
+    api.get_property_data(0)  # warm up outside the timed section
+
+    def fetch(fsid):
+        start = time.perf_counter()
+        api.get_property_data(fsid)
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        latencies = list(pool.map(fetch, range(fsids)))
+    elapsed = time.perf_counter() - start
+    transport.close_shared_sessions()
+    return elapsed, latencies
+
+
+def main():
+    fsids = int(sys.argv[1]) if len(sys.argv) > 1 else 640
+    latency = (float(sys.argv[2]) if len(sys.argv) > 2 else 50.0) / 1000
+    document = synthetic_property(1)
+    print(f"{'transport':<22}{'threads':>8}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'conns':>7}")
+    with StubServer(document, latency) as http1, H2StubServer(document, latency) as http2:
+        for concurrency in CONCURRENCY:
+            scenarios = [
+                ("HTTP/1.1, 16 conns", http1, transport.TransportConfig()),
+                (f"HTTP/1.1, {concurrency} conns", http1, transport.TransportConfig(pool_maxsize=concurrency)),
+                ("HTTP/2, 1 conn", http2, transport.TransportConfig(http2=True, http2_prior_knowledge=True, pool_maxsize=1)),
+            ]
+            for name, server, config in scenarios:
+                elapsed, latencies = run(server, config, concurrency, fsids)
+                p95 = statistics.quantiles(latencies, n=20)[-1]
+                print(
+                    f"{name:<22}{concurrency:>8}{len(latencies) / elapsed:>9.0f}"
+                    f"{statistics.median(latencies) * 1000:>9.2f}{p95 * 1000:>9.2f}{server.stats.connections:>7}"
+                )
+
+
+if __name__ == "__main__":
+    main()
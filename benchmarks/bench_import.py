@@ -0,0 +1,48 @@
+"""Compare checking many properties for a bulk import one full fetch at a time vs. in batches.
+
+The config flow used to validate each property with `get_all_risk_data`, one
+full download per property. `check_properties` sends one small query per
+batch, several batches at once. Both run against a local stub server that
+adds the same latency to every response.
+
+Usage: python benchmarks/bench_import.py [properties] [server latency ms]
+"""
+import sys
+import time
+
+from _firststreet import load, synthetic_property
+from _stub_server import StubServer
+
+firststreet_api = load("firststreet_api")
+
+
+def one_by_one(api, targets):
+    for fsid, building_id in targets:
+        api.get_all_risk_data(fsid, building_id)
+
+
+def batched(api, targets):
+    checks = api.check_properties(targets, batch_size=50, concurrency=4)
+    assert all(check.found for check in checks)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    latency = float(sys.argv[2]) / 1000 if len(sys.argv) > 2 else 0.05
+    targets = [(fsid, 0) for fsid in range(count)]
+    print(f"{count} properties, {latency * 1000:.0f} ms server latency")
+    print(f"{'check':<12}{'seconds':>9}{'requests':>10}{'KB received':>13}")
+    with StubServer(synthetic_property(1), latency) as server:
+        for name, check in (("one by one", one_by_one), ("batched", batched)):
+            api = firststreet_api.FirstStreetAPI(base_url=server.url)
+            server.stats.reset()
+            start = time.perf_counter()
+            check(api, targets)
+            elapsed = time.perf_counter() - start
+            stats = server.stats
+            print(f"{name:<12}{elapsed:>9.2f}{stats.requests:>10}{stats.bytes_out / 1024:>13.0f}")
+            api.session.close()
+
+
+if __name__ == "__main__":
+    main()
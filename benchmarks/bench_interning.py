@@ -0,0 +1,63 @@
+"""Measure the memory a cache of decoded and parsed properties takes with and without interning.
+
+Usage: python benchmarks/bench_interning.py [properties]
+"""
+import gc
+import json
+import sys
+import time
+import tracemalloc
+
+from _firststreet import load, synthetic_property
+
+api_module = load("firststreet_api")
+interning = load("interning")
+
+
+def fill_cache(raw, count):
+    api = api_module.FirstStreetAPI()
+    cache = {}
+    for fsid in range(count):
+        # A fresh decode per property, like responses arriving from the API
+        document = json.loads(raw[fsid % len(raw)])
+        cache[fsid] = (document, api.parse_all_risk_data(document))
+    return cache
+
+
+def measure(raw, count):
+    # Time without tracemalloc, whose hooks slow allocation down
+    gc.collect()
+    start = time.perf_counter()
+    cache = fill_cache(raw, count)
+    elapsed = time.perf_counter() - start
+    del cache
+
+    gc.collect()
+    tracemalloc.start()
+    cache = fill_cache(raw, count)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del cache
+    return size, elapsed
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    raw = [json.dumps(synthetic_property(fsid, buildings=1)) for fsid in range(256)]
+    print(f"{count} properties with one building each")
+
+    interned, interned_time = measure(raw, count)
+    # The baseline skips interning by replacing it in the client module
+    api_module.intern_enumerations = lambda property_data: None
+    plain, plain_time = measure(raw, count)
+    api_module.intern_enumerations = interning.intern_enumerations
+
+    print(f"{'':<12}{'cache MB':>10}{'fill s':>9}")
+    print(f"{'plain':<12}{plain / 1024 / 1024:>10.1f}{plain_time:>9.2f}")
+    print(f"{'interned':<12}{interned / 1024 / 1024:>10.1f}{interned_time:>9.2f}")
+    print(f"saved {(plain - interned) / 1024 / 1024:.1f} MB ({(plain - interned) / plain:.1%}), "
+          f"{(plain - interned) / count:.0f} B per property")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""Compare decoding a property response whole vs. projected onto the fields the parsers read.
+
+Times `json.loads` against `ProjectedDecoder.decode` on the same bytes, and
+traces the memory each decoded document keeps alive and peaks at. A county
+boundary of the given size stands in for the geography subtrees the
+parsers never read. Needs msgspec.
+
+Usage: python benchmarks/bench_projection.py [county boundary vertices] [decodes]
+"""
+import gc
+import json
+import sys
+import time
+import tracemalloc
+
+from _firststreet import load, synthetic_property
+
+projection = load("projection")
+
+
+def measure(decode, raw, decodes):
+    decode(raw)
+    start = time.perf_counter()
+    for _ in range(decodes):
+        decode(raw)
+    elapsed = (time.perf_counter() - start) / decodes
+
+    gc.collect()
+    tracemalloc.start()
+    document = decode(raw)
+    kept, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del document
+    return kept, peak, elapsed
+
+
+def main():
+    vertices = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    decodes = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    raw = json.dumps({"data": {"property": synthetic_property(1, geographies=vertices)}}).encode()
+    print(f"response: {len(raw) / 1024:.0f} KB, county boundary of {vertices} vertices")
+    print(f"{'decoder':<10}{'kept KB':>10}{'peak KB':>10}{'ms/decode':>11}")
+    decoders = {"json": json.loads, "msgspec": projection.ProjectedDecoder().decode}
+    for name, decode in decoders.items():
+        kept, peak, elapsed = measure(decode, raw, decodes)
+        print(f"{name:<10}{kept / 1024:>10.0f}{peak / 1024:>10.0f}{elapsed * 1000:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""Compare request-body size and serialization time of the property query.
+
+Usage: python benchmarks/bench_query_payload.py [iterations]
+"""
+import json
+import sys
+import timeit
+
+from _firststreet import load
+
+property_queries = load("property_queries")
+firststreet_api = load("firststreet_api")
+
+VARIABLES = {"fsid": "81767347", "buildingId": "0"}
+
+
+def per_request():
+    # What `session.post(json=payload)` did for every request before
+    return json.dumps({"query": property_queries.PROPERTY_BY_FSID_QUERY, "variables": VARIABLES}).encode("utf-8")
+
+
+def precompiled():
+    return firststreet_api.build_request_body(property_queries.PROPERTY_BY_FSID_DOCUMENT, VARIABLES)
+
+
+def persisted():
+    return firststreet_api.build_request_body(
+        property_queries.PROPERTY_BY_FSID_DOCUMENT, VARIABLES, send_query=False, send_hash=True
+    )
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    print(f"{'body':<14}{'bytes':>10}{'us/request':>14}")
+    for name, build in [("json.dumps", per_request), ("precompiled", precompiled), ("persisted", persisted)]:
+        seconds = timeit.timeit(build, number=iterations)
+        print(f"{name:<14}{len(build()):>10}{seconds / iterations * 1e6:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
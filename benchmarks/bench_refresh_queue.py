@@ -0,0 +1,80 @@
+"""Simulate a day of refresh cycles when the request budget covers only part of the portfolio.
+
+Every property is due hourly and a refresh costs one request; the budget
+per 5-minute cycle is below what the whole portfolio needs. Rows compare
+the oldest data each class of property shows over the day when the queue
+weighs only staleness vs. staleness, importance and use by automations.
+
+Usage: python benchmarks/bench_refresh_queue.py [properties] [requests per cycle]
+"""
+import statistics
+import sys
+
+from _firststreet import load
+
+scheduler = load("scheduler")
+const = load("const")
+
+CYCLE = 5  # minutes
+INTERVAL = 60
+
+
+class SimulatedProperty:
+
+    def __init__(self, index, importance, in_use, weighted):
+        self.importance = importance
+        self.in_use = in_use
+        self.weighted = weighted
+        self.fetched_at = -(index % INTERVAL)  # staggered like after a warm-up
+        self.ages = []
+
+    def refresh_cost(self, now):
+        return 1 if now - self.fetched_at >= INTERVAL else 0
+
+    def refresh_priority(self, now):
+        overdue = (now - self.fetched_at) / INTERVAL
+        if not self.weighted:
+            return overdue
+        return scheduler.refresh_priority(overdue, const.IMPORTANCE_WEIGHTS[self.importance], self.in_use)
+
+    async def async_refresh_due(self):
+        pass
+
+
+def simulate(count, budget, weighted):
+    properties = []
+    queue = scheduler.RefreshQueue(budget)
+    for index in range(count):
+        importance = "critical" if index % 10 == 0 else "low" if index % 10 >= 7 else "normal"
+        prop = SimulatedProperty(index, importance, in_use=index % 10 == 1, weighted=weighted)
+        properties.append(prop)
+        queue.add(prop)
+    for now in range(0, 24 * 60, CYCLE):
+        for prop in queue.plan(now):
+            prop.fetched_at = now
+        for prop in properties:
+            prop.ages.append(now - prop.fetched_at)
+    return properties
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    budget = int(sys.argv[2]) if len(sys.argv) > 2 else 30
+    print(f"{count} properties due hourly, {budget} requests per {CYCLE}-minute cycle "
+          f"({budget * 60 // CYCLE} per hour)")
+    print(f"{'queue':<10}{'property':<12}{'mean age (min)':>16}{'worst age (min)':>17}")
+    for name, weighted in (("equal", False), ("weighted", True)):
+        properties = simulate(count, budget, weighted)
+        classes = (
+            ("critical", lambda prop: prop.importance == "critical"),
+            ("automation", lambda prop: prop.in_use),
+            ("normal", lambda prop: prop.importance == "normal" and not prop.in_use),
+            ("low", lambda prop: prop.importance == "low"),
+        )
+        for label, selected in classes:
+            ages = [age for prop in properties if selected(prop) for age in prop.ages]
+            print(f"{name:<10}{label:<12}{statistics.mean(ages):>16.0f}{max(ages):>17}")
+
+
+if __name__ == "__main__":
+    main()
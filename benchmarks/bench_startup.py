@@ -0,0 +1,78 @@
+"""Compare bringing many config entries up at once vs. through the setup scheduler.
+
+Rows:
+- all at once: every entry probes its property, then does its first refresh,
+  all in parallel (what `async_setup_entry` used to do)
+- scheduled: one first fetch per entry through `SetupScheduler`, at most
+  `concurrency` at once, spread over the warm-up window
+- stored: entries restore their stored document and are up without a
+  request; their refreshes are left to the scheduler
+
+"up" is when the last entry has data for its sensors. Runs against a local
+stub server that adds the same latency to every response.
+
+Usage: python benchmarks/bench_startup.py [entries] [server latency ms] [warm-up s] [concurrency]
+"""
+import asyncio
+import concurrent.futures
+import sys
+import time
+
+from _firststreet import load, synthetic_property
+from _stub_server import StubServer
+
+firststreet_api = load("firststreet_api")
+scheduler_module = load("scheduler")
+
+
+async def all_at_once(api, fsids, document, warmup, concurrency):
+    async def setup(fsid):
+        await asyncio.to_thread(api.get_all_risk_data, fsid, 0)
+        await asyncio.to_thread(api.get_all_risk_data, fsid, 0)
+
+    await asyncio.gather(*(setup(fsid) for fsid in fsids))
+
+
+async def scheduled(api, fsids, document, warmup, concurrency):
+    scheduler = scheduler_module.SetupScheduler(len(fsids), concurrency, warmup)
+
+    async def setup(fsid):
+        await scheduler.run(lambda: asyncio.to_thread(api.get_all_risk_data, fsid, 0))
+
+    await asyncio.gather(*(setup(fsid) for fsid in fsids))
+
+
+async def stored(api, fsids, document, warmup, concurrency):
+    for fsid in fsids:
+        await asyncio.to_thread(api.restore_document, fsid, 0, document)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    latency = float(sys.argv[2]) / 1000 if len(sys.argv) > 2 else 0.2
+    warmup = float(sys.argv[3]) if len(sys.argv) > 3 else 2.0
+    concurrency = int(sys.argv[4]) if len(sys.argv) > 4 else 4
+    document = synthetic_property(1)
+    fsids = list(range(count))
+    print(f"{count} entries, {latency * 1000:.0f} ms server latency, "
+          f"{warmup:g} s warm-up, {concurrency} at once")
+    print(f"{'setup':<14}{'up (s)':>8}{'requests':>10}{'peak at once':>14}")
+    with StubServer(document, latency) as server:
+        for name, setup in (("all at once", all_at_once), ("scheduled", scheduled), ("stored", stored)):
+            api = firststreet_api.FirstStreetAPI(base_url=server.url)
+            api.get_property_data(-1)  # imports the HTTP stack before threads race to
+            server.stats.reset()
+            loop = asyncio.new_event_loop()
+            # Home Assistant's executor is large enough to run every entry's fetch at once
+            loop.set_default_executor(concurrent.futures.ThreadPoolExecutor(count))
+            start = time.perf_counter()
+            loop.run_until_complete(setup(api, fsids, document, warmup, concurrency))
+            elapsed = time.perf_counter() - start
+            loop.close()
+            stats = server.stats
+            print(f"{name:<14}{elapsed:>8.2f}{stats.requests:>10}{stats.peak_in_flight:>14}")
+            api.session.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Compare peak memory and time of buffered vs. streaming decode of one property response.
+
+The response comes from a local stub server, with a county boundary of the
+given size standing in for the geography subtrees the parsers never read.
+Peak memory is traced with tracemalloc around `get_property_data`; the stub
+server runs in this process too, but only allocates a few KB per request.
+
+Usage: python benchmarks/bench_streaming.py [county boundary vertices] [fetches]
+"""
+import gc
+import json
+import sys
+import time
+import tracemalloc
+
+from _firststreet import load, synthetic_property
+from _stub_server import StubServer
+
+firststreet_api = load("firststreet_api")
+
+
+def measure(url, decoder, fetches):
+    api = firststreet_api.FirstStreetAPI(base_url=url, decoder=decoder)
+    api.get_property_data(1)  # connect and import outside the measurement
+
+    start = time.perf_counter()
+    for _ in range(fetches):
+        api.get_property_data(1)
+    elapsed = (time.perf_counter() - start) / fetches
+
+    gc.collect()
+    tracemalloc.start()
+    data = api.get_property_data(1)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    api.session.close()
+    return peak, elapsed, len(json.dumps(data))
+
+
+def main():
+    vertices = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    fetches = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    document = synthetic_property(1, geographies=vertices)
+    with StubServer(document) as server:
+        size = len(server.bodies["identity"])
+        print(f"response: {size / 1024:.0f} KB ({len(server.bodies['gzip']) / 1024:.0f} KB gzipped), "
+              f"county boundary of {vertices} vertices")
+        print(f"{'decoder':<10}{'peak KB':>10}{'ms/fetch':>10}{'kept KB':>10}")
+        for decoder in ("json", "stream"):
+            peak, elapsed, kept = measure(server.url, decoder, fetches)
+            print(f"{decoder:<10}{peak / 1024:>10.0f}{elapsed * 1000:>10.1f}{kept / 1024:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Compare bytes transferred and latency of transport settings against a local stub.
+
+Each of N concurrent clients (one per simulated config entry) fetches the
+full property query repeatedly. Usage:
+
+    python benchmarks/bench_transport.py [requests per client] [server latency ms]
+"""
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from _firststreet import load, synthetic_property
+from _stub_server import StubServer
+
+firststreet_api = load("firststreet_api")
+transport = load("transport")
+
+CONCURRENCY = (1, 8, 32)
+
+
+def identity_client(url):
+    # No shared pool and no response compression
+    api = firststreet_api.FirstStreetAPI(base_url=url)
+    api.session.headers["Accept-Encoding"] = "identity"
+    return api
+
+
+def scenarios():
+    shared = transport.TransportConfig()
+    compressed = transport.TransportConfig(compress_requests=True)
+    return [
+        ("private, identity", identity_client),
+        ("private, gzip", lambda url: firststreet_api.FirstStreetAPI(base_url=url)),
+        ("shared pool, gzip", lambda url: firststreet_api.FirstStreetAPI(base_url=url, transport=shared)),
+        ("shared + gzip body", lambda url: firststreet_api.FirstStreetAPI(base_url=url, transport=compressed)),
+    ]
+
+
+def run(server, make_client, concurrency, per_client):
+    clients = [make_client(server.url) for _ in range(concurrency)]
+
+    def worker(api):
+        latencies = []
+        for fsid in range(per_client):
+            start = time.perf_counter()
+            api.get_property_data(fsid)
+            latencies.append(time.perf_counter() - start)
+        return latencies
+
+    server.stats.reset()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        latencies = [latency for result in pool.map(worker, clients) for latency in result]
+    elapsed = time.perf_counter() - start
+    for api in clients:
+        if not api._shared_transport:
+            api.session.close()
+    transport.close_shared_sessions()
+    return elapsed, latencies
+
+
+def main():
+    per_client = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    latency = (float(sys.argv[2]) if len(sys.argv) > 2 else 5.0) / 1000
+    with StubServer(synthetic_property(1), latency=latency) as server:
+        print(f"{'transport':<20}{'clients':>8}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}"
+              f"{'KB up/req':>11}{'KB down/req':>13}{'conns':>7}")
+        for concurrency in CONCURRENCY:
+            for name, make_client in scenarios():
+                elapsed, latencies = run(server, make_client, concurrency, per_client)
+                stats = server.stats
+                p95 = statistics.quantiles(latencies, n=20)[-1] if len(latencies) > 1 else latencies[0]
+                print(
+                    f"{name:<20}{concurrency:>8}{len(latencies) / elapsed:>9.0f}"
+                    f"{statistics.median(latencies) * 1000:>9.2f}{p95 * 1000:>9.2f}"
+                    f"{stats.bytes_in / stats.requests / 1024:>11.2f}{stats.bytes_out / stats.requests / 1024:>13.2f}"
+                    f"{stats.connections:>7}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Time the compiled response validation against the chained key checks it replaced.
+
+Rows:
+- envelope: the old `'errors'`/`'data'`/`'property'` checks vs. `validate_response`
+- property: `validate_property` on a valid document (what a tolerant client
+  adds to every parse), next to the parse it guards
+- broken: parsing a document missing fields, old style (the first KeyError)
+  vs. strict (validated on failure to report every problem)
+
+Usage: python benchmarks/bench_validation.py [iterations]
+"""
+import logging
+import sys
+import timeit
+
+from _firststreet import load, synthetic_property
+
+api_module = load("firststreet_api")
+validation = load("validation")
+
+
+def chained_checks(data):
+    # The checks `get_property_data` made before the compiled validator
+    if 'errors' in data:
+        raise ValueError(data['errors'])
+    if 'data' not in data:
+        raise ValueError(data)
+    if 'property' not in data['data']:
+        raise ValueError(data['data'])
+    if data['data']['property'] is None:
+        raise ValueError(data['data'])
+    return data['data']['property']
+
+
+def compiled_checks(data):
+    if 'errors' in data:
+        raise ValueError(data['errors'])
+    problems = validation.validate_response(data)
+    if problems:
+        raise ValueError(problems)
+    if data['data']['property'] is None:
+        raise ValueError(data['data'])
+    return data['data']['property']
+
+
+def first_key_error(api, document):
+    try:
+        for parser in (api.parse_flood_data, api.parse_fire_data, api.parse_heat_data,
+                       api.parse_wind_data, api.parse_air_data):
+            parser(document)
+    except (KeyError, TypeError):
+        pass
+
+
+def strict_parse(api, document):
+    try:
+        api.parse_all_risk_data(document)
+    except api_module.FirstStreetAPIError:
+        pass
+
+
+def per_call_us(function, iterations):
+    return min(timeit.repeat(function, number=iterations, repeat=5)) / iterations * 1e6
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    logging.disable(logging.CRITICAL)  # FirstStreetAPIError logs every instance
+    api = api_module.FirstStreetAPI()
+    document = synthetic_property(1)
+    response = {'data': {'property': document}}
+    broken = dict(document, fire=dict(document['fire'], historicConnection=None), air=None)
+
+    rows = [
+        ("envelope", "chained", lambda: chained_checks(response)),
+        ("envelope", "compiled", lambda: compiled_checks(response)),
+        ("property", "validate", lambda: validation.validate_property(document)),
+        ("property", "parse", lambda: api.parse_all_risk_data(document)),
+        ("broken", "first KeyError", lambda: first_key_error(api, broken)),
+        ("broken", "all problems", lambda: strict_parse(api, broken)),
+    ]
+    print(f"{'check':<10}{'':<16}{'us/call':>9}")
+    for check, variant, function in rows:
+        print(f"{check:<10}{variant:<16}{per_call_us(function, iterations):>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Rank the fields of a property response by bytes and decode time, and prune the query to a parser.
+
+Usage:
+
+    python benchmarks/profile_payload.py [response.json] [--top 40] [--depth 4]
+        [--parser all|flood|fire|heat|wind|air|location] [--pruned-query pruned.graphql]
+
+`response.json` is a recorded response to PROPERTY_BY_FSID_QUERY (the
+GraphQL envelope or the bare property object); without one, a synthetic
+property with geography blocks is profiled. With `--parser`, the fields
+that parser reads are recorded and the query is pruned to them.
+"""
+import argparse
+import json
+
+from _firststreet import load, synthetic_property
+
+firststreet_api = load("firststreet_api")
+payload_profile = load("payload_profile")
+property_queries = load("property_queries")
+
+
+def parsers(api):
+    def parse_all(data):
+        parsed = api.parse_all_risk_data(data)
+        # Buildings are parsed lazily; read every risk type like the sensors do
+        parsed["buildings"] = {building_id: dict(building) for building_id, building in parsed["buildings"].items()}
+        parsed["location"] = api.parse_location_data(data)
+        return parsed
+
+    return {
+        "all": parse_all,
+        "flood": api.parse_flood_data,
+        "fire": api.parse_fire_data,
+        "heat": api.parse_heat_data,
+        "wind": api.parse_wind_data,
+        "air": api.parse_air_data,
+        "location": api.parse_location_data,
+    }
+
+
+def compact_size(document):
+    return len(json.dumps(document, separators=(",", ":")))
+
+
+def main():
+    api = firststreet_api.FirstStreetAPI()
+    arguments = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arguments.add_argument("response", nargs="?", help="recorded response JSON (default: synthetic property)")
+    arguments.add_argument("--top", type=int, default=40, help="paths to show")
+    arguments.add_argument("--depth", type=int, default=None, help="hide paths nested deeper than this")
+    arguments.add_argument("--parser", choices=sorted(parsers(api)), help="prune the query to this parser's reads")
+    arguments.add_argument("--pruned-query", help="write the pruned query here instead of printing it")
+    options = arguments.parse_args()
+
+    if options.response:
+        with open(options.response, encoding="utf-8") as response:
+            document = json.load(response)
+        if "data" in document:
+            document = document["data"]["property"]
+    else:
+        document = synthetic_property(1, geographies=5000)
+
+    total = compact_size(document)
+    costs = payload_profile.field_costs(document)
+    print(f"response: {total} bytes compact, {len(costs)} field paths")
+    print(payload_profile.format_report(costs, total, top=options.top, max_depth=options.depth))
+
+    if options.parser:
+        accessed = payload_profile.record_access(document, parsers(api)[options.parser])
+        query = property_queries.PROPERTY_BY_FSID_QUERY
+        pruned = payload_profile.prune_query(query, accessed)
+        kept = compact_size(payload_profile.prune_document(document, accessed))
+        print(f"\n{options.parser}: reads {len(accessed.paths())} field paths; "
+              f"response {total} -> {kept} bytes ({kept / total:.1%}), query {len(query)} -> {len(pruned)} bytes")
+        if options.pruned_query:
+            with open(options.pruned_query, "w", encoding="utf-8") as output:
+                output.write(pruned + "\n")
+        else:
+            print(pruned)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,35 +1,243 @@
 """The FirstStreet integration."""
 from __future__ import annotations
 
+import asyncio
+import importlib.util
 import logging
+
+import voluptuous as vol
+from aiohttp import web
+from homeassistant.components.http import HomeAssistantView
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
-from homeassistant.exceptions import ConfigEntryNotReady
+import homeassistant.helpers.config_validation as cv
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.helpers.storage import Store
 
-from .const import DOMAIN
-from .firststreet_api import FirstStreetAPI, FirstStreetAPIError
+from .buildings import requested_building_id
+from .config_flow import async_import_properties
+from .const import (
+    CONF_COMPRESS_REQUESTS,
+    CONF_DECODER,
+    CONF_HEDGE_REQUESTS,
+    CONF_HTTP2,
+    CONF_IMPORTANCE,
+    CONF_METRICS,
+    CONF_NOT_FOUND_TTL,
+    CONF_OPENTELEMETRY,
+    CONF_PROFILE_SLOWEST,
+    CONF_PROFILER,
+    CONF_PROPERTIES,
+    CONF_REFRESH_BUDGET,
+    CONF_SETUP_CONCURRENCY,
+    CONF_SETUP_WARMUP,
+    CONF_SLOW_REFRESH_SECONDS,
+    DATA_HEDGE_POLICY,
+    DATA_LOCATIONS,
+    DATA_NEGATIVE_CACHE,
+    DATA_PROFILES,
+    DATA_REFRESH_QUEUE,
+    DATA_SETUP_SCHEDULER,
+    DATA_TRACER,
+    DATA_TRANSPORT,
+    DEFAULT_IMPORTANCE,
+    DEFAULT_NOT_FOUND_TTL,
+    DEFAULT_SETUP_CONCURRENCY,
+    DEFAULT_SETUP_WARMUP,
+    DEFAULT_SLOW_REFRESH_SECONDS,
+    DOMAIN,
+    METRICS_CONTENT_TYPE,
+    PROFILE_DIRECTORY,
+    REFRESH_CONCURRENCY,
+    REFRESH_CYCLE,
+    STORAGE_VERSION,
+)
+from .coordinator import FirstStreetDataUpdateCoordinator
+from .firststreet_api import FirstStreetAPI
+from .hedging import HedgePolicy
+from .metrics import ClientMetrics
+from .response_cache import NegativeCache
+from .scheduler import RefreshQueue, SetupScheduler
+from .spatial import PropertyLocations
+from .tracing import OpenTelemetryTracer, SlowestProfiles, TimingTracer
+from .transport import TransportConfig, close_shared_sessions
 
 PLATFORMS: list[str] = ["sensor"]
 
+PROPERTY_SCHEMA = vol.Schema(
+    {
+        vol.Required("fsid"): cv.positive_int,
+        vol.Optional("building_id", default=0): cv.positive_int,
+        vol.Optional("all_buildings", default=False): cv.boolean,
+    }
+)
+
+CONFIG_SCHEMA = vol.Schema(
+    {
+        DOMAIN: vol.Schema(
+            {
+                vol.Optional(CONF_METRICS, default=False): cv.boolean,
+                vol.Optional(CONF_COMPRESS_REQUESTS, default=False): cv.boolean,
+                vol.Optional(CONF_HTTP2, default=False): cv.boolean,
+                vol.Optional(CONF_DECODER, default="json"): vol.In(["json", "stream", "msgspec"]),
+                vol.Optional(CONF_HEDGE_REQUESTS, default=False): cv.boolean,
+                vol.Optional(CONF_OPENTELEMETRY, default=False): cv.boolean,
+                vol.Optional(
+                    CONF_SLOW_REFRESH_SECONDS, default=DEFAULT_SLOW_REFRESH_SECONDS
+                ): vol.Coerce(float),
+                vol.Optional(CONF_PROFILE_SLOWEST, default=0): cv.positive_int,
+                vol.Optional(CONF_PROFILER, default="cprofile"): vol.In(
+                    ["cprofile", "pyinstrument"]
+                ),
+                vol.Optional(
+                    CONF_NOT_FOUND_TTL, default=DEFAULT_NOT_FOUND_TTL
+                ): cv.positive_int,
+                vol.Optional(CONF_PROPERTIES, default=[]): vol.All(
+                    cv.ensure_list, [PROPERTY_SCHEMA]
+                ),
+                vol.Optional(
+                    CONF_SETUP_CONCURRENCY, default=DEFAULT_SETUP_CONCURRENCY
+                ): vol.All(vol.Coerce(int), vol.Range(min=1)),
+                vol.Optional(
+                    CONF_SETUP_WARMUP, default=DEFAULT_SETUP_WARMUP
+                ): vol.All(vol.Coerce(float), vol.Range(min=0)),
+                vol.Optional(CONF_REFRESH_BUDGET): vol.All(
+                    vol.Coerce(int), vol.Range(min=1)
+                ),
+            }
+        )
+    },
+    extra=vol.ALLOW_EXTRA,
+)
+
 _LOGGER = logging.getLogger(__name__)
 
+class FirstStreetMetricsView(HomeAssistantView):
+    """Expose the client metrics in the OpenMetrics text format."""
+
+    url = "/api/firststreet/metrics"
+    name = "api:firststreet:metrics"
+    requires_auth = True
+
+    def __init__(self, metrics: ClientMetrics) -> None:
+        self.metrics = metrics
+
+    async def get(self, request: web.Request) -> web.Response:
+        """Render the current metrics."""
+        return web.Response(
+            body=self.metrics.render().encode("utf-8"),
+            headers={"Content-Type": METRICS_CONTENT_TYPE},
+        )
+
 async def async_setup(hass: HomeAssistant, config: dict) -> bool:
     """Set up the FirstStreet component."""
     hass.data.setdefault(DOMAIN, {})
+    conf = config.get(DOMAIN, {})
+    if conf.get(CONF_METRICS):
+        metrics = ClientMetrics()
+        hass.data[DOMAIN][CONF_METRICS] = metrics
+        hass.http.register_view(FirstStreetMetricsView(metrics))
+
+    http2 = conf.get(CONF_HTTP2, False)
+    if http2 and not (importlib.util.find_spec("httpx") and importlib.util.find_spec("h2")):
+        _LOGGER.warning("HTTP/2 needs httpx[http2], which is not installed; using HTTP/1.1")
+        http2 = False
+    # Every config entry shares one connection pool
+    hass.data[DOMAIN][DATA_TRANSPORT] = TransportConfig(
+        compress_requests=conf.get(CONF_COMPRESS_REQUESTS, False),
+        http2=http2,
+    )
+    decoder = conf.get(CONF_DECODER, "json")
+    if decoder == "stream" and not importlib.util.find_spec("ijson"):
+        _LOGGER.warning("The streaming decoder needs ijson, which is not installed; decoding whole responses")
+        decoder = "json"
+    if decoder == "msgspec" and not importlib.util.find_spec("msgspec"):
+        _LOGGER.warning("The msgspec decoder needs msgspec, which is not installed; decoding whole responses")
+        decoder = "json"
+    hass.data[DOMAIN][CONF_DECODER] = decoder
+    if conf.get(CONF_HEDGE_REQUESTS):
+        # One latency distribution and hedge budget for every entry
+        hass.data[DOMAIN][DATA_HEDGE_POLICY] = HedgePolicy()
+    # FSIDs found missing by any entry or config flow fail fast for the others
+    hass.data[DOMAIN][DATA_NEGATIVE_CACHE] = NegativeCache(
+        conf.get(CONF_NOT_FOUND_TTL, DEFAULT_NOT_FOUND_TTL)
+    )
+    # One spatial index over the whole portfolio, not one per entry
+    hass.data[DOMAIN][DATA_LOCATIONS] = PropertyLocations()
+
+    inner = None
+    if conf.get(CONF_OPENTELEMETRY):
+        try:
+            inner = OpenTelemetryTracer()
+        except ImportError:
+            _LOGGER.warning("opentelemetry-api is not installed, spans are only timed locally")
+    hass.data[DOMAIN][DATA_TRACER] = TimingTracer(inner)
+    hass.data[DOMAIN][CONF_SLOW_REFRESH_SECONDS] = conf.get(
+        CONF_SLOW_REFRESH_SECONDS, DEFAULT_SLOW_REFRESH_SECONDS
+    )
+    if conf.get(CONF_PROFILE_SLOWEST):
+        hass.data[DOMAIN][DATA_PROFILES] = SlowestProfiles(
+            hass.config.path(PROFILE_DIRECTORY),
+            conf[CONF_PROFILE_SLOWEST],
+            conf.get(CONF_PROFILER, "cprofile"),
+        )
+    # Entries set up after this are loaded already; pace their first fetches
+    hass.data[DOMAIN][DATA_SETUP_SCHEDULER] = SetupScheduler(
+        len(hass.config_entries.async_entries(DOMAIN)),
+        conf.get(CONF_SETUP_CONCURRENCY, DEFAULT_SETUP_CONCURRENCY),
+        conf.get(CONF_SETUP_WARMUP, DEFAULT_SETUP_WARMUP),
+    )
+    # Every entry's refreshes go through one queue, drained each cycle
+    queue = RefreshQueue(conf.get(CONF_REFRESH_BUDGET), REFRESH_CONCURRENCY)
+    hass.data[DOMAIN][DATA_REFRESH_QUEUE] = queue
+
+    async def _async_drain_refresh_queue(now) -> None:
+        await queue.drain(now)
+
+    async_track_time_interval(hass, _async_drain_refresh_queue, REFRESH_CYCLE)
+    if conf.get(CONF_PROPERTIES):
+        # Checked in batches and only for properties without an entry yet
+        hass.async_create_task(async_import_properties(hass, conf[CONF_PROPERTIES]))
     return True
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up FirstStreet from a config entry."""
-    api = FirstStreetAPI()
+    api = FirstStreetAPI(
+        metrics=hass.data[DOMAIN].get(CONF_METRICS),
+        tracer=hass.data[DOMAIN].get(DATA_TRACER),
+        transport=hass.data[DOMAIN].get(DATA_TRANSPORT),
+        cache_responses=True,
+        decoder=hass.data[DOMAIN].get(CONF_DECODER, "json"),
+        negative_cache=hass.data[DOMAIN].get(DATA_NEGATIVE_CACHE),
+        hedge_policy=hass.data[DOMAIN].get(DATA_HEDGE_POLICY),
+        locations=hass.data[DOMAIN].get(DATA_LOCATIONS),
+        # A risk type missing fields makes its sensors unavailable, not the whole entry
+        tolerant=True,
+    )
     fsid = entry.data["fsid"]
-    building_id = entry.data.get("building_id", 0)
+    building_id = requested_building_id(entry.data)
+    coordinator = FirstStreetDataUpdateCoordinator(
+        hass, api, fsid, building_id,
+        store=Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}"),
+        entry_id=entry.entry_id,
+        importance=entry.options.get(CONF_IMPORTANCE, DEFAULT_IMPORTANCE),
+    )
 
-    try:
-        await hass.async_add_executor_job(api.get_all_risk_data, fsid, building_id)
-    except FirstStreetAPIError as err:
-        raise ConfigEntryNotReady from err
+    scheduler: SetupScheduler = hass.data[DOMAIN][DATA_SETUP_SCHEDULER]
+    if await coordinator.async_restore():
+        # The sensors come up with the stored data; the refresh waits for its slot
+        entry.async_create_background_task(
+            hass,
+            scheduler.run(coordinator.async_refresh_due),
+            f"{DOMAIN} first refresh of {fsid}",
+        )
+    else:
+        # Raises ConfigEntryNotReady if the fetch fails
+        await scheduler.run(coordinator.async_config_entry_first_refresh)
 
-    hass.data[DOMAIN][entry.entry_id] = api
+    hass.data[DOMAIN][entry.entry_id] = coordinator
+    entry.async_on_unload(hass.data[DOMAIN][DATA_REFRESH_QUEUE].add(coordinator))
+    entry.async_on_unload(entry.add_update_listener(_async_update_options))
 
     for platform in PLATFORMS:
         hass.async_create_task(
@@ -38,6 +246,12 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
     return True
 
+async def _async_update_options(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Apply a changed importance to the queued refreshes, without reloading."""
+    hass.data[DOMAIN][entry.entry_id].importance = entry.options.get(
+        CONF_IMPORTANCE, DEFAULT_IMPORTANCE
+    )
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     unload_ok = all(
@@ -49,6 +263,18 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         )
     )
     if unload_ok:
-        hass.data[DOMAIN].pop(entry.entry_id)
+        coordinator = hass.data[DOMAIN].pop(entry.entry_id)
+        coordinator.api.locations.discard((coordinator.fsid, coordinator.building_id or 0))
+        if not any(
+            isinstance(value, FirstStreetDataUpdateCoordinator)
+            for value in hass.data[DOMAIN].values()
+        ):
+            await hass.async_add_executor_job(close_shared_sessions)
+            if DATA_HEDGE_POLICY in hass.data[DOMAIN]:
+                hass.data[DOMAIN][DATA_HEDGE_POLICY].close()
 
     return unload_ok
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Delete the data stored for a removed config entry."""
+    await Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}").async_remove()
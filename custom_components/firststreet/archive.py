@@ -0,0 +1,179 @@
+"""Append-only, memory-mapped archive of raw FirstStreet responses."""
+import bisect
+import mmap
+import os
+import struct
+import time
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+INDEX_MAGIC = b"FSARIDX1"
+# fsid, building_id (-1 for every building), fetched_at (epoch seconds), offset, length
+INDEX_ENTRY = struct.Struct("<qqdQQ")
+NO_BUILDING = -1
+
+
+class ArchiveEntry(NamedTuple):
+    """Where one archived response lives in the data file."""
+
+    fsid: int
+    building_id: Optional[int]
+    fetched_at: float
+    offset: int
+    length: int
+
+
+class ResponseArchive:
+    """
+    Raw response bodies in one append-only data file, plus a fixed-width index.
+
+    `<path>` holds the bodies back to back; `<path>.idx` maps (fsid,
+    building_id, fetched_at) to byte ranges. Reads return memoryviews of a
+    memory map of the data file, so opening an archive only loads the index
+    and a document is paged in when it is parsed. `bulk.parse_raw_document`
+    decodes views in place with msgspec when it is installed, and copies
+    them into a str for the stdlib decoder otherwise. Views stay valid
+    until the archive is closed.
+
+    A crash can leave a torn index record or a body without its record at
+    the end of the files; opening the archive truncates both away, so later
+    appends line up again.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.index_path = f"{path}.idx"
+        self._data = open(path, "a+b")
+        self._index = open(self.index_path, "a+b")
+        self._map: Optional[mmap.mmap] = None
+        self._entries: Dict[Tuple[int, Optional[int]], List[ArchiveEntry]] = {}
+        self._count = 0
+        self._load_index()
+
+    def _load_index(self) -> None:
+        self._index.seek(0)
+        header = self._index.read(len(INDEX_MAGIC))
+        if not header:
+            self._index.write(INDEX_MAGIC)
+            self._index.flush()
+            return
+        if header != INDEX_MAGIC:
+            raise ValueError(f"{self.index_path} is not a FirstStreet archive index")
+
+        data_size = os.fstat(self._data.fileno()).st_size
+        raw = self._index.read()
+        records = 0
+        data_end = 0
+        for fields in INDEX_ENTRY.iter_unpack(raw[:len(raw) - len(raw) % INDEX_ENTRY.size]):
+            entry = self._entry(*fields)
+            # Bodies are appended in index order, so once one never fully
+            # reached the data file, neither did any later one
+            if entry.offset + entry.length > data_size:
+                break
+            self._add(entry)
+            records += 1
+            data_end = max(data_end, entry.offset + entry.length)
+        for entries in self._entries.values():
+            entries.sort()
+
+        # Drop a torn record and records past the data, and the bytes of a
+        # body whose record was never written, so appends line up again
+        index_size = len(INDEX_MAGIC) + records * INDEX_ENTRY.size
+        if index_size < len(INDEX_MAGIC) + len(raw):
+            self._index.truncate(index_size)
+        if data_end < data_size:
+            self._data.truncate(data_end)
+
+    @staticmethod
+    def _entry(fsid: int, building_id: int, fetched_at: float, offset: int, length: int) -> ArchiveEntry:
+        return ArchiveEntry(fsid, None if building_id == NO_BUILDING else building_id, fetched_at, offset, length)
+
+    def _add(self, entry: ArchiveEntry) -> None:
+        self._entries.setdefault((entry.fsid, entry.building_id), []).append(entry)
+        self._count += 1
+
+    def append(self, fsid: int, building_id: Optional[int], raw: bytes, fetched_at: Optional[float] = None) -> ArchiveEntry:
+        """
+        Append a raw response body.
+
+        The body is flushed before its index entry is written, so a crash
+        never leaves an index entry pointing past the data.
+        """
+        fetched_at = time.time() if fetched_at is None else fetched_at
+        self._data.seek(0, os.SEEK_END)
+        offset = self._data.tell()
+        self._data.write(raw)
+        self._data.flush()
+
+        entry = ArchiveEntry(fsid, building_id, fetched_at, offset, len(raw))
+        self._index.seek(0, os.SEEK_END)
+        self._index.write(INDEX_ENTRY.pack(
+            fsid, NO_BUILDING if building_id is None else building_id, fetched_at, offset, len(raw)
+        ))
+        self._index.flush()
+
+        entries = self._entries.setdefault((fsid, building_id), [])
+        bisect.insort(entries, entry)
+        self._count += 1
+        return entry
+
+    def entries(self, fsid: Optional[int] = None, building_id: Optional[int] = 0) -> List[ArchiveEntry]:
+        """
+        List archived responses, oldest first.
+
+        :param fsid: Only this property (default is every property, in index order)
+        :param building_id: The building ID the responses were fetched for, or None for every building
+        """
+        if fsid is None:
+            return [entry for entries in self._entries.values() for entry in entries]
+        return list(self._entries.get((fsid, building_id), ()))
+
+    def read(self, entry: ArchiveEntry) -> memoryview:
+        """Return the raw body of an entry as a view into the memory map."""
+        end = entry.offset + entry.length
+        if self._map is None or len(self._map) < end:
+            self._remap()
+        return memoryview(self._map)[entry.offset:end]
+
+    def latest(self, fsid: int, building_id: Optional[int] = 0) -> Optional[memoryview]:
+        """Return the most recent raw body for a property, or None."""
+        entries = self._entries.get((fsid, building_id))
+        return self.read(entries[-1]) if entries else None
+
+    def at(self, fsid: int, building_id: Optional[int], fetched_at: float) -> Optional[memoryview]:
+        """Return the raw body that was current at `fetched_at`, or None if there was none yet."""
+        entries = self._entries.get((fsid, building_id), [])
+        position = bisect.bisect_right([entry.fetched_at for entry in entries], fetched_at)
+        return self.read(entries[position - 1]) if position else None
+
+    def __iter__(self) -> Iterator[Tuple[ArchiveEntry, memoryview]]:
+        for entry in self.entries():
+            yield entry, self.read(entry)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def flush(self) -> None:
+        """Make appended bodies visible to other readers of the data file."""
+        self._data.flush()
+
+    def _remap(self) -> None:
+        # Growing the map means a new one; views of the old map keep it alive
+        self._data.flush()
+        self._map = mmap.mmap(self._data.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def close(self) -> None:
+        """Close the files; the map is released once no view returned by `read` is left."""
+        if self._map is not None:
+            try:
+                self._map.close()
+            except BufferError:
+                pass
+            self._map = None
+        self._data.close()
+        self._index.close()
+
+    def __enter__(self) -> "ResponseArchive":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,157 @@
+"""Per-building risk data parsed lazily from `buildingConnection`."""
+import re
+from collections.abc import Mapping
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+RISK_TYPES = ("flood", "fire", "heat", "wind", "air")
+
+
+def parse_building_flood(flood_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Parse a building's flood block."""
+    return {
+        'flood_factor': flood_data.get('floodFactor'),
+        'risk_direction': flood_data.get('riskDirection'),
+        'flood_type': flood_data.get('floodType'),
+        'probability': flood_data.get('probability'),
+        'consequences': flood_data.get('consequences'),
+        'historic_events': flood_data.get('historic'),
+        'insights': flood_data.get('insights')
+    }
+
+
+def parse_building_fire(fire_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Parse a building's fire block."""
+    return {
+        'fire_factor': fire_data.get('fireFactor'),
+        'risk_direction': fire_data.get('riskDirection'),
+        'defensible_space': fire_data.get('defensibleSpace'),
+        'usfs_relative_risk': fire_data.get('usfsRelativeRisk'),
+        'probability': fire_data.get('probability'),
+        'insights': fire_data.get('insights')
+    }
+
+
+def parse_building_heat(heat_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Parse a building's heat block."""
+    return {
+        'heat_factor': heat_data.get('heatFactor'),
+        'insights': heat_data.get('insights')
+    }
+
+
+def parse_building_wind(wind_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Parse a building's wind block."""
+    return {
+        'wind_factor': wind_data.get('windFactor'),
+        'factor_scale': wind_data.get('factorScale'),
+        'risk_direction': wind_data.get('riskDirection'),
+        'has_tornado_risk': wind_data.get('hasTornadoRisk'),
+        'has_thunderstorm_risk': wind_data.get('hasThunderstormRisk'),
+        'has_cyclone_risk': wind_data.get('hasCycloneRisk'),
+        'greatest_wind_risk': wind_data.get('greatestWindRisk'),
+        'missile_environment': wind_data.get('missileEnvironment'),
+        'primary_wind_direction': wind_data.get('primaryWindDirection'),
+        'probability': wind_data.get('probability')
+    }
+
+
+def parse_building_air(air_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Parse a building's air quality block."""
+    return {
+        'air_factor': air_data.get('airFactor'),
+        'factor_scale': air_data.get('factorScale'),
+        'risk_direction': air_data.get('riskDirection'),
+        'insights': air_data.get('insights')
+    }
+
+
+BUILDING_PARSERS: Dict[str, Callable[[Dict[str, Any]], Dict[str, Any]]] = {
+    'flood': parse_building_flood,
+    'fire': parse_building_fire,
+    'heat': parse_building_heat,
+    'wind': parse_building_wind,
+    'air': parse_building_air,
+}
+
+
+class BuildingRiskData(Mapping):
+    """Risk data of one building, parsed per risk type on first access.
+
+    Behaves like the `get_all_risk_data` result for a property: a mapping of
+    risk type to parsed data, or None when the building has no data for it.
+    """
+
+    __slots__ = ("building_id", "_node", "_parsed")
+
+    def __init__(self, node: Dict[str, Any]):
+        self.building_id: int = node.get('buildingId')
+        self._node = node
+        self._parsed: Dict[str, Optional[Dict[str, Any]]] = {}
+
+    @property
+    def details(self) -> Dict[str, Any]:
+        """Return the building's non-risk attributes (stories, sqft, ...)."""
+        return {
+            key: value for key, value in self._node.items()
+            if key not in BUILDING_PARSERS and key != 'property'
+        }
+
+    def __getitem__(self, risk_type: str) -> Optional[Dict[str, Any]]:
+        if risk_type not in BUILDING_PARSERS:
+            raise KeyError(risk_type)
+        if risk_type not in self._parsed:
+            risk_data = self._node.get(risk_type)
+            self._parsed[risk_type] = BUILDING_PARSERS[risk_type](risk_data) if risk_data else None
+        return self._parsed[risk_type]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(RISK_TYPES)
+
+    def __len__(self) -> int:
+        return len(RISK_TYPES)
+
+
+def requested_building_id(entry_data: Dict[str, Any]) -> Optional[int]:
+    """Return the building ID to fetch for a config entry, or None for every building."""
+    if entry_data.get("all_buildings"):
+        return None
+    return entry_data.get("building_id", 0)
+
+
+def parse_property_list(text: str) -> List[Dict[str, Any]]:
+    """
+    Parse a pasted list of properties into config entry data.
+
+    Entries are separated by newlines, commas, semicolons or spaces, each
+    `FSID` (building 0), `FSID:BUILDING_ID` or `FSID:all` (every building).
+
+    :raises ValueError: If an entry is in none of these forms
+    """
+    properties = []
+    for token in re.split(r"[\s,;]+", text.strip()):
+        if not token:
+            continue
+        fsid, _, building = token.partition(":")
+        if not fsid.isdigit() or not (building.isdigit() or building.lower() in ("", "all")):
+            raise ValueError(f"Expected FSID, FSID:BUILDING_ID or FSID:all, got {token!r}")
+        properties.append({
+            "fsid": int(fsid),
+            "building_id": int(building) if building.isdigit() else 0,
+            "all_buildings": building.lower() == "all",
+        })
+    return properties
+
+
+def parse_buildings(data: Dict[str, Any]) -> Dict[int, BuildingRiskData]:
+    """
+    Wrap each building returned in `buildingConnection` without parsing it yet.
+
+    :param data: The property document returned by `get_property_data`
+    :return: Mapping of building ID to its lazily parsed risk data
+    """
+    buildings: Dict[int, BuildingRiskData] = {}
+    for edge in (data.get('buildingConnection') or {}).get('edges') or []:
+        node = edge.get('node')
+        if node and node.get('buildingId') is not None:
+            buildings[node['buildingId']] = BuildingRiskData(node)
+    return buildings
@@ -0,0 +1,262 @@
+"""Parse many raw property documents across CPU cores."""
+import functools
+import itertools
+import json
+import logging
+import mmap
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from .archive import ArchiveEntry, ResponseArchive
+from .firststreet_api import FirstStreetAPI, FirstStreetAPIError
+from .spatial import Point, PropertyLocations, centroid_from_geometry
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_CHUNKSIZE = 64
+
+BuildingFactors = Tuple[int, Optional[int], Optional[int], Optional[int], Optional[int], Optional[int]]
+
+
+class RiskSummary:
+    """The headline factors of one property, small enough to ship between processes."""
+
+    __slots__ = (
+        "fsid", "flood_factor", "fire_factor", "heat_factor", "wind_factor", "air_factor", "buildings", "center"
+    )
+
+    def __init__(
+        self,
+        fsid: Optional[int],
+        flood_factor: Optional[int],
+        fire_factor: Optional[int],
+        heat_factor: Optional[int],
+        wind_factor: Optional[int],
+        air_factor: Optional[int],
+        buildings: Tuple[BuildingFactors, ...] = (),
+        center: Optional[Point] = None,
+    ):
+        self.fsid = fsid
+        self.flood_factor = flood_factor
+        self.fire_factor = fire_factor
+        self.heat_factor = heat_factor
+        self.wind_factor = wind_factor
+        self.air_factor = air_factor
+        # (building_id, flood, fire, heat, wind, air) per building
+        self.buildings = buildings
+        self.center = center
+
+    @classmethod
+    def from_parsed(cls, fsid: Optional[int], parsed: Dict[str, Any]) -> "RiskSummary":
+        """Summarize a `parse_all_risk_data` result."""
+        buildings = tuple(
+            (building_id,) + tuple(
+                (building[risk_type] or {}).get(f'{risk_type}_factor')
+                for risk_type in ('flood', 'fire', 'heat', 'wind', 'air')
+            )
+            for building_id, building in parsed.get('buildings', {}).items()
+        )
+        return cls(
+            fsid,
+            parsed['flood']['flood_factor'],
+            parsed['fire']['fire_factor'],
+            parsed['heat']['heat_factor'],
+            parsed['wind']['wind_factor'],
+            parsed['air']['air_factor'],
+            buildings,
+            parsed.get('center'),
+        )
+
+    def _fields(self) -> tuple:
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __reduce__(self):
+        # Pickle as a plain tuple instead of a slot-state dict
+        return (RiskSummary, self._fields())
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, RiskSummary) and self._fields() == other._fields()
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"RiskSummary({fields})"
+
+
+def parse_raw_document(raw: Union[bytes, str, memoryview], api: Optional[FirstStreetAPI] = None) -> Dict[str, Any]:
+    """
+    Decode and parse one raw response body or bare property document.
+
+    :param raw: A GraphQL response (`{"data": {"property": ...}}`) or the property
+        object itself, e.g. a view returned by `ResponseArchive.read`
+    :param api: The client whose parsers to use (default is a parser-only client)
+    :return: The `parse_all_risk_data` result, with `fsid` and the property's `center` added
+    """
+    decode = _buffer_decoder() if isinstance(raw, memoryview) else None
+    if decode is not None:
+        # msgspec reads the view, e.g. a memory map, in place
+        document = decode(raw)
+    elif isinstance(raw, memoryview):
+        # json.loads rejects buffers, so the view is copied into a str
+        document = json.loads(str(raw, "utf-8"))
+    else:
+        document = json.loads(raw)
+    if 'data' in document:
+        document = document['data']['property']
+    parsed = (api or _parser()).parse_all_risk_data(document)
+    parsed['fsid'] = document.get('fsid')
+    parsed['center'] = centroid_from_geometry(document.get('geometry'))
+    return parsed
+
+
+_decode_buffer: Union[Callable[[Any], Any], bool, None] = None
+
+
+def _buffer_decoder() -> Optional[Callable[[Any], Any]]:
+    """Return msgspec's JSON decoder, which accepts buffers, or None if msgspec is not installed."""
+    global _decode_buffer
+    if _decode_buffer is None:
+        try:
+            import msgspec
+        except ImportError:
+            _decode_buffer = False
+        else:
+            _decode_buffer = msgspec.json.decode
+    return _decode_buffer or None
+
+
+_worker_api: Optional[FirstStreetAPI] = None
+
+
+def _parser() -> FirstStreetAPI:
+    global _worker_api
+    if _worker_api is None:
+        _worker_api = FirstStreetAPI()
+    return _worker_api
+
+
+def _parse_chunk(chunk: Sequence[bytes], summary: bool) -> List[Any]:
+    """Worker entry point: parse a chunk, with None for documents that fail."""
+    return _parse_all(chunk, summary)
+
+
+_worker_maps: Dict[str, mmap.mmap] = {}
+
+
+def _parse_archive_chunk(path: str, spans: Sequence[Tuple[int, int]], summary: bool) -> List[Any]:
+    """Worker entry point: parse byte ranges of an archive mapped in this process."""
+    archive_map = _worker_maps.get(path)
+    if archive_map is None or len(archive_map) < max(offset + length for offset, length in spans):
+        with open(path, "rb") as data:
+            archive_map = _worker_maps[path] = mmap.mmap(data.fileno(), 0, access=mmap.ACCESS_READ)
+    view = memoryview(archive_map)
+    return _parse_all((view[offset:offset + length] for offset, length in spans), summary)
+
+
+def _parse_all(documents, summary: bool) -> List[Any]:
+    results: List[Any] = []
+    for raw in documents:
+        try:
+            parsed = parse_raw_document(raw)
+        except (FirstStreetAPIError, ValueError, KeyError, TypeError, AttributeError):
+            results.append(None)
+            continue
+        if summary:
+            results.append(RiskSummary.from_parsed(parsed['fsid'], parsed))
+        else:
+            # Materialize lazily parsed buildings so they pickle compactly
+            parsed['buildings'] = {
+                building_id: dict(building) for building_id, building in parsed['buildings'].items()
+            }
+            results.append(parsed)
+    return results
+
+
+def bulk_parse(
+    raw_documents: Sequence[bytes],
+    workers: Optional[int] = None,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    summary: bool = True,
+    locations: Optional[PropertyLocations] = None,
+) -> List[Any]:
+    """
+    Decode and parse raw property documents in a process pool.
+
+    Raw bytes are sent to the workers in chunks, so decoding happens there
+    too; only the parsed results travel back.
+
+    :param raw_documents: Raw response bodies, e.g. from an archive or a cache
+    :param workers: Worker processes (default is one per CPU); 1 parses in this process
+    :param chunksize: Documents per task sent to a worker
+    :param summary: Return a `RiskSummary` per document instead of the full parsed data
+    :param locations: Record the centroid of every parsed property here
+    :return: One result per document, in order, or None where a document failed to parse
+    """
+    chunks = [raw_documents[start:start + chunksize] for start in range(0, len(raw_documents), chunksize)]
+    return _run(_parse_chunk, chunks, workers, summary, locations)
+
+
+def bulk_parse_archive(
+    archive: ResponseArchive,
+    entries: Optional[Sequence[ArchiveEntry]] = None,
+    workers: Optional[int] = None,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    summary: bool = True,
+    locations: Optional[PropertyLocations] = None,
+) -> List[Any]:
+    """
+    Parse archived responses in a process pool without shipping their bytes.
+
+    Workers map the archive's data file themselves and receive only byte
+    ranges, so documents go from the page cache straight to the decoder.
+
+    :param archive: The archive to read
+    :param entries: The responses to parse (default is every archived response)
+    :param locations: Record the centroid of every parsed property here
+    :return: One result per entry, in order, or None where a document failed to parse
+    """
+    entries = archive.entries() if entries is None else entries
+    if (workers or os.cpu_count() or 1) == 1 or len(entries) <= chunksize:
+        return _report(_parse_all((archive.read(entry) for entry in entries), summary), locations)
+
+    spans = [(entry.offset, entry.length) for entry in entries]
+    chunks = [spans[start:start + chunksize] for start in range(0, len(spans), chunksize)]
+    archive.flush()
+    worker = functools.partial(_parse_archive_chunk, archive.path)
+    return _run(worker, chunks, workers, summary, locations)
+
+
+def _run(
+    worker: Callable[..., List[Any]],
+    chunks: List[Sequence[Any]],
+    workers: Optional[int],
+    summary: bool,
+    locations: Optional[PropertyLocations],
+) -> List[Any]:
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(chunks) <= 1:
+        results = [result for chunk in chunks for result in worker(chunk, summary)]
+    else:
+        with ProcessPoolExecutor(min(workers, len(chunks))) as pool:
+            results = list(itertools.chain.from_iterable(
+                pool.map(worker, chunks, itertools.repeat(summary))
+            ))
+
+    return _report(results, locations)
+
+
+def _report(results: List[Any], locations: Optional[PropertyLocations]) -> List[Any]:
+    failed = results.count(None)
+    if failed:
+        _LOGGER.warning("%d of %d documents could not be parsed", failed, len(results))
+    if locations is not None:
+        for result in results:
+            if isinstance(result, RiskSummary):
+                fsid, center = result.fsid, result.center
+            elif result is not None:
+                fsid, center = result['fsid'], result['center']
+            else:
+                continue
+            if fsid is not None and center is not None:
+                locations.update((fsid, 0), center)
+    return results
@@ -0,0 +1,130 @@
+"""Adapt how many requests a bulk fetch keeps in flight to what the API sustains."""
+import logging
+import threading
+import time
+from typing import Callable, NamedTuple, Optional
+
+_LOGGER = logging.getLogger(__name__)
+
+# Responses asking the client to slow down: throttled, or the server is struggling
+CONGESTION_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+# How fast the baseline latency follows slower responses (it drops to faster ones at once)
+BASELINE_DRIFT = 0.01
+# Latency increases below this many seconds are jitter, not queueing
+LATENCY_SLACK = 0.05
+
+
+def is_congestion(status_code: Optional[int]) -> bool:
+    """Return True if an HTTP status asks the client to send fewer requests."""
+    return status_code in CONGESTION_STATUS_CODES
+
+
+class Slot(NamedTuple):
+    """A request admitted by `AIMDLimiter.acquire`."""
+
+    started: float
+    saturations: int  # how often the limit had been reached before this request
+
+
+class AIMDLimiter:
+    """
+    An in-flight request limit adjusted by additive increase, multiplicative decrease.
+
+    While requests succeed with the limit reached, the limit grows by one
+    per limit's worth of responses, about one per round trip. A
+    congestion signal multiplies it by `backoff`:
+
+    - the caller reports a 429 or 5xx response, or
+    - a response takes `latency_tolerance` times the baseline latency or
+      longer. The baseline is the fastest recent response, so it tracks
+      the latency of an unloaded API.
+
+    The limit shrinks at most once per round trip. Requests already in
+    flight when it shrank were sent at the old limit, so their congestion
+    is not counted again. The limit is safe to share between threads.
+    """
+
+    def __init__(
+        self,
+        initial: int = 4,
+        min_limit: int = 1,
+        max_limit: int = 16,
+        backoff: float = 0.75,
+        latency_tolerance: float = 3.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        :param initial: Requests in flight to start with
+        :param min_limit: The limit never shrinks below this
+        :param max_limit: The limit never grows past this (e.g. the connection pool size)
+        :param backoff: Factor the limit is multiplied by on congestion; halving
+            (TCP's choice) leaves a throttling API idle for much of each cycle
+        :param latency_tolerance: Responses this many times slower than the baseline are congestion
+        :param clock: Monotonic clock, replaceable in tests
+        """
+        if not 1 <= min_limit <= initial <= max_limit:
+            raise ValueError("Limits must satisfy 1 <= min_limit <= initial <= max_limit")
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff = backoff
+        self.latency_tolerance = latency_tolerance
+        self._clock = clock
+        self._limit = initial
+        self._credits = 0  # responses toward the next increase
+        self._in_flight = 0
+        self._saturations = 0
+        self._baseline: Optional[float] = None
+        self._last_decrease = float("-inf")
+        self._condition = threading.Condition()
+
+    @property
+    def limit(self) -> int:
+        """How many requests may be in flight now."""
+        return self._limit
+
+    def acquire(self) -> Slot:
+        """Wait until a request may be sent and count it in flight."""
+        with self._condition:
+            while self._in_flight >= self.limit:
+                self._condition.wait()
+            slot = Slot(self._clock(), self._saturations)
+            self._in_flight += 1
+            if self._in_flight >= self.limit:
+                self._saturations += 1
+            return slot
+
+    def release(self, slot: Slot, congested: bool = False) -> None:
+        """
+        Count a request as finished and adjust the limit.
+
+        :param slot: What `acquire` returned for the request
+        :param congested: The response was a 429 or 5xx (see `is_congestion`)
+        """
+        now = self._clock()
+        with self._condition:
+            self._in_flight -= 1
+            # A fast 429 says nothing about how long the API takes to answer
+            if not congested:
+                congested = self._too_slow(now - slot.started)
+            if congested:
+                if slot.started >= self._last_decrease:
+                    self._limit = max(self.min_limit, int(self._limit * self.backoff))
+                    self._credits = 0
+                    self._last_decrease = now
+                    _LOGGER.debug("Congestion, lowering the concurrency limit to %d", self.limit)
+            elif self._saturations > slot.saturations and self._limit < self.max_limit:
+                # The limit was reached while the request was in flight: it held the API back
+                self._credits += 1
+                if self._credits >= self._limit:
+                    self._limit += 1
+                    self._credits = 0
+            self._condition.notify_all()
+
+    def _too_slow(self, latency: float) -> bool:
+        baseline = self._baseline
+        if baseline is None or latency < baseline:
+            self._baseline = latency
+            return False
+        self._baseline = baseline + (latency - baseline) * BASELINE_DRIFT
+        return latency >= baseline * self.latency_tolerance and latency - baseline >= LATENCY_SLACK
@@ -1,60 +1,294 @@
 from __future__ import annotations
 
+import asyncio
+import functools
+import logging
+from typing import Any, Callable, NamedTuple
+
 import voluptuous as vol
 from homeassistant import config_entries
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.data_entry_flow import FlowResult
 from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.selector import TextSelector, TextSelectorConfig
+
+from .buildings import parse_property_list, requested_building_id
+from .const import (
+    CONF_DECODER,
+    CONF_IMPORTANCE,
+    CONF_METRICS,
+    DATA_HEDGE_POLICY,
+    DATA_NEGATIVE_CACHE,
+    DATA_TRANSPORT,
+    DEFAULT_IMPORTANCE,
+    DOMAIN,
+    IMPORT_BATCH_SIZE,
+    IMPORT_CONCURRENCY,
+    IMPORTANCE_WEIGHTS,
+)
+from .firststreet_api import FirstStreetAPI, FirstStreetAPIError, FirstStreetPropertyNotFound, PropertyCheck
 
-from .const import DOMAIN
-from .firststreet_api import FirstStreetAPI, FirstStreetAPIError
+_LOGGER = logging.getLogger(__name__)
 
 STEP_USER_DATA_SCHEMA = vol.Schema(
     {
         vol.Required("fsid"): int,
         vol.Optional("building_id", default=0): int,
+        vol.Optional("all_buildings", default=False): bool,
+    }
+)
+
+STEP_BULK_DATA_SCHEMA = vol.Schema(
+    {
+        vol.Required("properties"): TextSelector(TextSelectorConfig(multiline=True)),
     }
 )
 
+def _create_api(hass: HomeAssistant) -> FirstStreetAPI:
+    domain_data = hass.data.get(DOMAIN, {})
+    return FirstStreetAPI(
+        metrics=domain_data.get(CONF_METRICS),
+        transport=domain_data.get(DATA_TRANSPORT),
+        decoder=domain_data.get(CONF_DECODER, "json"),
+        negative_cache=domain_data.get(DATA_NEGATIVE_CACHE),
+        hedge_policy=domain_data.get(DATA_HEDGE_POLICY),
+    )
+
+def _target(data: dict[str, Any]) -> tuple[int, int | None]:
+    return data["fsid"], requested_building_id(data)
+
+def _unique_id(data: dict[str, Any]) -> str:
+    fsid, building_id = _target(data)
+    return f"{fsid}_{'all' if building_id is None else building_id}"
+
 async def validate_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str, Any]:
     """Validate the user input allows us to connect."""
-    api = FirstStreetAPI()
+    api = _create_api(hass)
 
     try:
-        await hass.async_add_executor_job(api.get_all_risk_data, data["fsid"], data["building_id"])
+        await hass.async_add_executor_job(
+            api.get_all_risk_data, data["fsid"], requested_building_id(data)
+        )
+    except FirstStreetPropertyNotFound as err:
+        raise PropertyNotFound from err
     except FirstStreetAPIError as err:
         raise InvalidAuth from err
 
     return {"title": f"Property {data['fsid']}"}
 
+class ImportCheck(NamedTuple):
+    """Outcome of checking a list of properties to import."""
+
+    found: list[dict[str, Any]]  # entry data of the properties that exist
+    missing: list[PropertyCheck]  # not found, or `error` if they could not be checked
+    skipped: int  # already configured, or listed twice
+
+async def async_check_properties(
+    hass: HomeAssistant,
+    properties: list[dict[str, Any]],
+    progress: Callable[[int, int], None] | None = None,
+) -> ImportCheck:
+    """
+    Check which of many properties exist, without downloading their risk data.
+
+    Properties that already have a config entry are skipped without a request;
+    the rest are checked in batches by `FirstStreetAPI.check_properties`.
+    """
+    seen = {_target(entry.data) for entry in hass.config_entries.async_entries(DOMAIN)}
+    new = []
+    for data in properties:
+        if _target(data) not in seen:
+            seen.add(_target(data))
+            new.append(data)
+    api = _create_api(hass)
+    checks = await hass.async_add_executor_job(
+        functools.partial(
+            api.check_properties,
+            [_target(data) for data in new],
+            batch_size=IMPORT_BATCH_SIZE,
+            concurrency=IMPORT_CONCURRENCY,
+            progress=progress,
+        )
+    )
+    return ImportCheck(
+        found=[data for data, check in zip(new, checks) if check.found],
+        missing=[check for check in checks if not check.found],
+        skipped=len(properties) - len(new),
+    )
+
+async def async_create_entries(hass: HomeAssistant, properties: list[dict[str, Any]]) -> None:
+    """
+    Create a config entry for each checked property through `async_step_import`.
+
+    Each new entry starts setting up as soon as it is created, so the flows
+    run IMPORT_CONCURRENCY at a time rather than all at once.
+    """
+    for start in range(0, len(properties), IMPORT_CONCURRENCY):
+        await asyncio.gather(
+            *(
+                hass.config_entries.flow.async_init(
+                    DOMAIN, context={"source": config_entries.SOURCE_IMPORT}, data=data
+                )
+                for data in properties[start:start + IMPORT_CONCURRENCY]
+            )
+        )
+
+async def async_import_properties(hass: HomeAssistant, properties: list[dict[str, Any]]) -> None:
+    """Check and import the properties listed in YAML."""
+    result = await async_check_properties(hass, properties)
+    await async_create_entries(hass, result.found)
+    for check in result.missing:
+        if check.error:
+            _LOGGER.warning("Could not check FSID %s, not importing it: %s", check.fsid, check.error)
+        else:
+            _LOGGER.warning("FSID %s (building %s) was not found, not importing it", check.fsid, check.building_id)
+    if result.found:
+        _LOGGER.info("Imported %d properties", len(result.found))
+
 class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """Handle a config flow for FirstStreet."""
 
     VERSION = 1
 
+    def __init__(self) -> None:
+        self._properties: list[dict[str, Any]] = []
+        self._check_task: asyncio.Task | None = None
+
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
-        """Handle the initial step."""
+        """Offer adding one property or pasting a list of them."""
+        if user_input is None:
+            return self.async_show_menu(step_id="user", menu_options=["property", "bulk"])
+        return await self.async_step_property(user_input)
+
+    async def async_step_property(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Handle adding a single property."""
         errors: dict[str, str] = {}
         if user_input is None:
             return self.async_show_form(
-                step_id="user", data_schema=STEP_USER_DATA_SCHEMA
+                step_id="property", data_schema=STEP_USER_DATA_SCHEMA
             )
 
+        await self.async_set_unique_id(_unique_id(user_input))
+        self._abort_if_unique_id_configured()
         try:
             info = await validate_input(self.hass, user_input)
         except CannotConnect:
             errors["base"] = "cannot_connect"
         except InvalidAuth:
             errors["base"] = "invalid_auth"
+        except PropertyNotFound:
+            errors["base"] = "property_not_found"
         except Exception:  # pylint: disable=broad-except
             errors["base"] = "unknown"
         else:
             return self.async_create_entry(title=info["title"], data=user_input)
 
         return self.async_show_form(
-            step_id="user", data_schema=STEP_USER_DATA_SCHEMA, errors=errors
+            step_id="property", data_schema=STEP_USER_DATA_SCHEMA, errors=errors
+        )
+
+    async def async_step_bulk(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Handle a pasted list of properties (see `parse_property_list`)."""
+        errors: dict[str, str] = {}
+        if user_input is not None:
+            try:
+                self._properties = parse_property_list(user_input["properties"])
+            except ValueError:
+                errors["properties"] = "invalid_properties"
+            else:
+                if self._properties:
+                    return await self.async_step_bulk_check()
+                errors["properties"] = "no_properties"
+
+        return self.async_show_form(
+            step_id="bulk", data_schema=STEP_BULK_DATA_SCHEMA, errors=errors
+        )
+
+    async def async_step_bulk_check(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Show progress while the pasted properties are checked."""
+        if self._check_task is None:
+            self._check_task = self.hass.async_create_task(
+                async_check_properties(self.hass, self._properties, self._report_progress)
+            )
+        if not self._check_task.done():
+            return self.async_show_progress(
+                step_id="bulk_check",
+                progress_action="check_properties",
+                progress_task=self._check_task,
+            )
+        return self.async_show_progress_done(next_step_id="bulk_create")
+
+    def _report_progress(self, checked: int, total: int) -> None:
+        # Called from the executor threads running the checks
+        self.hass.loop.call_soon_threadsafe(
+            self.async_update_progress, checked / total if total else 1.0
+        )
+
+    async def async_step_bulk_create(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Create an entry for every property found, then summarize."""
+        try:
+            result = self._check_task.result()
+        except Exception:  # pylint: disable=broad-except
+            _LOGGER.exception("Checking the pasted properties failed")
+            return self.async_abort(reason="unknown")
+        await async_create_entries(self.hass, result.found)
+        return self.async_abort(
+            reason="bulk_imported",
+            description_placeholders={
+                "imported": str(len(result.found)),
+                "not_found": str(sum(1 for check in result.missing if not check.error)),
+                "failed": str(sum(1 for check in result.missing if check.error)),
+                "skipped": str(result.skipped),
+            },
+        )
+
+    async def async_step_import(self, import_data: dict[str, Any]) -> FlowResult:
+        """Create an entry for a property `async_check_properties` found."""
+        await self.async_set_unique_id(_unique_id(import_data))
+        self._abort_if_unique_id_configured()
+        return self.async_create_entry(title=f"Property {import_data['fsid']}", data=import_data)
+
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> OptionsFlowHandler:
+        """Get the options flow for this handler."""
+        return OptionsFlowHandler(config_entry)
+
+class OptionsFlowHandler(config_entries.OptionsFlow):
+    """Handle the options of a property: how urgently its refreshes are queued."""
+
+    def __init__(self, config_entry: config_entries.ConfigEntry) -> None:
+        self._config_entry = config_entry
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Pick the property's importance."""
+        if user_input is not None:
+            return self.async_create_entry(title="", data=user_input)
+
+        importance = self._config_entry.options.get(CONF_IMPORTANCE, DEFAULT_IMPORTANCE)
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(CONF_IMPORTANCE, default=importance): vol.In(
+                        list(IMPORTANCE_WEIGHTS)
+                    ),
+                }
+            ),
         )
 
 class CannotConnect(HomeAssistantError):
@@ -62,3 +296,6 @@ class CannotConnect(HomeAssistantError):
 
 class InvalidAuth(HomeAssistantError):
     """Error to indicate there is invalid auth."""
+
+class PropertyNotFound(HomeAssistantError):
+    """Error to indicate the FSID does not resolve to a property."""
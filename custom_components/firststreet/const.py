@@ -1,3 +1,83 @@
 """Constants for the FirstStreet integration."""
+from datetime import timedelta
 
-DOMAIN = "firststreet"
\ No newline at end of file
+DOMAIN = "firststreet"
+
+# YAML option enabling the client metrics endpoint
+CONF_METRICS = "metrics"
+METRICS_CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+# YAML options for tracing and profiling slow refreshes
+CONF_OPENTELEMETRY = "opentelemetry"
+CONF_SLOW_REFRESH_SECONDS = "slow_refresh_seconds"
+CONF_PROFILE_SLOWEST = "profile_slowest"
+CONF_PROFILER = "profiler"
+DEFAULT_SLOW_REFRESH_SECONDS = 10.0
+
+# YAML option to gzip request bodies carrying the full query text
+CONF_COMPRESS_REQUESTS = "compress_requests"
+# YAML option to multiplex requests over HTTP/2 (needs httpx[http2])
+CONF_HTTP2 = "http2"
+# YAML option to skip fields the parsers never read while decoding responses:
+# "stream" decodes them while they download (needs ijson), "msgspec" into
+# typed schemas (needs msgspec)
+CONF_DECODER = "decoder"
+# YAML option to send a duplicate of requests slower than the 95th
+# percentile latency and use whichever response arrives first, adding at
+# most 5% more requests
+CONF_HEDGE_REQUESTS = "hedge_requests"
+PROFILE_DIRECTORY = "firststreet_profiles"
+# YAML option: seconds to remember FSIDs the API reported as not found
+CONF_NOT_FOUND_TTL = "not_found_ttl"
+DEFAULT_NOT_FOUND_TTL = 6 * 3600
+
+# YAML list of properties to import as config entries, checked
+# IMPORT_BATCH_SIZE per request with IMPORT_CONCURRENCY requests at once,
+# then created IMPORT_CONCURRENCY entries at a time
+CONF_PROPERTIES = "properties"
+IMPORT_BATCH_SIZE = 50
+IMPORT_CONCURRENCY = 4
+
+# YAML options pacing the first fetch of each entry at startup: at most
+# CONF_SETUP_CONCURRENCY at once, spread over CONF_SETUP_WARMUP seconds.
+# Entries with stored data come up without waiting.
+CONF_SETUP_CONCURRENCY = "setup_concurrency"
+CONF_SETUP_WARMUP = "setup_warmup"
+DEFAULT_SETUP_CONCURRENCY = 4
+DEFAULT_SETUP_WARMUP = 60.0
+
+# Each entry stores its last property document in .storage/firststreet.<entry_id>
+STORAGE_VERSION = 1
+STORE_SAVE_DELAY = 30
+
+# Due refreshes are queued every REFRESH_CYCLE and run most urgent first,
+# REFRESH_CONCURRENCY at once. YAML option: requests per cycle (no limit
+# by default); refreshes past the budget wait for the next cycle.
+CONF_REFRESH_BUDGET = "refresh_budget"
+REFRESH_CYCLE = timedelta(minutes=5)
+REFRESH_CONCURRENCY = 4
+
+# Entry option weighing how urgently a property's refreshes are queued
+CONF_IMPORTANCE = "importance"
+DEFAULT_IMPORTANCE = "normal"
+IMPORTANCE_WEIGHTS = {"low": 0.5, "normal": 1.0, "high": 2.0, "critical": 4.0}
+
+# Keys of objects in hass.data[DOMAIN] shared by every config entry
+DATA_TRACER = "tracer"
+DATA_PROFILES = "profiles"
+DATA_TRANSPORT = "transport"
+DATA_NEGATIVE_CACHE = "negative_cache"
+DATA_SETUP_SCHEDULER = "setup_scheduler"
+DATA_REFRESH_QUEUE = "refresh_queue"
+DATA_HEDGE_POLICY = "hedge_policy"
+DATA_LOCATIONS = "locations"
+
+# How often each risk type is re-fetched. Flood and fire follow model
+# releases closely; heat and air change seasonally.
+RISK_REFRESH_INTERVALS = {
+    "flood": timedelta(hours=1),
+    "fire": timedelta(hours=1),
+    "wind": timedelta(days=1),
+    "heat": timedelta(days=90),
+    "air": timedelta(days=90),
+}
@@ -0,0 +1,212 @@
+"""The coordinator refreshing one property's risk data."""
+from __future__ import annotations
+
+import contextlib
+import logging
+import time
+
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.storage import Store
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    CONF_SLOW_REFRESH_SECONDS,
+    DATA_PROFILES,
+    DEFAULT_IMPORTANCE,
+    DEFAULT_SLOW_REFRESH_SECONDS,
+    DOMAIN,
+    IMPORTANCE_WEIGHTS,
+    RISK_REFRESH_INTERVALS,
+    STORE_SAVE_DELAY,
+)
+from .scheduler import refresh_priority
+from .tracing import TimingTracer, format_breakdown
+
+_LOGGER = logging.getLogger(__name__)
+
+class FirstStreetDataUpdateCoordinator(DataUpdateCoordinator):
+    """
+    Class to manage fetching FirstStreet data.
+
+    The coordinator does not schedule its own refreshes: the domain's
+    `RefreshQueue` calls `async_refresh_due` when `refresh_priority` puts it
+    within the cycle's request budget. Any other refresh, such as one
+    requested with `homeassistant.update_entity`, fetches every risk type.
+    """
+
+    def __init__(
+        self,
+        hass,
+        api,
+        fsid,
+        building_id,
+        store: Store | None = None,
+        entry_id: str | None = None,
+        importance: str = DEFAULT_IMPORTANCE,
+    ):
+        """Initialize."""
+        self.api = api
+        self.fsid = fsid
+        self.building_id = building_id
+        self.entry_id = entry_id
+        self.importance = importance
+        self._fetched_at = {}
+        self._due_only = False
+        self._store = store
+        domain_data = hass.data.get(DOMAIN, {})
+        self._slow_refresh_seconds = domain_data.get(
+            CONF_SLOW_REFRESH_SECONDS, DEFAULT_SLOW_REFRESH_SECONDS
+        )
+        self._profiles = domain_data.get(DATA_PROFILES)
+
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=DOMAIN,
+            update_interval=None,
+        )
+
+    async def async_restore(self) -> bool:
+        """
+        Load the data stored by the last successful refresh.
+
+        The restored data is published right away; the next refresh only
+        fetches the risk types that were due when it was stored.
+
+        :return: True if stored data was restored
+        """
+        if self._store is None:
+            return False
+        stored = await self._store.async_load()
+        if not stored:
+            return False
+        try:
+            data = await self.hass.async_add_executor_job(
+                self.api.restore_document, self.fsid, self.building_id, stored["document"]
+            )
+        except Exception:  # pylint: disable=broad-except
+            _LOGGER.warning("Ignoring unreadable stored data for property %s", self.fsid, exc_info=True)
+            return False
+        self._fetched_at = {
+            risk_type: fetched_at
+            for risk_type, value in stored.get("fetched_at", {}).items()
+            if (fetched_at := dt_util.parse_datetime(value)) is not None
+        }
+        self.async_set_updated_data(data)
+        return True
+
+    def _stored_data(self):
+        """Return what `async_restore` loads, as JSON."""
+        return {
+            "document": self.api.export_document(self.fsid, self.building_id),
+            "fetched_at": {
+                risk_type: fetched_at.isoformat()
+                for risk_type, fetched_at in self._fetched_at.items()
+            },
+        }
+
+    def _due_risk_types(self, now):
+        """Return the risk types whose refresh interval has elapsed."""
+        return [
+            risk_type
+            for risk_type, interval in RISK_REFRESH_INTERVALS.items()
+            if risk_type not in self._fetched_at or now - self._fetched_at[risk_type] >= interval
+        ]
+
+    def refresh_cost(self, now):
+        """Return how many requests a refresh would send now (0 if nothing is due)."""
+        due = self._due_risk_types(now)
+        if not due:
+            return 0
+        # One request per risk type, or one full fetch
+        return 1 if self._risk_types_to_fetch(due) is None else len(due)
+
+    def refresh_priority(self, now):
+        """Return how urgent a refresh is, for the `RefreshQueue`."""
+        overdue = max(
+            (
+                (now - self._fetched_at[risk_type]) / interval
+                if risk_type in self._fetched_at
+                else float("inf")
+            )
+            for risk_type, interval in RISK_REFRESH_INTERVALS.items()
+        )
+        return refresh_priority(
+            overdue,
+            IMPORTANCE_WEIGHTS.get(self.importance, 1.0),
+            self._in_use(),
+        )
+
+    def _in_use(self):
+        """Return True if an automation or script references one of the entry's entities."""
+        # Dashboards are not tracked: Home Assistant does not tell integrations what is on screen
+        from homeassistant.components.automation import automations_with_entity
+        from homeassistant.components.script import scripts_with_entity
+
+        if self.entry_id is None:
+            return False
+        registry = er.async_get(self.hass)
+        return any(
+            automations_with_entity(self.hass, entity.entity_id)
+            or scripts_with_entity(self.hass, entity.entity_id)
+            for entity in er.async_entries_for_config_entry(registry, self.entry_id)
+        )
+
+    def _risk_types_to_fetch(self, due):
+        """Return the risk types to pass to `get_all_risk_data`, None for all of them."""
+        # Fetch everything in one request when every risk type is due anyway
+        return None if len(due) == len(RISK_REFRESH_INTERVALS) else due
+
+    async def async_refresh_due(self) -> None:
+        """Refresh only the risk types that are due, if any."""
+        self._due_only = True
+        try:
+            await self.async_refresh()
+        finally:
+            self._due_only = False
+
+    async def _async_update_data(self):
+        """Fetch data from FirstStreet API: the due risk types for `async_refresh_due`, else all of them."""
+        now = dt_util.utcnow()
+        if self._due_only:
+            due = self._due_risk_types(now)
+            if self.data is not None and not due:
+                return self.data
+        else:
+            due = list(RISK_REFRESH_INTERVALS)
+        risk_types = self._risk_types_to_fetch(due)
+        try:
+            data, timings, elapsed = await self.hass.async_add_executor_job(
+                self._timed_fetch, risk_types
+            )
+        except Exception as err:
+            raise UpdateFailed(f"Error communicating with API: {err}")
+        if elapsed >= self._slow_refresh_seconds:
+            _LOGGER.warning(
+                "Refreshing property %s took %.3fs: %s",
+                self.fsid,
+                elapsed,
+                format_breakdown(timings),
+            )
+        for risk_type in due:
+            self._fetched_at[risk_type] = now
+        if self._store is not None:
+            self._store.async_delay_save(self._stored_data, STORE_SAVE_DELAY)
+        return data
+
+    def _timed_fetch(self, risk_types):
+        """Fetch in the executor, collecting the per-phase timings (and a profile if enabled)."""
+        tracer = self.api.tracer
+        with contextlib.ExitStack() as stack:
+            timings = (
+                stack.enter_context(tracer.capture())
+                if isinstance(tracer, TimingTracer)
+                else {}
+            )
+            if self._profiles is not None:
+                stack.enter_context(self._profiles.profile(f"refresh-{self.fsid}"))
+            start = time.perf_counter()
+            data = self.api.get_all_risk_data(self.fsid, self.building_id, risk_types)
+            elapsed = time.perf_counter() - start
+        return data, timings, elapsed
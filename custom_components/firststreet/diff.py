@@ -0,0 +1,193 @@
+"""Structural diffing of FirstStreet risk snapshots."""
+import hashlib
+import json
+import marshal
+from collections.abc import Mapping
+from typing import Any, Dict, Hashable, List, NamedTuple, Optional
+
+ADDED = "added"
+REMOVED = "removed"
+CHANGED = "changed"
+
+
+class RiskChange(NamedTuple):
+    """A single changed field inside one risk type."""
+
+    risk_type: str
+    field: str
+    kind: str
+    old: Any
+    new: Any
+
+
+class PortfolioDiff(NamedTuple):
+    """Changes between two portfolio snapshots keyed by property."""
+
+    added: List[Hashable]
+    removed: List[Hashable]
+    changed: Dict[Hashable, List[RiskChange]]
+
+
+class SnapshotDigest:
+    """Hashes of every sub-tree of one `get_all_risk_data` result.
+
+    Each field (factor, probability table, historic list, insights, ...) is
+    serialized and hashed exactly once. Risk-level and root hashes are derived
+    from the field hashes, so two digests can be compared top-down and whole
+    risk types skipped without touching their values again.
+    """
+
+    __slots__ = ("root", "risks", "fields")
+
+    def __init__(self, root: bytes, risks: Dict[str, bytes], fields: Dict[str, Dict[str, bytes]]):
+        self.root = root
+        self.risks = risks
+        self.fields = fields
+
+
+def _json_default(value: Any) -> Any:
+    """Serialize mappings that are not plain dicts (e.g. lazily parsed data)."""
+    if isinstance(value, Mapping):
+        return dict(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not hashable as JSON")
+
+
+def hash_subtree(value: Any) -> bytes:
+    """
+    Return a digest of a JSON-like value.
+
+    Values are serialized with marshal format 2, which has no back-references
+    and is several times faster than `json.dumps`. Dict key order is part of
+    the digest; `diff_risk_data` confirms mismatches by value, so a reordered
+    but equal sub-tree is never reported as changed.
+    """
+    try:
+        encoded = marshal.dumps(value, 2)
+    except ValueError:
+        encoded = json.dumps(
+            value, sort_keys=True, separators=(",", ":"), default=_json_default
+        ).encode("utf-8")
+    return hashlib.blake2b(encoded, digest_size=16).digest()
+
+
+def _combine(hashes: Dict[str, bytes]) -> bytes:
+    """Derive a parent hash from its children's hashes."""
+    combined = hashlib.blake2b(digest_size=16)
+    for key in sorted(hashes):
+        combined.update(key.encode("utf-8"))
+        combined.update(hashes[key])
+    return combined.digest()
+
+
+def digest_risk_data(data: Mapping) -> SnapshotDigest:
+    """
+    Hash every sub-tree of a `get_all_risk_data` result.
+
+    :param data: Mapping of risk type to parsed risk data
+    :return: The digest of the snapshot
+    """
+    fields: Dict[str, Dict[str, bytes]] = {}
+    risks: Dict[str, bytes] = {}
+    for risk_type, risk_data in data.items():
+        if isinstance(risk_data, Mapping):
+            field_hashes = {field: hash_subtree(value) for field, value in risk_data.items()}
+        else:
+            field_hashes = {"": hash_subtree(risk_data)}
+        fields[risk_type] = field_hashes
+        risks[risk_type] = _combine(field_hashes)
+    return SnapshotDigest(_combine(risks), risks, fields)
+
+
+def _field_value(risk_data: Any, field: str) -> Any:
+    """Look up a field, treating non-mapping risk data as a single field."""
+    if field == "" or not isinstance(risk_data, Mapping):
+        return risk_data
+    return risk_data.get(field)
+
+
+def diff_risk_data(
+    old: Mapping,
+    new: Mapping,
+    old_digest: Optional[SnapshotDigest] = None,
+    new_digest: Optional[SnapshotDigest] = None,
+) -> List[RiskChange]:
+    """
+    Compute the changes between two `get_all_risk_data` results.
+
+    :param old: The previous snapshot
+    :param new: The current snapshot
+    :param old_digest: Precomputed digest of `old`, if available
+    :param new_digest: Precomputed digest of `new`, if available
+    :return: List of changes, empty when the snapshots are identical
+    """
+    old_digest = old_digest or digest_risk_data(old)
+    new_digest = new_digest or digest_risk_data(new)
+    if old_digest.root == new_digest.root:
+        return []
+
+    changes: List[RiskChange] = []
+    for risk_type in sorted(old_digest.risks.keys() | new_digest.risks.keys()):
+        old_hash = old_digest.risks.get(risk_type)
+        new_hash = new_digest.risks.get(risk_type)
+        if old_hash == new_hash:
+            continue
+
+        old_risk = old.get(risk_type)
+        new_risk = new.get(risk_type)
+        old_fields = old_digest.fields.get(risk_type, {})
+        new_fields = new_digest.fields.get(risk_type, {})
+        for field in sorted(old_fields.keys() | new_fields.keys()):
+            if field not in old_fields:
+                kind = ADDED
+            elif field not in new_fields:
+                kind = REMOVED
+            elif old_fields[field] != new_fields[field]:
+                if _field_value(old_risk, field) == _field_value(new_risk, field):
+                    continue
+                kind = CHANGED
+            else:
+                continue
+            changes.append(RiskChange(
+                risk_type,
+                field,
+                kind,
+                _field_value(old_risk, field) if kind != ADDED else None,
+                _field_value(new_risk, field) if kind != REMOVED else None,
+            ))
+    return changes
+
+
+class SnapshotDiffer:
+    """Diff successive portfolio snapshots, hashing each snapshot only once.
+
+    The digests of the last snapshot are kept, so comparing a new model
+    release against the previous one only hashes the new data.
+    """
+
+    def __init__(self):
+        self._snapshots: Dict[Hashable, Mapping] = {}
+        self._digests: Dict[Hashable, SnapshotDigest] = {}
+
+    def update(self, portfolio: Mapping) -> PortfolioDiff:
+        """
+        Compare a portfolio snapshot against the previous one and remember it.
+
+        :param portfolio: Mapping of property key (e.g. `(fsid, building_id)`)
+            to its `get_all_risk_data` result
+        :return: The portfolio diff
+        """
+        digests = {key: digest_risk_data(data) for key, data in portfolio.items()}
+        added = [key for key in portfolio if key not in self._snapshots]
+        removed = [key for key in self._snapshots if key not in portfolio]
+        changed: Dict[Hashable, List[RiskChange]] = {}
+        for key, digest in digests.items():
+            previous = self._digests.get(key)
+            if previous is None or previous.root == digest.root:
+                continue
+            changes = diff_risk_data(self._snapshots[key], portfolio[key], previous, digest)
+            if changes:
+                changed[key] = changes
+
+        self._snapshots = dict(portfolio)
+        self._digests = digests
+        return PortfolioDiff(added, removed, changed)
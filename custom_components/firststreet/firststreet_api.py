@@ -1,82 +1,601 @@
 """FirstStreet API SDK."""
-import requests
+from __future__ import annotations
+
+import contextlib
 import json
-from typing import Dict, List, Any
+import threading
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, List, Any, NamedTuple, Optional, Sequence, Tuple
 import logging
-from .property_queries import PROPERTY_BY_FSID_QUERY
-from pprint import pprint
+from .buildings import parse_buildings
+from .interning import intern_enumerations
+from .metrics import ClientMetrics
+from .projection import ProjectedDecoder, ProjectionDecodeError
+from .response_cache import CachedResponse, NegativeCache, ResponseCache, body_digest
+from .spatial import PropertyIndex, PropertyLocations, centroid_from_geometry
+from .streaming import StreamDecodeError, StreamDecoder, iter_body
+from .tracing import SPAN_PREFIX, Tracer, phase
+from .transport import TransportConfig, compress_body, create_session, response_status, shared_session, transport_errors
+from .validation import describe, invalid_risk_types, validate_property, validate_response
+
+if TYPE_CHECKING:
+    import requests
+
+    from .concurrency import AIMDLimiter
+    from .hedging import HedgePolicy
+    from .property_queries import QueryDocument
 
 _LOGGER = logging.getLogger(__name__)
 
 
+# Loading the integration must not pay for the HTTP stack or the query
+# text; both are only imported by the first fetch, in the executor (see
+# `transport.create_session` and the function-level `property_queries`
+# imports).
+
+
 class FirstStreetAPIError(Exception):
     """Exception raised for errors in the FirstStreet API."""
 
-    def __init__(self, message: str, details: Any = None):
-        """Initialize the exception with a message and optional details."""
+    def __init__(self, message: str, details: Any = None, status_code: Optional[int] = None, log: bool = True):
+        """
+        Initialize the exception with a message, optional details and the HTTP status, if any.
+
+        :param log: Log the error; off for errors that were already logged
+            when they first occurred, such as negative cache hits
+        """
         self.message = message
         self.details = details
+        self.status_code = status_code
         super().__init__(self.message)
 
         # Log the error
-        _LOGGER.error("FirstStreetAPIError: %s", self.message)
-        if self.details:
-            _LOGGER.error("Error details: %s", self.details)
+        if log:
+            _LOGGER.error("FirstStreetAPIError: %s", self.message)
+            if self.details:
+                _LOGGER.error("Error details: %s", self.details)
+
+
+class FirstStreetPropertyNotFound(FirstStreetAPIError):
+    """The FSID (and building ID) did not resolve to a property."""
+
+
+class PropertyCheck(NamedTuple):
+    """Whether one FSID (and building ID) passed to `check_properties` exists."""
+
+    fsid: int
+    building_id: Optional[int]
+    found: bool
+    error: Optional[str] = None  # why it could not be checked; `found` is then False
+
+
+class PropertyFetch(NamedTuple):
+    """The result of fetching one FSID (and building ID) in `fetch_properties`."""
+
+    fsid: int
+    building_id: Optional[int]
+    data: Optional[Dict[str, Any]]  # as `get_property_data` returns it
+    error: Optional[FirstStreetAPIError] = None  # why `data` is None
+
+
+def build_request_body(
+    document: QueryDocument, variables: Dict[str, Any], send_query: bool = True, send_hash: bool = False
+) -> bytes:
+    """
+    Serialize a GraphQL request without re-encoding the query text.
+
+    :param document: The precompiled query document
+    :param variables: The query variables
+    :param send_query: Include the full query text
+    :param send_hash: Include the Automatic Persisted Queries extension
+    :return: The JSON request body
+    """
+    parts = []
+    if send_query:
+        parts.append(f'"query":{document.encoded}')
+    parts.append(f'"variables":{json.dumps(variables)}')
+    if send_hash:
+        parts.append(
+            '"extensions":{"persistedQuery":{"version":1,"sha256Hash":"%s"}}' % document.sha256
+        )
+    return ("{" + ",".join(parts) + "}").encode("utf-8")
+
+
+def is_persisted_query_miss(data: Dict[str, Any]) -> bool:
+    """Return True if the server does not know a persisted query hash yet."""
+    for error in data.get('errors') or []:
+        if not isinstance(error, dict):
+            continue
+        code = (error.get('extensions') or {}).get('code')
+        if code == 'PERSISTED_QUERY_NOT_FOUND' or error.get('message') == 'PersistedQueryNotFound':
+            return True
+    return False
+
 
 class FirstStreetAPI:
-    def __init__(self, base_url: str = "https://firststreet.org/"):
+    def __init__(
+        self,
+        base_url: str = "https://firststreet.org/",
+        persisted_queries: bool = False,
+        metrics: Optional[ClientMetrics] = None,
+        tracer: Optional[Tracer] = None,
+        transport: Optional[TransportConfig] = None,
+        cache_responses: bool = False,
+        decoder: str = "json",
+        negative_cache: Optional[NegativeCache] = None,
+        tolerant: bool = False,
+        hedge_policy: Optional[HedgePolicy] = None,
+        locations: Optional[PropertyLocations] = None,
+    ):
+        """
+        Initialize the client.
+
+        :param base_url: The FirstStreet site to query
+        :param persisted_queries: Send only the query hash (Automatic Persisted
+            Queries) and fall back to the full text when the server misses it
+        :param metrics: Record request, decode and parse metrics here (default is off)
+        :param tracer: Open a span around each phase of a fetch (default is off)
+        :param transport: Pool and compression settings; clients given equal
+            configs share one session (default is a private session)
+        :param cache_responses: Send conditional requests and return the
+            previously decoded and parsed objects when a response is unchanged
+        :param decoder: "json" decodes whole responses; "stream" decodes them
+            while they download, keeping only the property fields the parsers
+            read (needs ijson); "msgspec" decodes whole responses into typed
+            schemas of the fields the parsers read, skipping the rest in C
+            (needs msgspec)
+        :param negative_cache: Remember properties that were not found and
+            fail further fetches of them without a request (default is off)
+        :param tolerant: Parse risk types missing fields the parsers read as
+            None instead of failing the whole property
+        :param hedge_policy: Send a duplicate of requests slower than the
+            policy's latency percentile and use the first response (default is off)
+        :param locations: Record the centroid of every fetched property here;
+            clients sharing it search the whole portfolio (default is private)
+        :raises ValueError: If the decoder is unknown
+        """
+        if decoder not in ("json", "stream", "msgspec"):
+            raise ValueError(f"Unknown decoder: {decoder}")
         self.base_url = base_url
-        self.session = requests.Session()
-        self.session.headers.update({
-            "Content-Type": "application/json; charset=utf-8"
-        })
+        self.persisted_queries = persisted_queries
+        self.metrics = metrics
+        self.tracer = tracer
+        self.transport = transport or TransportConfig()
+        self._shared_transport = transport is not None
+        self._plain_bodies = False
+        self._session = None
+        self._request_errors: Optional[Tuple[type, ...]] = None
+        self.response_cache = ResponseCache() if cache_responses else None
+        self.stream_decoder = StreamDecoder() if decoder == "stream" else None
+        self.projected_decoder = ProjectedDecoder() if decoder == "msgspec" else None
+        self.negative_cache = negative_cache
+        self.tolerant = tolerant
+        self.hedge_policy = hedge_policy
+        self.locations = locations if locations is not None else PropertyLocations()
+        self._documents: Dict[Tuple[int, Optional[int]], Dict[str, Any]] = {}
+        # Last partial document per (fsid, building_id, risk type), and the
+        # parsed result of each full document, for unchanged refreshes
+        self._partials: Dict[Tuple[int, Optional[int], str], Dict[str, Any]] = {}
+        self._parsed: Dict[Tuple[int, Optional[int]], Tuple[Dict[str, Any], Dict[str, Any]]] = {}
+
+    @property
+    def session(self) -> requests.Session:
+        """HTTP session (or HTTP/2 equivalent), created on first use."""
+        if self._session is None:
+            if self._shared_transport:
+                self._session = shared_session(self.transport)
+            else:
+                self._session = create_session(self.transport)
+        return self._session
+
+    @session.setter
+    def session(self, session: requests.Session) -> None:
+        self._session = session
+
+    @property
+    def request_errors(self) -> Tuple[type, ...]:
+        """Exceptions the configured transport raises when a request fails."""
+        if self._request_errors is None:
+            self._request_errors = transport_errors(self.transport)
+        return self._request_errors
+
+    def _load_transport(self) -> None:
+        """Import the HTTP stack and create the session before worker threads race to."""
+        self.session
+        self.request_errors
+
+    def _phase(
+        self,
+        name: str,
+        histogram: Optional[str] = None,
+        attributes: Optional[Dict[str, Any]] = None,
+        **labels: str,
+    ):
+        """
+        Trace a phase of a fetch and time it into a client histogram.
+
+        Either hook is skipped when it is not configured, so an uninstrumented
+        client pays no more than two None checks per phase.
+        """
+        span = self.tracer.start_span(SPAN_PREFIX + name, attributes) if self.tracer is not None else None
+        timer = getattr(self.metrics, histogram).time(**labels) if histogram and self.metrics is not None else None
+        return phase(span, timer)
+
+    def _execute(self, document: QueryDocument, variables: Dict[str, Any], project: bool = True) -> Dict[str, Any]:
+        """
+        Send a query, using its persisted hash first when enabled.
+
+        :param project: Let the `stream` and `msgspec` decoders keep only the
+            `data.property` fields the parsers read; other queries decode whole
+        """
+        endpoint = f"{self.base_url}api/fsfapi/"
+        _LOGGER.debug("API Request: query %s, variables %s", document.sha256, variables)
+
+        if self.persisted_queries:
+            data = self._post(
+                endpoint, build_request_body(document, variables, send_query=False, send_hash=True), project
+            )
+            if not is_persisted_query_miss(data):
+                return data
+            _LOGGER.debug("Persisted query %s not found, sending full query", document.sha256)
+            if self.metrics is not None:
+                self.metrics.retries.inc(reason="persisted_query_miss")
+
+        return self._post(endpoint, build_request_body(document, variables, send_hash=self.persisted_queries), project)
+
+    def _post(self, endpoint: str, body: bytes, project: bool = True, conditional: bool = True) -> Dict[str, Any]:
+        """
+        Send a request body and decode the response.
+
+        With the response cache on, an unchanged response (304, or a body
+        hashing to the cached one) returns the cached decoded object itself.
+        A 304 with nothing cached to return is answered by sending the
+        request again unconditionally. With the streaming decoder, the body
+        is decoded as it downloads.
+
+        :param conditional: Send the cached response's validators; False
+            asks the server and any caches in between for a full response
+        """
+        headers = {}
+        cache_key = cached = None
+        if self.response_cache is not None:
+            cache_key = self.response_cache.key(endpoint, body)
+            if conditional:
+                cached = self.response_cache.get(cache_key)
+        if cached is not None:
+            headers.update(cached.conditional_headers())
+        if not conditional:
+            headers['Cache-Control'] = 'no-cache'
+        payload = body
+        compression = None
+        if not self._plain_bodies:
+            payload, compression = compress_body(body, self.transport)
+            if compression is not None:
+                headers.update(compression)
+        options = {}
+        if headers:
+            options['headers'] = headers
+        streaming = project and self.stream_decoder is not None
+        if streaming:
+            options['stream'] = True
+        with self._phase('request', 'request_duration'):
+            if self.hedge_policy is None:
+                response = self.session.post(endpoint, data=payload, timeout=self.transport.timeout, **options)
+            else:
+                response = self.hedge_policy.send(
+                    lambda: self.session.post(endpoint, data=payload, timeout=self.transport.timeout, **options),
+                    self._count_hedge,
+                )
+        if compression is not None and response.status_code == 415:
+            _LOGGER.debug("Server does not accept compressed request bodies, sending them as is")
+            self._plain_bodies = True
+            response.close()
+            return self._post(endpoint, body, project, conditional)
+        if cached is None and response.status_code == 304:
+            # Nothing to reuse, e.g. a cache or proxy in between revalidated
+            # on its own; an empty body must not reach the decoder
+            response.close()
+            if not conditional:
+                raise FirstStreetAPIError(
+                    "API answered 304 Not Modified to an unconditional request", status_code=304
+                )
+            _LOGGER.debug("Got 304 Not Modified without a cached response, sending the request unconditionally")
+            return self._post(endpoint, body, project, conditional=False)
+        if streaming:
+            with contextlib.closing(response):
+                return self._receive_streamed(response, cache_key, cached)
+        if self.metrics is not None:
+            self.metrics.response_bytes.observe(len(response.content))
+        if cached is not None and response.status_code == 304:
+            self._count_cache("response", "not_modified")
+            return cached.data
+        response.raise_for_status()
+        digest = None
+        if cache_key is not None:
+            digest = body_digest(response.content)
+            if cached is not None and digest == cached.body_hash:
+                self._count_cache("response", "unchanged")
+                return cached.data
+        with self._phase('decode', 'decode_duration'):
+            if not project or self.projected_decoder is None:
+                data = response.json()
+            else:
+                try:
+                    data = self.projected_decoder.decode(response.content)
+                except ProjectionDecodeError as err:
+                    raise FirstStreetAPIError(f"Could not decode the API response: {err}", str(err)) from err
+        return self._decoded(response, data, cache_key, digest)
 
-    def get_property_data(self, fsid: int, building_id: int = 0) -> Dict[str, Any]:
+    def _receive_streamed(
+        self, response: Any, cache_key: Optional[bytes], cached: Optional[CachedResponse]
+    ) -> Dict[str, Any]:
+        """Decode a streamed response as it downloads; see `_post`."""
+        if cached is not None and response.status_code == 304:
+            self._count_cache("response", "not_modified")
+            return cached.data
+        response.raise_for_status()
+        decoder = self.stream_decoder
+        with self._phase('decode', 'decode_duration'):
+            try:
+                body = decoder.decode(iter_body(response, decoder.chunk_size))
+            except StreamDecodeError as err:
+                raise FirstStreetAPIError(f"Could not decode the API response: {err}", str(err)) from err
+        if self.metrics is not None:
+            self.metrics.response_bytes.observe(body.size)
+        if cached is not None and body.body_hash == cached.body_hash:
+            self._count_cache("response", "unchanged")
+            return cached.data
+        return self._decoded(response, body.data, cache_key, body.body_hash)
+
+    def _decoded(
+        self, response: Any, data: Dict[str, Any], cache_key: Optional[bytes], digest: Optional[bytes]
+    ) -> Dict[str, Any]:
+        """Remember a freshly decoded response and return it."""
+        if cache_key is not None:
+            self._count_cache("response", "miss")
+            self.response_cache.store(cache_key, response, digest, data)
+        if _LOGGER.isEnabledFor(logging.DEBUG):
+            _LOGGER.debug("API Response: %s", json.dumps(data, indent=2))
+        return data
+
+    def _count_hedge(self) -> None:
+        if self.metrics is not None:
+            self.metrics.retries.inc(reason="hedge")
+
+    def _count_cache(self, cache: str, result: str) -> None:
+        if self.metrics is not None:
+            self.metrics.cache.inc(cache=cache, result=result)
+
+    def get_property_data(
+        self, fsid: int, building_id: Optional[int] = 0, query: Optional[QueryDocument] = None
+    ) -> Dict[str, Any]:
         """
         Fetch property data from the FirstStreet API.
 
         :param fsid: The FirstStreet ID of the property
-        :param building_id: The building ID (default is 0)
+        :param building_id: The building ID (default is 0), or None for every building
+        :param query: The compiled GraphQL query to run (default is the full property query)
         :return: Parsed JSON response
+        :raises FirstStreetPropertyNotFound: If the property does not exist, or
+            was recently reported missing to a client sharing the negative cache
         :raises FirstStreetAPIError: If the API returns an error or unexpected data
         """
-        endpoint = f"{self.base_url}api/fsfapi/"
-        
+        if self.negative_cache is not None:
+            not_found = self.negative_cache.get(fsid, building_id)
+            if not_found is not None:
+                self._count_cache("negative", "hit")
+                # Logged when the miss was cached, not again on every hit
+                raise FirstStreetPropertyNotFound("Property data is None", not_found.details, log=False)
+
+        if query is None:
+            from .property_queries import PROPERTY_BY_FSID_DOCUMENT
+            query = PROPERTY_BY_FSID_DOCUMENT
+
         variables = {
             "fsid": str(fsid),
-            "buildingId": str(building_id)
-        }
-        
-        payload = {
-            "query": PROPERTY_BY_FSID_QUERY,
-            "variables": variables
+            "buildingId": str(building_id) if building_id is not None else None
         }
-        _LOGGER.debug("API Request: %s", json.dumps(payload, indent=2))
-        
+
         try:
-            response = self.session.post(endpoint, json=payload)
-            response.raise_for_status()
-            data = response.json()
-            
-            _LOGGER.debug("API Response: %s", json.dumps(data, indent=2))
-            
+            with self._phase('get_property_data', attributes={'fsid': fsid, 'query': query.sha256}):
+                property_data = self._fetch_property(query, variables)
+        except FirstStreetAPIError as err:
+            if self.negative_cache is not None and isinstance(err, FirstStreetPropertyNotFound):
+                self.negative_cache.add(fsid, building_id, err.details)
+            if self.metrics is not None:
+                cause = err.__context__ if isinstance(err.__context__, self.request_errors) else err
+                self.metrics.requests.inc(outcome="error")
+                self.metrics.errors.inc(error_class=type(cause).__name__)
+            raise
+        if self.metrics is not None:
+            self.metrics.requests.inc(outcome="success")
+        return property_data
+
+    def _fetch_property(self, query: QueryDocument, variables: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            data = self._execute(query, variables)
+        except self.request_errors as e:
+            raise FirstStreetAPIError(f"Request to FirstStreet API failed: {str(e)}", str(e), response_status(e))
+
+        with self._phase('validate'):
             if 'errors' in data:
                 raise FirstStreetAPIError("API returned an error", data['errors'])
-            
-            if 'data' not in data:
-                raise FirstStreetAPIError("Unexpected API response structure: 'data' key missing", data)
-            
-            if 'property' not in data['data']:
-                raise FirstStreetAPIError("Unexpected API response structure: 'property' key missing", data['data'])
-            
+            problems = validate_response(data)
+            if problems:
+                raise FirstStreetAPIError(f"Unexpected API response structure: {describe(problems)}", problems)
             if data['data']['property'] is None:
-                raise FirstStreetAPIError("Property data is None", data['data'])
-            
+                raise FirstStreetPropertyNotFound("Property data is None", data['data'])
             return data['data']['property']
-        except requests.RequestException as e:
-            raise FirstStreetAPIError(f"Request to FirstStreet API failed: {str(e)}", str(e))
 
 
+    def check_properties(
+        self,
+        targets: Sequence[Tuple[int, Optional[int]]],
+        batch_size: int = 50,
+        concurrency: int = 4,
+        progress: Optional[Callable[[int, int], None]] = None,
+    ) -> List[PropertyCheck]:
+        """
+        Check that many properties exist without downloading their risk data.
+
+        Targets are checked `batch_size` at a time, each batch one small query
+        with an alias per target, and up to `concurrency` batches at once.
+        Targets in the negative cache are reported missing without a request,
+        and missing ones are added to it. A building ID of None or 0 only
+        checks the property.
+
+        :param targets: (FSID, building ID) pairs
+        :param progress: Called with (targets checked, total) as batches finish,
+            from a worker thread
+        :return: One check per target, in order; failed batches set `error`
+        """
+        from concurrent.futures import ThreadPoolExecutor, as_completed
+
+        checks: List[Optional[PropertyCheck]] = [None] * len(targets)
+        pending = []
+        for index, (fsid, building_id) in enumerate(targets):
+            if self.negative_cache is not None and self.negative_cache.get(fsid, building_id) is not None:
+                self._count_cache("negative", "hit")
+                checks[index] = PropertyCheck(fsid, building_id, False)
+            else:
+                pending.append(index)
+        done = len(targets) - len(pending)
+        if progress is not None:
+            progress(done, len(targets))
+        batches = [pending[start:start + batch_size] for start in range(0, len(pending), batch_size)]
+        if batches:
+            self._load_transport()
+            with ThreadPoolExecutor(min(concurrency, len(batches))) as pool:
+                futures = {
+                    pool.submit(self._check_batch, [targets[index] for index in batch]): batch for batch in batches
+                }
+                for future in as_completed(futures):
+                    batch = futures[future]
+                    for index, check in zip(batch, future.result()):
+                        checks[index] = check
+                    done += len(batch)
+                    if progress is not None:
+                        progress(done, len(targets))
+        return checks
+
+    def _check_batch(self, batch: List[Tuple[int, Optional[int]]]) -> List[PropertyCheck]:
+        from .property_queries import exists_document
+
+        variables: Dict[str, Any] = {}
+        for index, (fsid, building_id) in enumerate(batch):
+            variables[f"fsid{index}"] = str(fsid)
+            variables[f"buildingId{index}"] = str(building_id) if building_id is not None else None
+        try:
+            with self._phase('check_properties', attributes={'count': len(batch)}):
+                data = self._execute(exists_document(len(batch)), variables, project=False)
+        except self.request_errors as err:
+            return self._failed_batch(batch, f"Request to FirstStreet API failed: {err}")
+        except FirstStreetAPIError as err:
+            return self._failed_batch(batch, err.message)
+        if self.metrics is not None:
+            self.metrics.requests.inc(outcome="success")
+
+        # Errors with a path belong to one alias; others to the whole batch
+        errors: Dict[Optional[str], str] = {}
+        for error in data.get('errors') or []:
+            if isinstance(error, dict):
+                path = error.get('path') or [None]
+                errors.setdefault(path[0], str(error.get('message', error)))
+        found = data.get('data') or {}
+        checks = []
+        for index, (fsid, building_id) in enumerate(batch):
+            alias = f"p{index}"
+            node = found.get(alias)
+            if node is None and (alias in errors or alias not in found):
+                error = errors.get(alias) or errors.get(None) or "Property missing from the API response"
+                checks.append(PropertyCheck(fsid, building_id, False, error))
+                continue
+            exists = node is not None and (
+                not building_id or ((node.get('buildingConnection') or {}).get('totalCount') or 0) > 0
+            )
+            if not exists and self.negative_cache is not None:
+                self.negative_cache.add(fsid, building_id, {alias: node})
+            checks.append(PropertyCheck(fsid, building_id, exists))
+        return checks
+
+    def _failed_batch(self, batch: List[Tuple[int, Optional[int]]], error: str) -> List[PropertyCheck]:
+        if self.metrics is not None:
+            self.metrics.requests.inc(outcome="error")
+        return [PropertyCheck(fsid, building_id, False, error) for fsid, building_id in batch]
+
+    def fetch_properties(
+        self,
+        targets: Sequence[Tuple[int, Optional[int]]],
+        query: Optional[QueryDocument] = None,
+        limiter: Optional[AIMDLimiter] = None,
+        retries: int = 3,
+        progress: Optional[Callable[[int, int], None]] = None,
+    ) -> List[PropertyFetch]:
+        """
+        Fetch many properties with `get_property_data`, as many at once as the API sustains.
+
+        How many requests are in flight is left to `limiter`, which grows
+        the limit while responses come back fast and cuts it on 429 and 5xx
+        responses or rising latency. Requests answered with 429 or 5xx are
+        sent again, up to `retries` times. Targets in the negative cache
+        are reported missing without a request. Responses with a geometry
+        are recorded in `locations`.
+
+        :param targets: (FSID, building ID) pairs
+        :param query: The compiled GraphQL query to run (default is the full property query)
+        :param limiter: The concurrency limit (default starts at 4, up to the connection pool size)
+        :param retries: How often a throttled request is sent again
+        :param progress: Called with (targets fetched, total) as they finish, from a worker thread
+        :return: One result per target, in order
+        """
+        from concurrent.futures import ThreadPoolExecutor
+        from .concurrency import AIMDLimiter, is_congestion
+
+        if limiter is None:
+            limiter = AIMDLimiter(initial=min(4, self.transport.pool_maxsize), max_limit=self.transport.pool_maxsize)
+        results: List[Optional[PropertyFetch]] = [None] * len(targets)
+        pending = []
+        for index, (fsid, building_id) in enumerate(targets):
+            not_found = self.negative_cache.get(fsid, building_id) if self.negative_cache is not None else None
+            if not_found is not None:
+                self._count_cache("negative", "hit")
+                error = FirstStreetPropertyNotFound("Property data is None", not_found.details, log=False)
+                results[index] = PropertyFetch(fsid, building_id, None, error)
+            else:
+                pending.append(index)
+        done = [len(targets) - len(pending)]
+        lock = threading.Lock()
+
+        def fetch(index: int) -> None:
+            fsid, building_id = targets[index]
+            for attempt in range(retries + 1):
+                slot = limiter.acquire()
+                congested = False
+                try:
+                    data = self.get_property_data(fsid, building_id, query)
+                    results[index] = PropertyFetch(fsid, building_id, data)
+                    if 'geometry' in data:
+                        self._locate(fsid, building_id, data)
+                except FirstStreetAPIError as err:
+                    congested = is_congestion(err.status_code)
+                    results[index] = PropertyFetch(fsid, building_id, None, err)
+                finally:
+                    limiter.release(slot, congested)
+                if not congested or attempt == retries:
+                    break
+                if self.metrics is not None:
+                    self.metrics.retries.inc(reason="throttled")
+            with lock:
+                done[0] += 1
+                if progress is not None:
+                    progress(done[0], len(targets))
+
+        if pending:
+            self._load_transport()
+            # Workers for the largest limit; the limiter decides how many send at once
+            with ThreadPoolExecutor(min(limiter.max_limit, len(pending))) as pool:
+                list(pool.map(fetch, pending))
+        return results
+
     def parse_flood_data(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Parse flood-related data from the API response."""
         flood_data = data['flood']
@@ -152,30 +671,206 @@ class FirstStreetAPI:
             'percentile': air_data['percentile']
         }
 
-    def get_all_risk_data(self, fsid: int, building_id: int = 0) -> Dict[str, Any]:
+    def parse_location_data(self, data: Dict[str, Any], building_id: int = 0) -> Dict[str, Any]:
+        """Parse the centroid and footprint of the property or one of its buildings."""
+        center = centroid_from_geometry(data.get('geometry'))
+        if building_id:
+            for edge in (data.get('buildingConnection') or {}).get('edges') or []:
+                node = edge.get('node') or {}
+                if node.get('buildingId') == building_id:
+                    center = centroid_from_geometry(node.get('geometry')) or center
+                    break
+        return {
+            'fsid': data.get('fsid'),
+            'center': center,
+            'footprint': data.get('footprint')
+        }
+
+    def _locate(self, fsid: int, building_id: Optional[int], property_data: Dict[str, Any]) -> None:
+        """Record the centroid of a fetched property; all buildings and building 0 share the property's."""
+        center = self.parse_location_data(property_data, building_id)['center']
+        self.locations.update((fsid, building_id or 0), center)
+
+    @property
+    def spatial_index(self) -> PropertyIndex:
+        """Spatial index over the centroids of every property fetched by clients sharing `locations`."""
+        return self.locations.index
+
+    def properties_within(self, lon: float, lat: float, radius_km: float) -> List[Tuple[Tuple[int, int], float]]:
+        """
+        Find fetched properties within a distance of a point, e.g. a TRI facility.
+
+        :param lon: Longitude of the point
+        :param lat: Latitude of the point
+        :param radius_km: Search radius in kilometres
+        :return: `((fsid, building_id), distance_km)` pairs sorted by distance
+        """
+        return self.spatial_index.within_radius(lon, lat, radius_km)
+
+    @staticmethod
+    def merge_property_data(cached: Dict[str, Any], partial: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Merge a partial property document (e.g. one risk type) into a cached one.
+
+        Buildings are matched by `buildingId`; the cached document is not modified.
+        """
+        merged = dict(cached)
+        for key, value in partial.items():
+            if key == 'buildingConnection' and cached.get(key) and value:
+                partial_nodes = {
+                    edge['node']['buildingId']: edge['node'] for edge in value.get('edges') or []
+                }
+                edges = []
+                for edge in cached[key].get('edges') or []:
+                    node = edge['node']
+                    if node['buildingId'] in partial_nodes:
+                        node = {**node, **partial_nodes[node['buildingId']]}
+                    edges.append({**edge, 'node': node})
+                merged[key] = {**cached[key], 'edges': edges}
+            else:
+                merged[key] = value
+        return merged
+
+    def get_all_risk_data(
+        self, fsid: int, building_id: Optional[int] = 0, risk_types: Optional[Iterable[str]] = None
+    ) -> Dict[str, Any]:
         """
         Fetch and parse all risk data for a property.
 
+        Building-level data is returned under `buildings`, keyed by building ID;
+        each building's risk blocks are only parsed when first accessed.
+
         :param fsid: The FirstStreet ID of the property
-        :param building_id: The building ID (default is 0)
+        :param building_id: The building ID (default is 0), or None for every building
+        :param risk_types: Only re-fetch these risk types and merge them into the
+            last document fetched for this property (default is a full fetch)
         :return: Dictionary containing all parsed risk data
         :raises FirstStreetAPIError: If the API returns an error or unexpected data
         """
-        raw_data = self.get_property_data(fsid, building_id)
+        attributes = {'fsid': fsid}
+        if building_id is not None:
+            attributes['building_id'] = building_id
+        with self._phase('get_all_risk_data', attributes=attributes):
+            return self._get_all_risk_data(fsid, building_id, risk_types)
 
-        
-        # if 'property' not in raw_data:
-        #     raise FirstStreetAPIError("Unexpected API response structure: 'property' key missing", str(raw_data)[:100])
-        
-        property_data = raw_data
-        
-        return {
-            'flood': self.parse_flood_data(property_data),
-            'fire': self.parse_fire_data(property_data),
-            'heat': self.parse_heat_data(property_data),
-            'wind': self.parse_wind_data(property_data),
-            'air': self.parse_air_data(property_data)
-        }
+    def _get_all_risk_data(
+        self, fsid: int, building_id: Optional[int], risk_types: Optional[Iterable[str]]
+    ) -> Dict[str, Any]:
+        key = (fsid, building_id)
+        if risk_types is None or key not in self._documents:
+            if risk_types is not None:
+                self._count_cache("document", "miss")
+            property_data = self.get_property_data(fsid, building_id)
+        else:
+            from .property_queries import RISK_DOCUMENTS
+
+            self._count_cache("document", "hit")
+            property_data = self._documents[key]
+            for risk_type in risk_types:
+                partial = self.get_property_data(fsid, building_id, RISK_DOCUMENTS[risk_type])
+                if self.response_cache is not None:
+                    # An unchanged response is the very object merged last time
+                    if partial is self._partials.get(key + (risk_type,)):
+                        continue
+                    self._partials[key + (risk_type,)] = partial
+                with self._phase('merge'):
+                    property_data = self.merge_property_data(property_data, partial)
+        return self._parse_document(fsid, building_id, property_data)
+
+    def export_document(self, fsid: int, building_id: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """
+        Return the property document `get_all_risk_data` last built, to store it between restarts.
+
+        :param fsid: The property's FSID
+        :param building_id: Building ID as passed to `get_all_risk_data`
+        :return: The document, or None if the property has not been fetched
+        """
+        return self._documents.get((fsid, building_id))
+
+    def restore_document(
+        self, fsid: int, building_id: Optional[int], property_data: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Parse a document saved by `export_document` without fetching it.
+
+        The document becomes the one later partial refreshes of
+        `get_all_risk_data` merge into.
+
+        :param fsid: The property's FSID
+        :param building_id: Building ID as passed to `get_all_risk_data`
+        :param property_data: The saved document
+        :return: The parsed risk data, as `get_all_risk_data` returns it
+        """
+        with self._phase('restore'):
+            return self._parse_document(fsid, building_id, property_data)
+
+    def _parse_document(
+        self, fsid: int, building_id: Optional[int], property_data: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        key = (fsid, building_id)
+        self._documents[key] = property_data
+
+        if self.response_cache is not None:
+            parsed = self._parsed.get(key)
+            if parsed is not None and parsed[0] is property_data:
+                self._count_cache("parsed", "hit")
+                return parsed[1]
+
+        self._locate(fsid, building_id, property_data)
+
+        parsed_data = self.parse_all_risk_data(property_data)
+        if self.response_cache is not None:
+            self._count_cache("parsed", "miss")
+            self._parsed[key] = (property_data, parsed_data)
+        return parsed_data
+
+    def parse_all_risk_data(self, property_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Parse every risk type of a property document returned by `get_property_data`.
+
+        A tolerant client validates the document first and parses the risk
+        types missing fields as None. Otherwise the document is only
+        validated if a parser fails, to report every missing or null field
+        at once instead of the first `KeyError`.
+
+        :raises FirstStreetAPIError: If fields the parsers read are missing or
+            null, unless the client is tolerant
+        """
+        invalid: Dict[str, Any] = {}
+        if self.tolerant:
+            with self._phase('parse.validate'):
+                problems = validate_property(property_data)
+            if problems:
+                invalid = invalid_risk_types(problems)
+                _LOGGER.warning(
+                    "Property %s is missing data for %s: %s",
+                    property_data.get('fsid'), ", ".join(invalid), describe(problems),
+                )
+        parsers = (
+            ('flood', self.parse_flood_data),
+            ('fire', self.parse_fire_data),
+            ('heat', self.parse_heat_data),
+            ('wind', self.parse_wind_data),
+            ('air', self.parse_air_data),
+        )
+        with self._phase('parse.intern'):
+            intern_enumerations(property_data)
+        parsed = {}
+        for risk_type, parser in parsers:
+            if risk_type in invalid:
+                parsed[risk_type] = None
+                continue
+            with self._phase(f'parse.{risk_type}', 'parse_duration', parser=f'parse_{risk_type}_data'):
+                try:
+                    parsed[risk_type] = parser(property_data)
+                except (KeyError, TypeError) as err:
+                    problems = validate_property(property_data)
+                    if not problems:
+                        raise
+                    raise FirstStreetAPIError(f"Property data is incomplete: {describe(problems)}", problems) from err
+        with self._phase('parse.buildings'):
+            parsed['buildings'] = parse_buildings(property_data)
+        return parsed
         
 # Usage example
 if __name__ == "__main__":
@@ -225,9 +920,6 @@ if __name__ == "__main__":
                    print(f"TRI Nearby: {data['tri_nearby']}")
 
    
-           # Optional: Uncomment the following line to print the full risk data structure
-           # pprint(risk_data)
-   
        except FirstStreetAPIError as e:
            _LOGGER.error(f"API Error: {e.message}")
            if e.details:
@@ -0,0 +1,157 @@
+"""Send a duplicate of a request that is slower than usual and take whichever answers first."""
+import collections
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Deque, Optional, TypeVar
+
+_LOGGER = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+def _discard(future: Future) -> None:
+    """Release the connection of a response nobody waits for anymore."""
+    if not future.cancelled() and future.exception() is None:
+        close = getattr(future.result(), "close", None)
+        if close is not None:
+            close()
+
+
+class HedgePolicy:
+    """
+    Hedge requests outliving the observed `percentile` latency, within a budget.
+
+    Latencies of recent responses (`window` of them) set the hedge delay:
+    a request still running after it gets a duplicate, and the first
+    response to arrive wins. Each request earns `max_extra` of a hedge, up
+    to `max_burst`, so hedges never add more than that fraction of load.
+    Nothing is hedged before `min_samples` responses were seen.
+
+    One policy can be shared by every client talking to the same API, and
+    from any thread.
+    """
+
+    def __init__(
+        self,
+        percentile: float = 0.95,
+        max_extra: float = 0.05,
+        max_burst: float = 5.0,
+        window: int = 200,
+        min_samples: int = 20,
+        max_workers: int = 32,
+    ):
+        """
+        :param percentile: Latency percentile after which a request is hedged
+        :param max_extra: Most hedges per request sent, e.g. 0.05 for 5% extra load
+        :param max_burst: Most hedges that may be sent in a row after a quiet spell
+        :param window: How many recent latencies the percentile is taken over
+        :param min_samples: Latencies needed before hedging starts
+        :param max_workers: Threads sending requests and their hedges
+        """
+        if not 0 < percentile < 1:
+            raise ValueError("percentile must be between 0 and 1")
+        self.percentile = percentile
+        self.max_extra = max_extra
+        self.max_burst = max_burst
+        self.min_samples = min_samples
+        self.max_workers = max_workers
+        self.hedges = 0
+        self._latencies: Deque[float] = collections.deque(maxlen=window)
+        self._delay: Optional[float] = None
+        self._tokens = 0.0
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def delay(self) -> Optional[float]:
+        """Seconds after which a request is hedged, or None while there are too few samples."""
+        return self._delay
+
+    def record(self, latency: float) -> None:
+        """Add the latency of a successful request."""
+        with self._lock:
+            self._latencies.append(latency)
+            if len(self._latencies) >= self.min_samples:
+                ordered = sorted(self._latencies)
+                self._delay = ordered[int(self.percentile * (len(ordered) - 1))]
+
+    def _earn(self) -> None:
+        with self._lock:
+            self._tokens = min(self.max_burst, self._tokens + self.max_extra)
+
+    def _take(self) -> bool:
+        with self._lock:
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            self.hedges += 1
+            return True
+
+    def _timed(self, request: Callable[[], T]) -> Callable[[], T]:
+        def attempt() -> T:
+            start = time.perf_counter()
+            result = request()
+            self.record(time.perf_counter() - start)
+            return result
+
+        return attempt
+
+    def _pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix="firststreet-hedge")
+            return self._executor
+
+    def send(self, request: Callable[[], T], on_hedge: Optional[Callable[[], Any]] = None) -> T:
+        """
+        Run `request`, hedging it if it outlives `delay`.
+
+        The delay counts from when the first attempt starts running, not
+        from when it was queued: with every thread busy, waiting for one is
+        not a slow response. A failed attempt does not win while the other
+        may still succeed; the response of the attempt that lost is closed
+        when it arrives.
+
+        :param request: Sends the request and returns the response; called
+            once more for the hedge, from another thread
+        :param on_hedge: Called when a hedge is sent
+        :return: The first successful response
+        """
+        self._earn()
+        delay = self._delay
+        if delay is None:
+            return self._timed(request)()
+        pool = self._pool()
+        started = threading.Event()
+        timed = self._timed(request)
+
+        def attempt() -> T:
+            started.set()
+            return timed()
+
+        first = pool.submit(attempt)
+        started.wait()
+        done, _ = wait([first], timeout=delay)
+        if done or not self._take():
+            return first.result()
+        _LOGGER.debug("Request outlived %.3fs, sending a hedge", delay)
+        if on_hedge is not None:
+            on_hedge()
+        pending = {first, pool.submit(self._timed(request))}
+        while True:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            succeeded = [future for future in done if future.exception() is None]
+            if succeeded or not pending:
+                winner = succeeded[0] if succeeded else next(iter(done))
+                for loser in (done | pending) - {winner}:
+                    loser.add_done_callback(_discard)
+                return winner.result()
+
+    def close(self) -> None:
+        """Stop the threads sending hedged requests."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
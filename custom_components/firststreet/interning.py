@@ -0,0 +1,70 @@
+"""Share one copy of the enumeration strings that repeat across property documents."""
+import sys
+from typing import Any, Dict, List, Optional
+
+# Fields of each risk block whose values come from a small, fixed vocabulary
+ENUMERATION_FIELDS = {
+    'flood': ('riskDirection', 'floodType'),
+    'fire': ('riskDirection',),
+    'heat': ('riskDirection',),
+    'wind': ('riskDirection', 'greatestWindRisk', 'primaryWindDirection'),
+    'air': ('riskDirection',),
+}
+
+
+def intern_insights(insights: Optional[List[Dict[str, Any]]]) -> None:
+    """Intern insight names and their `details` names in place, skipping malformed items."""
+    if not isinstance(insights, list):
+        return
+    for insight in insights:
+        if not isinstance(insight, dict):
+            continue
+        name = insight.get('name')
+        if type(name) is str:
+            insight['name'] = sys.intern(name)
+        details = insight.get('details')
+        if not isinstance(details, list):
+            continue
+        for detail in details:
+            if not isinstance(detail, dict):
+                continue
+            name = detail.get('name')
+            if type(name) is str:
+                detail['name'] = sys.intern(name)
+
+
+def intern_risk_block(risk_type: str, risk_data: Optional[Dict[str, Any]]) -> None:
+    """Intern the enumeration values and insight names of one risk block in place."""
+    if not isinstance(risk_data, dict):
+        return
+    for field in ENUMERATION_FIELDS[risk_type]:
+        value = risk_data.get(field)
+        if type(value) is str:
+            risk_data[field] = sys.intern(value)
+    intern_insights(risk_data.get('insights'))
+
+
+def intern_enumerations(property_data: Dict[str, Any]) -> None:
+    """
+    Intern the enumeration strings of a property document and its buildings in place.
+
+    `json.loads` creates new string objects for every document, so a cache of
+    many properties holds thousands of copies of "INCREASING", insight names
+    and the like. Interning makes every document (and the parsed data, which
+    references the same objects) share one copy of each.
+
+    :param property_data: The property document returned by `get_property_data`
+    """
+    for risk_type in ENUMERATION_FIELDS:
+        intern_risk_block(risk_type, property_data.get(risk_type))
+    # Malformed documents are left to validation; interning only skips what it can't walk
+    connection = property_data.get('buildingConnection')
+    edges = connection.get('edges') if isinstance(connection, dict) else None
+    if not isinstance(edges, list):
+        return
+    for edge in edges:
+        node = edge.get('node') if isinstance(edge, dict) else None
+        if not isinstance(node, dict):
+            continue
+        for risk_type in ENUMERATION_FIELDS:
+            intern_risk_block(risk_type, node.get(risk_type))
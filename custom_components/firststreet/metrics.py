@@ -0,0 +1,234 @@
+"""Minimal Prometheus/OpenMetrics instrumentation for the FirstStreet client."""
+import bisect
+import threading
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+LabelValues = Tuple[str, ...]
+
+DEFAULT_LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+DEFAULT_CPU_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+DEFAULT_SIZE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+class Sample(NamedTuple):
+    """One exposed sample: name suffix, labels and value."""
+
+    name: str
+    labels: Dict[str, str]
+    value: float
+
+
+class MetricFamily(NamedTuple):
+    """A metric with its samples, as passed to registry callbacks."""
+
+    name: str
+    type: str
+    help: str
+    samples: List[Sample]
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class _Metric:
+    """Base class for labelled metrics."""
+
+    type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key: LabelValues, **extra: str) -> Dict[str, str]:
+        labels = dict(zip(self.labelnames, key))
+        labels.update(extra)
+        return labels
+
+    def samples(self) -> List[Sample]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """A monotonically increasing counter."""
+
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self) -> List[Sample]:
+        with self._lock:
+            values = list(self._values.items())
+        return [Sample("_total", self._labels(key), value) for key, value in values]
+
+
+class Histogram(_Metric):
+    """A histogram with fixed, cumulative buckets."""
+
+    type = "histogram"
+
+    def __init__(
+        self, name: str, documentation: str, buckets: Sequence[float], labelnames: Sequence[str] = ()
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: bucket counts (+Inf last), sum
+        self._values: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.setdefault(key, ([0] * (len(self.buckets) + 1), [0.0]))
+            counts[index] += 1
+            total[0] += value
+
+    def time(self, **labels: str) -> "_Timer":
+        """Context manager observing the duration of its block in seconds."""
+        return _Timer(self, labels)
+
+    def count(self, **labels: str) -> int:
+        entry = self._values.get(self._key(labels))
+        return sum(entry[0]) if entry else 0
+
+    def samples(self) -> List[Sample]:
+        samples = []
+        with self._lock:
+            values = [(key, list(counts), total[0]) for key, (counts, total) in self._values.items()]
+        for key, counts, total in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                samples.append(Sample("_bucket", self._labels(key, le=_format_value(bound)), cumulative))
+            samples.append(Sample("_count", self._labels(key), cumulative))
+            samples.append(Sample("_sum", self._labels(key), total))
+        return samples
+
+
+class _Timer:
+    __slots__ = ("_histogram", "_labels", "_start")
+
+    def __init__(self, histogram: Histogram, labels: Dict[str, str]):
+        self._histogram = histogram
+        self._labels = labels
+
+    def __enter__(self) -> None:
+        self._start = time.perf_counter()
+
+    def __exit__(self, *exc_info) -> None:
+        self._histogram.observe(time.perf_counter() - self._start, **self._labels)
+
+
+class MetricsRegistry:
+    """A set of metrics that can be rendered as OpenMetrics text."""
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._callbacks: List[Callable[[List[MetricFamily]], None]] = []
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        metric = Counter(name, documentation, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(
+        self, name: str, documentation: str, buckets: Sequence[float], labelnames: Sequence[str] = ()
+    ) -> Histogram:
+        metric = Histogram(name, documentation, buckets, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def collect(self) -> List[MetricFamily]:
+        """Snapshot every metric, e.g. to bridge into another metrics system."""
+        families = [
+            MetricFamily(metric.name, metric.type, metric.documentation, metric.samples())
+            for metric in self._metrics
+        ]
+        for callback in self._callbacks:
+            callback(families)
+        return families
+
+    def add_callback(self, callback: Callable[[List[MetricFamily]], None]) -> Callable[[], None]:
+        """
+        Call `callback` with the metric families on every collection.
+
+        :return: A function that removes the callback
+        """
+        self._callbacks.append(callback)
+        return lambda: self._callbacks.remove(callback)
+
+    def render(self) -> str:
+        """Render all metrics in the OpenMetrics text format."""
+        lines = []
+        for family in self.collect():
+            lines.append(f"# TYPE {family.name} {family.type}")
+            lines.append(f"# HELP {family.name} {_escape(family.help)}")
+            for sample in family.samples:
+                labels = ",".join(f'{key}="{_escape(value)}"' for key, value in sample.labels.items())
+                labels = f"{{{labels}}}" if labels else ""
+                lines.append(f"{family.name}{sample.name}{labels} {_format_value(sample.value)}")
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+
+class ClientMetrics:
+    """The metrics recorded by `FirstStreetAPI` when instrumentation is enabled."""
+
+    def __init__(self, registry: Optional[MetricsRegistry] = None):
+        self.registry = registry or MetricsRegistry()
+        self.requests = self.registry.counter(
+            "firststreet_requests", "FirstStreet API requests by outcome.", ["outcome"]
+        )
+        self.request_duration = self.registry.histogram(
+            "firststreet_request_duration_seconds",
+            "Time from sending a request to receiving the full response body.",
+            DEFAULT_LATENCY_BUCKETS,
+        )
+        self.response_bytes = self.registry.histogram(
+            "firststreet_response_bytes", "Size of FirstStreet API response bodies.", DEFAULT_SIZE_BUCKETS
+        )
+        self.decode_duration = self.registry.histogram(
+            "firststreet_decode_duration_seconds", "Time spent decoding response JSON.", DEFAULT_CPU_BUCKETS
+        )
+        self.parse_duration = self.registry.histogram(
+            "firststreet_parse_duration_seconds",
+            "Time spent in each parse_* method.",
+            DEFAULT_CPU_BUCKETS,
+            ["parser"],
+        )
+        self.cache = self.registry.counter(
+            "firststreet_cache_requests", "Client cache lookups by cache and result.", ["cache", "result"]
+        )
+        self.retries = self.registry.counter(
+            "firststreet_retries", "Requests sent again, by reason.", ["reason"]
+        )
+        self.errors = self.registry.counter(
+            "firststreet_errors", "Failed requests by error class.", ["error_class"]
+        )
+
+    def render(self) -> str:
+        return self.registry.render()
@@ -0,0 +1,323 @@
+"""Attribute response bytes and decode time to GraphQL field paths, and prune queries to what parsers read."""
+import json
+import time
+from collections.abc import Mapping
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from .property_queries import minify_query, sel
+
+
+class FieldCost(NamedTuple):
+    """What one field path costs across a response (summed over list items)."""
+
+    path: str
+    bytes: int  # serialized `"key":value` bytes, i.e. what dropping the field saves
+    decode_seconds: float  # json.loads time of the field's value (objects and lists only)
+    occurrences: int
+
+
+def field_costs(document: Dict[str, Any], repeat: int = 3) -> List[FieldCost]:
+    """
+    Attribute the serialized size and decode time of a document to its field paths.
+
+    Paths are GraphQL response paths without list indices, so the items of
+    `buildingConnection.edges` add up under `buildingConnection.edges.node`.
+    Costs are inclusive: a field's cost includes its subfields'.
+
+    :param document: A decoded response, e.g. the `data.property` object
+    :param repeat: Decode each value this many times and keep the fastest
+    :return: One cost per path, most bytes first
+    """
+    totals: Dict[str, List[float]] = {}
+    _walk(document, "", totals, repeat)
+    costs = [FieldCost(path, int(size), seconds, int(count)) for path, (size, seconds, count) in totals.items()]
+    costs.sort(key=lambda cost: cost.bytes, reverse=True)
+    return costs
+
+
+def _walk(value: Any, path: str, totals: Dict[str, List[float]], repeat: int) -> None:
+    if isinstance(value, list):
+        for item in value:
+            _walk(item, path, totals, repeat)
+        return
+    if not isinstance(value, dict):
+        return
+    for key, child in value.items():
+        child_path = f"{path}.{key}" if path else key
+        raw = json.dumps(child, separators=(",", ":"))
+        seconds = 0.0
+        if isinstance(child, (dict, list)):
+            seconds = min(_decode_time(raw) for _ in range(repeat))
+        total = totals.setdefault(child_path, [0, 0.0, 0])
+        total[0] += len(json.dumps(key)) + 1 + len(raw)
+        total[1] += seconds
+        total[2] += 1
+        _walk(child, child_path, totals, repeat)
+
+
+def _decode_time(raw: str) -> float:
+    start = time.perf_counter()
+    json.loads(raw)
+    return time.perf_counter() - start
+
+
+def format_report(costs: List[FieldCost], total_bytes: int, top: int = 40, max_depth: Optional[int] = None) -> str:
+    """
+    Render the `top` costliest paths as a table.
+
+    :param total_bytes: Size of the whole response, for the percentage column
+    :param max_depth: Leave out paths nested deeper than this many fields
+    """
+    lines = [f"{'bytes':>10}{'%':>7}{'decode ms':>11}{'count':>7}  path"]
+    shown = [cost for cost in costs if max_depth is None or cost.path.count(".") < max_depth][:top]
+    for cost in shown:
+        lines.append(
+            f"{cost.bytes:>10}{cost.bytes / total_bytes:>7.1%}{cost.decode_seconds * 1000:>11.3f}"
+            f"{cost.occurrences:>7}  {cost.path}"
+        )
+    return "\n".join(lines)
+
+
+class AccessNode:
+    """
+    The fields of one object that a parser read.
+
+    A node read without any of its fields being read, or handed back in the
+    parser's result, is used `whole`.
+    """
+
+    __slots__ = ("children", "whole")
+
+    def __init__(self):
+        self.children: Dict[str, "AccessNode"] = {}
+        self.whole = False
+
+    def child(self, key: str) -> "AccessNode":
+        node = self.children.get(key)
+        if node is None:
+            node = self.children[key] = AccessNode()
+        return node
+
+    def uses_whole(self) -> bool:
+        return self.whole or not self.children
+
+    def paths(self, prefix: str = "") -> List[str]:
+        """The accessed paths; subtrees used whole end the path."""
+        if self.uses_whole():
+            return [prefix] if prefix else []
+        paths = []
+        for key, node in self.children.items():
+            paths.extend(node.paths(f"{prefix}.{key}" if prefix else key))
+        return paths
+
+
+def _record(value: Any, node: AccessNode) -> Any:
+    if isinstance(value, dict):
+        return _RecordedDict(value, node)
+    if isinstance(value, list):
+        return _RecordedList(value, node)
+    return value
+
+
+class _RecordedDict(dict):
+    """A dict that records which of its fields are read."""
+
+    __slots__ = ("_node",)
+
+    def __init__(self, value: Dict[str, Any], node: AccessNode):
+        super().__init__(value)
+        self._node = node
+
+    def __getitem__(self, key: str) -> Any:
+        return _record(super().__getitem__(key), self._node.child(key))
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key not in self:
+            # Still a read: the field may just be missing from this response
+            self._node.child(key)
+            return default
+        return self[key]
+
+    def values(self):
+        return [self[key] for key in self]
+
+    def items(self):
+        return [(key, self[key]) for key in self]
+
+
+class _RecordedList(list):
+    """A list whose items record their reads into one shared node, like GraphQL paths."""
+
+    __slots__ = ("_node",)
+
+    def __init__(self, value: List[Any], node: AccessNode):
+        super().__init__(value)
+        self._node = node
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [_record(item, self._node) for item in super().__getitem__(index)]
+        return _record(super().__getitem__(index), self._node)
+
+    def __iter__(self):
+        for item in super().__iter__():
+            yield _record(item, self._node)
+
+
+def record_access(document: Dict[str, Any], consume: Callable[[Dict[str, Any]], Any]) -> AccessNode:
+    """
+    Run a parser over a document and record the fields it reads.
+
+    Objects the parser passes through into its result count as used whole.
+    Lazily parsed mappings in the result (e.g. buildings) are read in full.
+
+    :param document: A decoded response, e.g. the `data.property` object
+    :param consume: The parser, e.g. `api.parse_flood_data`
+    :return: The fields read, rooted at `document`
+    """
+    root = AccessNode()
+    _mark_passed_through(consume(_RecordedDict(document, root)))
+    return root
+
+
+def _mark_passed_through(result: Any) -> None:
+    if isinstance(result, (_RecordedDict, _RecordedList)):
+        result._node.whole = True
+    elif isinstance(result, Mapping):
+        for value in result.values():
+            _mark_passed_through(value)
+    elif isinstance(result, (list, tuple)):
+        for item in result:
+            _mark_passed_through(item)
+
+
+def prune_document(value: Any, accessed: AccessNode) -> Any:
+    """Return a copy of a document with only the fields in `accessed`, as a pruned query would."""
+    if accessed.uses_whole():
+        return value
+    if isinstance(value, list):
+        return [prune_document(item, accessed) for item in value]
+    if not isinstance(value, dict):
+        return value
+    return {
+        key: prune_document(child, accessed.children[key])
+        for key, child in value.items() if key in accessed.children
+    }
+
+
+class _Field(NamedTuple):
+    key: Optional[str]  # response key: the alias if there is one, else the field name; None for `...on Type`
+    head: str  # alias, name and arguments
+    children: Optional[List["_Field"]]
+
+
+def _read_name(text: str, position: int) -> int:
+    start = position
+    while position < len(text) and (text[position].isalnum() or text[position] == "_"):
+        position += 1
+    if position == start:
+        raise ValueError(f"Expected a field name at {position}: {text[position:position + 20]!r}")
+    return position
+
+
+def _skip_arguments(text: str, position: int) -> int:
+    depth = 0
+    while True:
+        char = text[position]
+        if char == '"':
+            position += 1
+            while text[position] != '"':
+                position += 2 if text[position] == "\\" else 1
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+            if not depth:
+                return position + 1
+        position += 1
+
+
+def _parse_selection(text: str, position: int) -> Tuple[List[_Field], int]:
+    """Parse the fields after a `{`, returning them and the position after the matching `}`."""
+    fields = []
+    while True:
+        if text[position] == " ":
+            position += 1
+            continue
+        if text[position] == "}":
+            return fields, position + 1
+        start = position
+        if text.startswith("...", position):
+            # Inline fragment: its fields belong to the enclosing object
+            position = _read_name(text, position + 3)
+            if text[start + 3:position] != "on":
+                raise ValueError("Only inline fragments (`...on Type`) are supported")
+            position = _read_name(text, position + (text[position] == " "))
+            fragment, position = _parse_selection(text, text.index("{", position) + 1)
+            fields.append(_Field(None, text[start:text.index("{", start)], fragment))
+            continue
+        position = _read_name(text, position)
+        key = text[start:position]
+        if text[position] == ":":
+            position = _read_name(text, position + 1)
+        if text[position] == "(":
+            position = _skip_arguments(text, position)
+        head = text[start:position]
+        children = None
+        if text[position] == "{":
+            children, position = _parse_selection(text, position + 1)
+        fields.append(_Field(key, head, children))
+
+
+def _render(field: _Field) -> str:
+    if field.children is None:
+        return field.head
+    return sel(field.head, *(_render(child) for child in field.children))
+
+
+def _prune(fields: List[_Field], node: AccessNode) -> List[_Field]:
+    kept = []
+    for field in fields:
+        if field.key is None:
+            fragment = _prune(field.children, node)
+            if fragment:
+                kept.append(field._replace(children=fragment))
+            continue
+        child = node.children.get(field.key)
+        if child is None:
+            continue
+        if field.children is not None and not child.uses_whole():
+            children = _prune(field.children, child)
+            # Keep the whole selection if nothing read maps onto it
+            field = field._replace(children=children or field.children)
+        kept.append(field)
+    return kept
+
+
+def _parse_query(query: str) -> Tuple[str, List[_Field]]:
+    """Split a query into its operation head (`query name($var: Type)`) and top-level fields."""
+    text = minify_query(query)
+    position = text.index("{")
+    if "(" in text[:position]:
+        position = text.index("{", _skip_arguments(text, text.index("(")))
+    fields, _ = _parse_selection(text, position + 1)
+    return text[:position], fields
+
+
+def prune_query(query: str, accessed: AccessNode, root_field: str = "property") -> str:
+    """
+    Drop the fields of a query that a parser never read.
+
+    :param query: The GraphQL query, e.g. `PROPERTY_BY_FSID_QUERY`
+    :param accessed: The fields read, from `record_access` on the `root_field` object
+    :param root_field: The response key of the field `accessed` is rooted at
+    :return: The pruned query, minified
+    """
+    head, fields = _parse_query(query)
+    roots = [
+        field._replace(children=_prune(field.children, accessed) or field.children)
+        if field.key == root_field and field.children is not None and not accessed.uses_whole()
+        else field
+        for field in fields
+    ]
+    return sel(head, *(_render(field) for field in roots))
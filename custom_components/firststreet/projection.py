@@ -0,0 +1,178 @@
+"""Decode property responses straight into the fields the parsers read (needs msgspec).
+
+The schemas are TypedDicts, so decoding yields the same plain dicts
+`response.json()` would, minus every field not declared here. msgspec skips
+undeclared fields in C while decoding, so geography blocks and unused risk
+fields are never built into Python objects. Subtrees the parsers hand
+through whole (probabilities, historic events, insights, ...) are `Any`.
+Leaf values are `Any` too: the parsers never checked their types, and a
+type drifting in the API should not fail the whole decode.
+"""
+from typing import Any, List, Optional, TypedDict, Union
+
+
+class TotalCount(TypedDict, total=False):
+    totalCount: Any
+
+
+class Edge(TypedDict, total=False):
+    node: Any
+
+
+class Connection(TypedDict, total=False):
+    edges: List[Edge]
+
+
+class InsuranceHippo(TypedDict, total=False):
+    rates: Any
+
+
+class FloodData(TypedDict, total=False):
+    floodFactor: Any
+    riskDirection: Any
+    floodType: Any
+    insuranceRequirement: Any
+    adaptationConnection: Optional[TotalCount]
+    probability: Any
+    consequences: Any
+    historic: Any
+    insights: Any
+
+
+class FireData(TypedDict, total=False):
+    fireFactor: Any
+    riskDirection: Any
+    defensibleSpace: Any
+    usfsRelativeRisk: Any
+    prescribedBurns: Optional[TotalCount]
+    probability: Any
+    historicConnection: Optional[Connection]
+    insuranceHippo: Optional[InsuranceHippo]
+    insights: Any
+
+
+class HeatData(TypedDict, total=False):
+    heatFactor: Any
+    hotTemperature: Any
+    anomalyTemperature: Any
+    temperatureAverageHigh: Any
+    cooling: Any
+    heatWaves: Any
+    days: Any
+    insights: Any
+
+
+class WindData(TypedDict, total=False):
+    windFactor: Any
+    factorScale: Any
+    riskDirection: Any
+    hasTornadoRisk: Any
+    hasThunderstormRisk: Any
+    hasCycloneRisk: Any
+    greatestWindRisk: Any
+    missileEnvironment: Any
+    primaryWindDirection: Any
+    probability: Any
+    historicConnection: Optional[Connection]
+
+
+class AirData(TypedDict, total=False):
+    airFactor: Any
+    factorScale: Any
+    riskDirection: Any
+    days: Any
+    greatestRisk: Any
+    triNearby: Any
+    triFacilityConnection: Optional[Connection]
+    historic: Any
+    insights: Any
+    percentile: Any
+
+
+class BuildingNode(TypedDict, total=False):
+    # Everything but the risk blocks is returned by `BuildingRiskData.details`
+    fsid: Any
+    buildingId: Any
+    hasBasement: Any
+    units: Any
+    stories: Any
+    yearBuilt: Any
+    sqft: Any
+    replacementCostPerSqft: Any
+    buildingOrientation: Any
+    windDesignStandard: Any
+    airFilterId: Any
+    riskfactorLink: Any
+    floorElevation: Any
+    landuseCodeId: Any
+    isResidential: Any
+    construction: Any
+    roof: Any
+    exclusion: Any
+    geometry: Any
+    flood: Optional[FloodData]
+    fire: Optional[FireData]
+    heat: Optional[HeatData]
+    wind: Optional[WindData]
+    air: Optional[AirData]
+
+
+class BuildingEdge(TypedDict, total=False):
+    node: Optional[BuildingNode]
+
+
+class BuildingConnection(TypedDict, total=False):
+    totalCount: Any
+    edges: Optional[List[BuildingEdge]]
+
+
+class PropertyData(TypedDict, total=False):
+    fsid: Any
+    flood: Optional[FloodData]
+    fire: Optional[FireData]
+    heat: Optional[HeatData]
+    wind: Optional[WindData]
+    air: Optional[AirData]
+    buildingConnection: Optional[BuildingConnection]
+    geometry: Any
+    footprint: Any
+
+
+class ResponseData(TypedDict, total=False):
+    property: Optional[PropertyData]
+
+
+class Response(TypedDict, total=False):
+    data: Optional[ResponseData]
+    errors: Any
+
+
+class ProjectionDecodeError(ValueError):
+    """The response body is not valid JSON or does not fit the schema."""
+
+
+class ProjectedDecoder:
+    """Decode GraphQL property responses into `Response`, skipping undeclared fields."""
+
+    def __init__(self, schema: Any = Response):
+        """
+        :param schema: The type to decode into
+        :raises ImportError: If msgspec is not installed
+        """
+        try:
+            import msgspec
+        except ImportError as err:
+            raise ImportError("The projected decoder needs msgspec: pip install msgspec") from err
+        self._decoder = msgspec.json.Decoder(schema)
+        self._errors = (msgspec.DecodeError,)
+
+    def decode(self, content: Union[bytes, memoryview]) -> Any:
+        """
+        Decode a response body; memoryviews (e.g. from `ResponseArchive`) are read without a copy.
+
+        :raises ProjectionDecodeError: If the body is invalid
+        """
+        try:
+            return self._decoder.decode(content)
+        except self._errors as err:
+            raise ProjectionDecodeError(str(err)) from err
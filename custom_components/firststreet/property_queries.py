@@ -1,1422 +1,417 @@
 # property_queries.py
+#
+# Queries are composed from shared selection sets so that blocks repeated at
+# property, building and geography level are written (and kept in sync) once.
+# `sel` renders selections already minified, so nothing is re-parsed at import.
+import functools
+import hashlib
+import json
+import re
+from typing import NamedTuple
 
-PROPERTY_BY_FSID_QUERY = """
-query PropertyByFSID($fsid: Int64!, $buildingId: [Int!]) {
-  property(fsid: $fsid) {
-    flood {
-      floodType
-      link
-      exclusion {
-        description
-      }
-      floodFactor
-      riskDirection
-      probability {
-        cumulative(depths: [5, 15, 30, 61, 91, 122, 152, 183, 213, 244, 274, 305, 335, 366, 396, 427, 457, 488, 518, 549, 579, 610]) {
-          threshold
-          relativeYear
-          mid
-          yAxisHeightMid
-        }
-        depth {
-          returnPeriod
-          relativeYear
-          low
-          mid
-          high
-        }
-        depthMean: depth(filter: {depthFlavor: MEAN}) {
-          returnPeriod
-          relativeYear
-          low
-          mid
-          high
-        }
-      }
-      insuranceRequirement
-      insuranceQuotes {
-        rates {
-          providers
-          minPrice
-          maxPrice
-          link
-        }
-      }
-      historic {
-        eventId
-        name
-        affectedProperties
-        depth
-        month
-        year
-      }
-      stats {
-        floodfactorRankInCity
-      }
-      adaptationConnection {
-        totalCount
-      }
-      insights {
-        name
-        details {
-          name
-          value
-        }
-      }
-    }
-    fire {
-      exclusion {
-        description
-      }
-      riskDirection
-      fireFactor
-      defensibleSpace
-      usfsRelativeRisk
-      prescribedBurns: historicConnection(filter: {type: [PRESCRIBED_FIRE]}) {
-        totalCount
-      }
-      probability {
-        burn {
-          emberZone
-          relativeYear
-          percent
-          year
-          flameMax
-          flameMean
-          flameBin
-        }
-        cumulative {
-          year
-          relativeYear
-          point
-          yAxisHeight
-        }
-      }
-      historicConnection(first: 100) {
-        totalCount
-        edges {
-          node {
-            ... on PropertyFireHistoric {
-              eventId
-              name
-              distance
-              month
-              year
-              area
-              eventAffectedProperties
-            }
-          }
-        }
-      }
-      insuranceHippo {
-        rates {
-          providers
-          minPrice
-          maxPrice
-          link
-        }
-      }
-      insights {
-        name
-        details {
-          name
-          value
-        }
-      }
-    }
-    heat {
-      exclusion {
-        description
-      }
-      heatFactor
-      hotTemperature
-      anomalyTemperature
-      temperatureAverageHigh {
-        relativeYear
-        mmt
-      }
-      cooling {
-        coolingTemp
-        cost
-        costPerKwh
-        energy
-        relativeYear
-      }
-      heatWaves {
-        hotHeatWave {
-          length
-          relativeYear
-          probability
-        }
-      }
-      days {
-        distribution {
-          relativeYear
-          binLower
-          days
-        }
-        hotDays {
-          relativeYear
-          days
-          yAxisHeight
-        }
-        anomalyDays {
-          relativeYear
-          days
-        }
-        coolingDays {
-          relativeYear
-          days
-        }
-        dangerousDays {
-          relativeYear
-          days
-        }
-        healthCautionDays {
-          relativeYear
-          days
-        }
-      }
-      insights {
-        name
-        details {
-          name
-          value
-        }
-      }
-    }
-    wind {
-      windFactor
-      factorScale
-      riskDirection
-      hasTornadoRisk
-      hasThunderstormRisk
-      hasCycloneRisk
-      greatestWindRisk
-      missileEnvironment
-      primaryWindDirection
-      probability {
-        speed {
-          ssp
-          year
-          relativeYear
-          returnPeriod
-          maxSpeed
-          maxGust
-          category {
-            windCategoryId
-            name
-            minWindSpeed
-            maxWindSpeed
-          }
-        }
-        direction {
-          ssp
-          direction
-          percent
-        }
-        cumulative(
-          input: {thresholds: [50, 75, 100, 110, 120, 130, 140, 150, 160, 170, 180, 190, 200, 210, 220, 230, 240]}
-        ) {
-          ssp
-          year
-          relativeYear
-          threshold
-          probability
-          yMax
-          category {
-            windCategoryId
-            name
-            minWindSpeed
-            maxWindSpeed
-          }
-        }
-      }
-      historicConnection(
-        first: 100
-        filter: {mappedEventsOnly: true}
-        sort: PROPERTIES_AFFECTED_DESC
-      ) {
-        pageInfo {
-          hasNextPage
-          endCursor
-        }
-        totalCount
-        edges {
-          node {
-            ... on PropertyWindHistoricEventThunderstorm {
-              eventId
-              eventType
-              date
-              year
-              damages
-              injuries
-              fatalities
-              maxWind
-            }
-            ... on PropertyWindHistoricEventTornado {
-              eventId
-              eventType
-              date
-              damages
-              year
-              fatalities
-              injuries
-              geometry {
-                bbox {
-                  coordinates
-                  type
-                }
-              }
-              category {
-                tornadoCategoryId
-                rating
-                isEnhanced
-                name
-                minWindSpeed
-                maxWindSpeed
-                description
-              }
-            }
-            ... on PropertyWindHistoricEventCyclone {
-              localWindSpeed
-              eventId
-              eventType
-              windSpeed
-              name
-              date
-              year
-              geometry {
-                bbox {
-                  coordinates
-                  type
-                }
-              }
-              categoryAtLandfall {
-                windCategoryId
-                name
-                minWindSpeed
-                maxWindSpeed
-              }
-              categoryMax {
-                windCategoryId
-                name
-                minWindSpeed
-                maxWindSpeed
-              }
-              categoryLocality {
-                windCategoryId
-                name
-                minWindSpeed
-                maxWindSpeed
-              }
-              affectedProperties
-              affectedPropertiesNationwide
-              hasDetails
-            }
-          }
-        }
-      }
-      exclusion {
-        description
-      }
-    }
-    air {
-      exclusion {
-        description
-      }
-      airFactor
-      factorScale
-      riskDirection
-      days {
-        outdoorDays {
-          year
-          relativeYear
-          color {
-            color
-          }
-          ozoneDays
-          ozoneDaysYAxisHeight
-          anthroPM25Days
-          anthroPM25DaysYAxisHeight
-          smokeMaxDays
-          smokeMaxDaysYAxisHeight
-          smokeAvgDays
-          smokeAvgDaysYAxisHeight
-          totalDays
-          totalDaysYAxisHeight
-        }
-      }
-      greatestRisk {
-        criteriaPollutantId
-        name
-        description
-      }
-      triNearby
-      triFacilityConnection {
-        totalCount
-        edges {
-          node {
-            triFacilityId
-            name
-            industry {
-              industrySectorId
-              name
-            }
-          }
-        }
-      }
-      historic {
-        aqi {
-          year
-          aqiAvg
-          aqiMax
-          worstDate
-          criteriaPollutant {
-            criteriaPollutantId
-            name
-            description
-          }
-        }
-        days(filter: {colorID: 3}) {
-          year
-          totalDays
-        }
-      }
-      insights {
-        name
-        details {
-          name
-          value
-        }
-      }
-      percentile {
-        national
-        state
-      }
-    }
-    buildingConnectionTotalCount: buildingConnection {
-      totalCount
-    }
-    exclusion {
-      description
-    }
-    fsid
-    isResidential
-    state {
-      name
-      air {
-        days {
-          outdoorDays {
-            year
-            relativeYear
-            color {
-              color
-            }
-            totalDays
-          }
-        }
-        stats {
-          worstCities {
-            name
-            fsid
-            state {
-              name
-            }
-            slug
-          }
-          bestCities {
-            name
-            fsid
-            slug
-            state {
-              name
-            }
-          }
-        }
-      }
-      heat {
-        emissions {
-          co2PerMWh
-        }
-      }
-    }
-    address {
-      formattedAddress
-    }
-    alternativeAddresses {
-      formattedAddress
-    }
-    femaZone
-    floorElevation
-    footprint
-    parcelAcres
-    landuseCodeId
-    building {
-      buildingId
-      hasBasement
-      units
-      stories
-      construction {
-        combustibility
-        material
-      }
-      roof {
-        combustibility
-        material
-      }
-      yearBuilt
-      sqft
-      replacementCostPerSqft
-      buildingOrientation
-      windDesignStandard
-      airFilterId
-    }
-    geometry {
-      center {
-        coordinates
-        type
-      }
-      polygon {
-        coordinates
-        type
-      }
-      bbox {
-        coordinates
-        type
-      }
-    }
-    city {
-      fsid
-      name
-      fire {
-        communityRisk {
-          riskPercentile
-          score
-          facilitiesCount
-          facilitiesCategory {
-            facilityCategoryId
-            facilitiesCount
-            score
-            risks {
-              year
-              relativeYear
-              facilitiesFireRisk
-            }
-          }
-        }
-      }
-      flood {
-        adaptationConnection {
-          totalCount
-        }
-        communityRisk {
-          riskPercentile
-          score
-          facilitiesCount
-          facilitiesCategory {
-            facilityCategoryId
-            facilitiesCount
-            score
-            risks {
-              facilitiesOperationalRisk
-              facilitiesWaterRisk
-              relativeYear
-              year
-            }
-          }
-        }
-        historic {
-          name
-          eventId
-          affectedProperties
-          month
-          year
-        }
-      }
-      air {
-        days {
-          outdoorDays {
-            year
-            relativeYear
-            color {
-              color
-            }
-            totalDays
-          }
-        }
-      }
-    }
-    county {
-      fsid
-      name
-      isCoastal
-      geometry {
-        center {
-          coordinates
-          type
-        }
-        polygon {
-          coordinates
-          type
-        }
-        bbox {
-          coordinates
-          type
-        }
-      }
-      air {
-        days {
-          outdoorDays {
-            year
-            relativeYear
-            color {
-              color
-            }
-            totalDays
-          }
-        }
-        nonAttainments {
-          classification
-          part
-          criteriaPollutant {
-            criteriaPollutantId
-            name
-            description
-          }
-        }
-      }
-      flood {
-        historic {
-          eventId
-          month
-          year
-          name
-          affectedProperties
-          data {
-            count
-            bin
-          }
-        }
-        SoVI {
-          percentile
-        }
-        adaptationConnection {
-          totalCount
-        }
-        floodAdaptationConnection(first: 100, filter: {types: [6, 19, 20, 30, 32]}) {
-          totalCount
-          edges {
-            node {
-              adaptationId
-              scenario
-              name
-              type
-              serving {
-                property
-              }
-            }
-          }
-        }
-        communityRisk {
-          riskPercentile
-          score
-          facilitiesCount
-          facilitiesCategory {
-            facilityCategoryId
-            facilitiesCount
-            score
-            risks {
-              facilitiesOperationalRisk
-              facilitiesWaterRisk
-              relativeYear
-              year
-            }
-          }
-        }
-      }
-      fire {
-        prescribedBurns: historicConnection(filter: {type: [PRESCRIBED_FIRE]}) {
-          totalCount
-        }
-        communityRisk {
-          riskPercentile
-          score
-          facilitiesCount
-          facilitiesCategory {
-            facilityCategoryId
-            facilitiesCount
-            score
-            risks {
-              year
-              relativeYear
-              facilitiesFireRisk
-            }
-          }
-        }
-      }
-      wind {
-        riskLevel
-        atRisk {
-          propertyCount
-          level
-        }
-      }
-    }
-    neighborhood {
-      name
-      air {
-        days {
-          outdoorDays {
-            relativeYear
-            color {
-              color
-            }
-            totalDays
-          }
-        }
-      }
-      fire {
-        communityRisk {
-          riskPercentile
-          score
-          facilitiesCount
-          facilitiesCategory {
-            facilityCategoryId
-            facilitiesCount
-            score
-            risks {
-              year
-              relativeYear
-              facilitiesFireRisk
-            }
-          }
-        }
-      }
-      flood {
-        adaptationConnection {
-          totalCount
-        }
-        communityRisk {
-          riskPercentile
-          score
-          facilitiesCount
-          facilitiesCategory {
-            facilityCategoryId
-            facilitiesCount
-            score
-            risks {
-              facilitiesOperationalRisk
-              facilitiesWaterRisk
-              relativeYear
-              year
-            }
-          }
-        }
-      }
-    }
-    zcta {
-      name
-      air {
-        days {
-          outdoorDays {
-            relativeYear
-            color {
-              color
-            }
-            totalDays
-          }
-        }
-      }
-      fire {
-        communityRisk {
-          riskPercentile
-          score
-          facilitiesCount
-          facilitiesCategory {
-            facilityCategoryId
-            facilitiesCount
-            score
-            risks {
-              year
-              relativeYear
-              facilitiesFireRisk
-            }
-          }
-        }
-        AAL {
-          annualLossByYear {
-            relativeYear
-            avgDestroyed
-            damages
-            percent
-          }
-        }
-      }
-      flood {
-        adaptationConnection {
-          totalCount
-        }
-        communityRisk {
-          riskPercentile
-          score
-          facilitiesCount
-          facilitiesCategory {
-            facilityCategoryId
-            facilitiesCount
-            score
-            risks {
-              facilitiesOperationalRisk
-              facilitiesWaterRisk
-              relativeYear
-              year
-            }
-          }
-        }
-        insurance {
-          premiumMin
-          premiumMax
-          provider {
-            name
-            logo
-          }
-          purchaseLink
-          disclaimer
-        }
-      }
-      wind {
-        insurance {
-          policyExclusion
-          hudWindZone
-        }
-      }
-    }
-    buildingConnection(filter: { buildingId: $buildingId }) {
-      totalCount
-      edges {
-        node {
-          fsid
-          buildingId
-          hasBasement
-          units
-          stories
-          yearBuilt
-          sqft
-          replacementCostPerSqft
-          buildingOrientation
-          windDesignStandard
-          airFilterId
-          riskfactorLink
-          floorElevation
-          landuseCodeId
-          isResidential
-          construction {
-            material
-            combustibility
-          }
-          roof {
-            material
-            combustibility
-          }
-          exclusion {
-            description
-          }
-          geometry {
-            center {
-              coordinates
-              type
-            }
-            polygon {
-              coordinates
-              type
-            }
-            bbox {
-              coordinates
-              type
-            }
-          }
-          flood {
-            floodType
-            link
-            exclusion {
-              description
-            }
-            floodFactor
-            riskDirection
-            probability {
-             cumulative(
-                depths: [5, 15, 30, 61, 91, 122, 152, 183, 213, 244, 274, 305, 335, 366, 396, 427, 457, 488, 518, 549, 579, 610]
-              ) {
-                threshold
-                relativeYear
-                mid
-                yAxisHeightMid
-              }
-              depth {
-                returnPeriod
-                relativeYear
-                low
-                mid
-                high
-              }
-              depthMean: depth(filter: {depthFlavor: MEAN}) {
-                returnPeriod
-                relativeYear
-                low
-                mid
-                high
-              }
-            }
-            consequences {
-              annualized {
-                days
-                damages
-                relativeYear
-                percentile
-                ssp
-              }
-            }
-            historic {
-              eventId
-              name
-              affectedProperties
-              depth
-              month
-              year
-            }
-            insights {
-              name
-              details {
-                name
-                value
-              }
-            }
-          }
-          fire {
-            exclusion {
-              description
-            }
-            riskDirection
-            fireFactor
-            defensibleSpace
-            usfsRelativeRisk
-            probability {
-              damage {
-                conditional {
-                  flameLossConditional
-                  relativeYear
-                }
-              }
-              cumulative {
-                year
-                relativeYear
-                yAxisHeight
-                point
-              }
-              burn {
-                emberZone
-                relativeYear
-                percent
-                emberPercent
-                flamePercent
-                year
-                flameMax
-                flameMean
-                flameBin
-              }
-            }
-            insights {
-              name
-              details {
-                name
-                value
-              }
-            }
-          }
-          heat {
-            exclusion {
-              description
-            }
-            heatFactor
-            insights {
-              name
-              details {
-                name
-                value
-              }
-            }
-          }
-          wind {
-            windFactor
-            factorScale
-            riskDirection
-            hasTornadoRisk
-            hasThunderstormRisk
-            hasCycloneRisk
-            greatestWindRisk
-            missileEnvironment
-            primaryWindDirection
-            probability {
-              speed {
-                ssp
-                year
-                relativeYear
-                returnPeriod
-                maxSpeed
-                maxGust
-                category {
-                  windCategoryId
-                  name
-                  minWindSpeed
-                  maxWindSpeed
-                }
-              }
-              cumulative(
-                input: {thresholds: [50, 75, 100, 110, 120, 130, 140, 150, 160, 170, 180, 190, 200, 210, 220, 230, 240]}
-              ) {
-                ssp
-                year
-                relativeYear
-                threshold
-                probability
-                yMax
-                category {
-                  windCategoryId
-                  name
-                  minWindSpeed
-                  maxWindSpeed
-                }
-              }
-            }
-            exclusion {
-              description
-            }
-          }
-          air {
-            exclusion {
-              description
-            }
-            airFactor
-            factorScale
-            riskDirection
-            insights {
-              name
-              details {
-                name
-                value
-              }
-            }
-          }
-          property {
-            flood {
-              floodType
-              link
-              exclusion {
-                description
-              }
-              floodFactor
-              riskDirection
-              probability {
-                cumulative(depths: [5, 15, 30, 61, 91, 122, 152, 183, 213, 244, 274, 305, 335, 366, 396, 427, 457, 488, 518, 549, 579, 610]) {
-                  threshold
-                  relativeYear
-                  mid
-                  yAxisHeightMid
-                }
-                depth {
-                  returnPeriod
-                  relativeYear
-                  low
-                  mid
-                  high
-                }
-                depthMean: depth(filter: {depthFlavor: MEAN}) {
-                  returnPeriod
-                  relativeYear
-                  low
-                  mid
-                  high
-                }
-              }
-              insuranceRequirement
-              insuranceQuotes {
-                rates {
-                  providers
-                  minPrice
-                  maxPrice
-                  link
-                }
-              }
-              historic {
-                eventId
-                name
-                affectedProperties
-                depth
-                month
-                year
-              }
-              stats {
-                floodfactorRankInCity
-              }
-              adaptationConnection {
-                totalCount
-              }
-              insights {
-                name
-                details {
-                  name
-                  value
-                }
-              }
-              insuranceQuotes {
-                provider {
-                  name
-                }
-                rates {
-                  link
-                  minPrice
-                  maxPrice
-                }
-              }
-            }
-            fire {
-              exclusion {
-                description
-              }
-              riskDirection
-              fireFactor
-              defensibleSpace
-              usfsRelativeRisk
-              prescribedBurns: historicConnection(filter: {type: [PRESCRIBED_FIRE]}) {
-                totalCount
-              }
-              probability {
-                burn {
-                  emberZone
-                  relativeYear
-                  percent
-                  year
-                  flameMax
-                  flameMean
-                  flameBin
-                }
-                cumulative {
-                  year
-                  relativeYear
-                  point
-                  yAxisHeight
-                }
-              }
-              historicConnection(first: 100) {
-                totalCount
-                edges {
-                  node {
-                    ... on PropertyFireHistoric {
-                      eventId
-                      name
-                      distance
-                      month
-                      year
-                      area
-                      eventAffectedProperties
-                    }
-                  }
-                }
-              }
-              insuranceHippo {
-                rates {
-                  providers
-                  minPrice
-                  maxPrice
-                  link
-                }
-              }
-              insights {
-                name
-                details {
-                  name
-                  value
-                }
-              }
-            }
-            heat {
-              exclusion {
-                description
-              }
-              heatFactor
-              hotTemperature
-              anomalyTemperature
-              temperatureAverageHigh {
-                relativeYear
-                mmt
-              }
-              cooling {
-                coolingTemp
-                cost
-                costPerKwh
-                energy
-                relativeYear
-              }
-              heatWaves {
-                hotHeatWave {
-                  length
-                  relativeYear
-                  probability
-                }
-              }
-              days {
-                distribution {
-                  relativeYear
-                  binLower
-                  days
-                }
-                hotDays {
-                  relativeYear
-                  days
-                  yAxisHeight
-                }
-                anomalyDays {
-                  relativeYear
-                  days
-                }
-                coolingDays {
-                  relativeYear
-                  days
-                }
-                dangerousDays {
-                  relativeYear
-                  days
-                }
-                healthCautionDays {
-                  relativeYear
-                  days
-                }
-              }
-              insights {
-                name
-                details {
-                  name
-                  value
-                }
-              }
-            }
-            wind {
-              windFactor
-              factorScale
-              riskDirection
-              hasTornadoRisk
-              hasThunderstormRisk
-              hasCycloneRisk
-              greatestWindRisk
-              missileEnvironment
-              primaryWindDirection
-              probability {
-                speed {
-                  ssp
-                  year
-                  relativeYear
-                  returnPeriod
-                  maxSpeed
-                  maxGust
-                  category {
-                    windCategoryId
-                    name
-                    minWindSpeed
-                    maxWindSpeed
-                  }
-                }
-                direction {
-                  ssp
-                  direction
-                  percent
-                }
-                cumulative(
-                  input: {thresholds: [50, 75, 100, 110, 120, 130, 140, 150, 160, 170, 180, 190, 200, 210, 220, 230, 240]}
-                ) {
-                  ssp
-                  year
-                  relativeYear
-                  threshold
-                  probability
-                  yMax
-                  category {
-                    windCategoryId
-                    name
-                    minWindSpeed
-                    maxWindSpeed
-                  }
-                }
-              }
-              historicConnection(
-                first: 100
-                filter: {mappedEventsOnly: true}
-                sort: PROPERTIES_AFFECTED_DESC
-              ) {
-                pageInfo {
-                  hasNextPage
-                  endCursor
-                }
-                totalCount
-                edges {
-                  node {
-                    ... on PropertyWindHistoricEventThunderstorm {
-                      eventId
-                      eventType
-                      date
-                      year
-                      damages
-                      injuries
-                      fatalities
-                      maxWind
-                    }
-                    ... on PropertyWindHistoricEventTornado {
-                      eventId
-                      eventType
-                      date
-                      damages
-                      year
-                      fatalities
-                      injuries
-                      geometry {
-                        bbox {
-                          coordinates
-                          type
-                        }
-                      }
-                      category {
-                        tornadoCategoryId
-                        rating
-                        isEnhanced
-                        name
-                        minWindSpeed
-                        maxWindSpeed
-                        description
-                      }
-                    }
-                    ... on PropertyWindHistoricEventCyclone {
-                      localWindSpeed
-                      eventId
-                      eventType
-                      windSpeed
-                      name
-                      date
-                      year
-                      geometry {
-                        bbox {
-                          coordinates
-                          type
-                        }
-                      }
-                      categoryAtLandfall {
-                        windCategoryId
-                        name
-                        minWindSpeed
-                        maxWindSpeed
-                      }
-                      categoryMax {
-                        windCategoryId
-                        name
-                        minWindSpeed
-                        maxWindSpeed
-                      }
-                      categoryLocality {
-                        windCategoryId
-                        name
-                        minWindSpeed
-                        maxWindSpeed
-                      }
-                      affectedProperties
-                      affectedPropertiesNationwide
-                      hasDetails
-                    }
-                  }
-                }
-              }
-              exclusion {
-                description
-              }
-            }
-            air {
-              exclusion {
-                description
-              }
-              airFactor
-              factorScale
-              riskDirection
-              days {
-                outdoorDays {
-                  year
-                  relativeYear
-                  color {
-                    color
-                  }
-                  ozoneDays
-                  ozoneDaysYAxisHeight
-                  anthroPM25Days
-                  anthroPM25DaysYAxisHeight
-                  smokeMaxDays
-                  smokeMaxDaysYAxisHeight
-                  smokeAvgDays
-                  smokeAvgDaysYAxisHeight
-                  totalDays
-                  totalDaysYAxisHeight
-                }
-              }
-              greatestRisk {
-                criteriaPollutantId
-                name
-                description
-              }
-              triNearby
-              triFacilityConnection {
-                totalCount
-                edges {
-                  node {
-                    triFacilityId
-                    name
-                    industry {
-                      industrySectorId
-                      name
-                    }
-                  }
-                }
-              }
-              historic {
-                aqi {
-                  year
-                  aqiAvg
-                  aqiMax
-                  worstDate
-                  criteriaPollutant {
-                    criteriaPollutantId
-                    name
-                    description
-                  }
-                }
-                days(filter: {colorID: 3}) {
-                  year
-                  totalDays
-                }
-              }
-              insights {
-                name
-                details {
-                  name
-                  value
-                }
-              }
-              percentile {
-                national
-                state
-              }
-            }
-          }
-        }
-      }
-    }
-  }
+_WORD_CHARS = frozenset("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789_")
+
+
+def sel(head: str, *fields: str) -> str:
+    """Render `head { fields }` in minified GraphQL."""
+    parts = []
+    for field in fields:
+        if parts and parts[-1][-1] in _WORD_CHARS and field[0] in _WORD_CHARS:
+            parts.append(" ")
+        parts.append(field)
+    return f"{head}{{{''.join(parts)}}}"
+
+
+# Shared leaf blocks
+
+SHAPE = ("coordinates", "type")
+GEOMETRY = sel("geometry", sel("center", *SHAPE), sel("polygon", *SHAPE), sel("bbox", *SHAPE))
+BBOX_GEOMETRY = sel("geometry", sel("bbox", *SHAPE))
+EXCLUSION = sel("exclusion", "description")
+INSIGHTS = sel("insights", "name", sel("details", "name", "value"))
+RATES = sel("rates", "providers", "minPrice", "maxPrice", "link")
+COLOR = sel("color", "color")
+ADAPTATION_COUNT = sel("adaptationConnection", "totalCount")
+PRESCRIBED_BURNS = sel("prescribedBurns:historicConnection(filter:{type:[PRESCRIBED_FIRE]})", "totalCount")
+CRITERIA_POLLUTANT = ("criteriaPollutantId", "name", "description")
+WIND_CATEGORY = ("windCategoryId", "name", "minWindSpeed", "maxWindSpeed")
+
+FLOOD_DEPTHS = " ".join(str(depth) for depth in (
+    5, 15, 30, 61, 91, 122, 152, 183, 213, 244, 274, 305, 335, 366, 396, 427, 457, 488, 518, 549, 579, 610
+))
+WIND_THRESHOLDS = " ".join(str(speed) for speed in (
+    50, 75, 100, 110, 120, 130, 140, 150, 160, 170, 180, 190, 200, 210, 220, 230, 240
+))
+
+
+def community_risk(*risk_fields: str) -> str:
+    """Community facilities risk block shared by every geography."""
+    return sel(
+        "communityRisk",
+        "riskPercentile", "score", "facilitiesCount",
+        sel("facilitiesCategory", "facilityCategoryId", "facilitiesCount", "score", sel("risks", *risk_fields)),
+    )
+
+
+def outdoor_days(*fields: str) -> str:
+    """Air quality outdoor days summary shared by every geography."""
+    return sel("days", sel("outdoorDays", *fields))
+
+
+FIRE_COMMUNITY_RISK = community_risk("year", "relativeYear", "facilitiesFireRisk")
+FLOOD_COMMUNITY_RISK = community_risk("facilitiesOperationalRisk", "facilitiesWaterRisk", "relativeYear", "year")
+
+# Risk blocks
+
+FLOOD_DEPTH = ("returnPeriod", "relativeYear", "low", "mid", "high")
+FLOOD_PROBABILITY = sel(
+    "probability",
+    sel(f"cumulative(depths:[{FLOOD_DEPTHS}])", "threshold", "relativeYear", "mid", "yAxisHeightMid"),
+    sel("depth", *FLOOD_DEPTH),
+    sel("depthMean:depth(filter:{depthFlavor:MEAN})", *FLOOD_DEPTH),
+)
+FLOOD_HISTORIC = sel("historic", "eventId", "name", "affectedProperties", "depth", "month", "year")
+
+FIRE_RISK = ("riskDirection", "fireFactor", "defensibleSpace", "usfsRelativeRisk")
+FIRE_BURN = ("emberZone", "relativeYear", "percent", "year", "flameMax", "flameMean", "flameBin")
+
+WIND_FACTORS = (
+    "windFactor", "factorScale", "riskDirection", "hasTornadoRisk", "hasThunderstormRisk",
+    "hasCycloneRisk", "greatestWindRisk", "missileEnvironment", "primaryWindDirection",
+)
+WIND_SPEED = sel(
+    "speed", "ssp", "year", "relativeYear", "returnPeriod", "maxSpeed", "maxGust", sel("category", *WIND_CATEGORY)
+)
+WIND_CUMULATIVE = sel(
+    f"cumulative(input:{{thresholds:[{WIND_THRESHOLDS}]}})",
+    "ssp", "year", "relativeYear", "threshold", "probability", "yMax", sel("category", *WIND_CATEGORY),
+)
+WIND_HISTORIC = sel(
+    "historicConnection(first:100 filter:{mappedEventsOnly:true}sort:PROPERTIES_AFFECTED_DESC)",
+    sel("pageInfo", "hasNextPage", "endCursor"),
+    "totalCount",
+    sel("edges", sel(
+        "node",
+        sel("...on PropertyWindHistoricEventThunderstorm",
+            "eventId", "eventType", "date", "year", "damages", "injuries", "fatalities", "maxWind"),
+        sel("...on PropertyWindHistoricEventTornado",
+            "eventId", "eventType", "date", "damages", "year", "fatalities", "injuries", BBOX_GEOMETRY,
+            sel("category", "tornadoCategoryId", "rating", "isEnhanced", "name", "minWindSpeed", "maxWindSpeed",
+                "description")),
+        sel("...on PropertyWindHistoricEventCyclone",
+            "localWindSpeed", "eventId", "eventType", "windSpeed", "name", "date", "year", BBOX_GEOMETRY,
+            sel("categoryAtLandfall", *WIND_CATEGORY),
+            sel("categoryMax", *WIND_CATEGORY),
+            sel("categoryLocality", *WIND_CATEGORY),
+            "affectedProperties", "affectedPropertiesNationwide", "hasDetails"),
+    )),
+)
+
+FLOOD_SELECTION = sel(
+    "flood",
+    "floodType", "link", EXCLUSION, "floodFactor", "riskDirection", FLOOD_PROBABILITY,
+    "insuranceRequirement", sel("insuranceQuotes", RATES), FLOOD_HISTORIC,
+    sel("stats", "floodfactorRankInCity"), ADAPTATION_COUNT, INSIGHTS,
+)
+FIRE_SELECTION = sel(
+    "fire",
+    EXCLUSION, *FIRE_RISK, PRESCRIBED_BURNS,
+    sel("probability", sel("burn", *FIRE_BURN), sel("cumulative", "year", "relativeYear", "point", "yAxisHeight")),
+    sel("historicConnection(first:100)", "totalCount", sel("edges", sel("node", sel(
+        "...on PropertyFireHistoric",
+        "eventId", "name", "distance", "month", "year", "area", "eventAffectedProperties",
+    )))),
+    sel("insuranceHippo", RATES), INSIGHTS,
+)
+HEAT_SELECTION = sel(
+    "heat",
+    EXCLUSION, "heatFactor", "hotTemperature", "anomalyTemperature",
+    sel("temperatureAverageHigh", "relativeYear", "mmt"),
+    sel("cooling", "coolingTemp", "cost", "costPerKwh", "energy", "relativeYear"),
+    sel("heatWaves", sel("hotHeatWave", "length", "relativeYear", "probability")),
+    sel(
+        "days",
+        sel("distribution", "relativeYear", "binLower", "days"),
+        sel("hotDays", "relativeYear", "days", "yAxisHeight"),
+        *(sel(name, "relativeYear", "days")
+          for name in ("anomalyDays", "coolingDays", "dangerousDays", "healthCautionDays")),
+    ),
+    INSIGHTS,
+)
+WIND_SELECTION = sel(
+    "wind",
+    *WIND_FACTORS,
+    sel("probability", WIND_SPEED, sel("direction", "ssp", "direction", "percent"), WIND_CUMULATIVE),
+    WIND_HISTORIC, EXCLUSION,
+)
+AIR_SELECTION = sel(
+    "air",
+    EXCLUSION, "airFactor", "factorScale", "riskDirection",
+    outdoor_days(
+        "year", "relativeYear", COLOR, "ozoneDays", "ozoneDaysYAxisHeight", "anthroPM25Days",
+        "anthroPM25DaysYAxisHeight", "smokeMaxDays", "smokeMaxDaysYAxisHeight", "smokeAvgDays",
+        "smokeAvgDaysYAxisHeight", "totalDays", "totalDaysYAxisHeight",
+    ),
+    sel("greatestRisk", *CRITERIA_POLLUTANT),
+    "triNearby",
+    sel("triFacilityConnection", "totalCount", sel("edges", sel(
+        "node", "triFacilityId", "name", sel("industry", "industrySectorId", "name"),
+    ))),
+    sel(
+        "historic",
+        sel("aqi", "year", "aqiAvg", "aqiMax", "worstDate", sel("criteriaPollutant", *CRITERIA_POLLUTANT)),
+        sel("days(filter:{colorID:3})", "year", "totalDays"),
+    ),
+    INSIGHTS, sel("percentile", "national", "state"),
+)
+
+BUILDING_FLOOD_SELECTION = sel(
+    "flood",
+    "floodType", "link", EXCLUSION, "floodFactor", "riskDirection", FLOOD_PROBABILITY,
+    sel("consequences", sel("annualized", "days", "damages", "relativeYear", "percentile", "ssp")),
+    FLOOD_HISTORIC, INSIGHTS,
+)
+BUILDING_FIRE_SELECTION = sel(
+    "fire",
+    EXCLUSION, *FIRE_RISK,
+    sel(
+        "probability",
+        sel("damage", sel("conditional", "flameLossConditional", "relativeYear")),
+        sel("cumulative", "year", "relativeYear", "yAxisHeight", "point"),
+        sel("burn", *FIRE_BURN, "emberPercent", "flamePercent"),
+    ),
+    INSIGHTS,
+)
+BUILDING_HEAT_SELECTION = sel("heat", EXCLUSION, "heatFactor", INSIGHTS)
+BUILDING_WIND_SELECTION = sel("wind", *WIND_FACTORS, sel("probability", WIND_SPEED, WIND_CUMULATIVE), EXCLUSION)
+BUILDING_AIR_SELECTION = sel("air", EXCLUSION, "airFactor", "factorScale", "riskDirection", INSIGHTS)
+
+RISK_SELECTIONS = {
+    "flood": FLOOD_SELECTION,
+    "fire": FIRE_SELECTION,
+    "heat": HEAT_SELECTION,
+    "wind": WIND_SELECTION,
+    "air": AIR_SELECTION,
+}
+
+BUILDING_RISK_SELECTIONS = {
+    "flood": BUILDING_FLOOD_SELECTION,
+    "fire": BUILDING_FIRE_SELECTION,
+    "heat": BUILDING_HEAT_SELECTION,
+    "wind": BUILDING_WIND_SELECTION,
+    "air": BUILDING_AIR_SELECTION,
+}
+
+# Property, building and geography blocks
+
+BUILDING_DETAILS = (
+    "buildingId", "hasBasement", "units", "stories",
+    sel("construction", "combustibility", "material"),
+    sel("roof", "combustibility", "material"),
+    "yearBuilt", "sqft", "replacementCostPerSqft", "buildingOrientation", "windDesignStandard", "airFilterId",
+)
+
+STATE_SELECTION = sel(
+    "state",
+    "name",
+    sel(
+        "air",
+        outdoor_days("year", "relativeYear", COLOR, "totalDays"),
+        sel(
+            "stats",
+            sel("worstCities", "name", "fsid", sel("state", "name"), "slug"),
+            sel("bestCities", "name", "fsid", "slug", sel("state", "name")),
+        ),
+    ),
+    sel("heat", sel("emissions", "co2PerMWh")),
+)
+CITY_SELECTION = sel(
+    "city",
+    "fsid", "name",
+    sel("fire", FIRE_COMMUNITY_RISK),
+    sel(
+        "flood",
+        ADAPTATION_COUNT, FLOOD_COMMUNITY_RISK,
+        sel("historic", "name", "eventId", "affectedProperties", "month", "year"),
+    ),
+    sel("air", outdoor_days("year", "relativeYear", COLOR, "totalDays")),
+)
+COUNTY_SELECTION = sel(
+    "county",
+    "fsid", "name", "isCoastal", GEOMETRY,
+    sel(
+        "air",
+        outdoor_days("year", "relativeYear", COLOR, "totalDays"),
+        sel("nonAttainments", "classification", "part", sel("criteriaPollutant", *CRITERIA_POLLUTANT)),
+    ),
+    sel(
+        "flood",
+        sel("historic", "eventId", "month", "year", "name", "affectedProperties", sel("data", "count", "bin")),
+        sel("SoVI", "percentile"),
+        ADAPTATION_COUNT,
+        sel("floodAdaptationConnection(first:100 filter:{types:[6 19 20 30 32]})", "totalCount", sel("edges", sel(
+            "node", "adaptationId", "scenario", "name", "type", sel("serving", "property"),
+        ))),
+        FLOOD_COMMUNITY_RISK,
+    ),
+    sel("fire", PRESCRIBED_BURNS, FIRE_COMMUNITY_RISK),
+    sel("wind", "riskLevel", sel("atRisk", "propertyCount", "level")),
+)
+NEIGHBORHOOD_SELECTION = sel(
+    "neighborhood",
+    "name",
+    sel("air", outdoor_days("relativeYear", COLOR, "totalDays")),
+    sel("fire", FIRE_COMMUNITY_RISK),
+    sel("flood", ADAPTATION_COUNT, FLOOD_COMMUNITY_RISK),
+)
+ZCTA_SELECTION = sel(
+    "zcta",
+    "name",
+    sel("air", outdoor_days("relativeYear", COLOR, "totalDays")),
+    sel(
+        "fire",
+        FIRE_COMMUNITY_RISK,
+        sel("AAL", sel("annualLossByYear", "relativeYear", "avgDestroyed", "damages", "percent")),
+    ),
+    sel(
+        "flood",
+        ADAPTATION_COUNT, FLOOD_COMMUNITY_RISK,
+        sel("insurance", "premiumMin", "premiumMax", sel("provider", "name", "logo"), "purchaseLink", "disclaimer"),
+    ),
+    sel("wind", sel("insurance", "policyExclusion", "hudWindZone")),
+)
+
+# Building nodes carry their own risk blocks only; the parent property's
+# blocks are already selected at the top level of the query.
+BUILDING_CONNECTION_SELECTION = sel(
+    "buildingConnection(filter:{buildingId:$buildingId})",
+    "totalCount",
+    sel("edges", sel(
+        "node",
+        "fsid", "buildingId", "hasBasement", "units", "stories", "yearBuilt", "sqft", "replacementCostPerSqft",
+        "buildingOrientation", "windDesignStandard", "airFilterId", "riskfactorLink", "floorElevation",
+        "landuseCodeId", "isResidential",
+        sel("construction", "material", "combustibility"),
+        sel("roof", "material", "combustibility"),
+        EXCLUSION, GEOMETRY,
+        *BUILDING_RISK_SELECTIONS.values(),
+    )),
+)
+
+QUERY_VARIABLES = "($fsid:Int64!$buildingId:[Int!])"
+
+PROPERTY_BY_FSID_QUERY = sel(
+    f"query PropertyByFSID{QUERY_VARIABLES}",
+    sel(
+        "property(fsid:$fsid)",
+        *RISK_SELECTIONS.values(),
+        sel("buildingConnectionTotalCount:buildingConnection", "totalCount"),
+        EXCLUSION, "fsid", "isResidential",
+        STATE_SELECTION,
+        sel("address", "formattedAddress"),
+        sel("alternativeAddresses", "formattedAddress"),
+        "femaZone", "floorElevation", "footprint", "parcelAcres", "landuseCodeId",
+        sel("building", *BUILDING_DETAILS),
+        GEOMETRY,
+        CITY_SELECTION, COUNTY_SELECTION, NEIGHBORHOOD_SELECTION, ZCTA_SELECTION,
+        BUILDING_CONNECTION_SELECTION,
+    ),
+)
+
+
+def build_risk_query(risk_type: str) -> str:
+    """Build a query fetching a single risk type for the property and its buildings."""
+    return sel(
+        f"query Property{risk_type.capitalize()}ByFSID{QUERY_VARIABLES}",
+        sel(
+            "property(fsid:$fsid)",
+            "fsid",
+            RISK_SELECTIONS[risk_type],
+            sel("buildingConnection(filter:{buildingId:$buildingId})", sel("edges", sel(
+                "node", "buildingId", BUILDING_RISK_SELECTIONS[risk_type],
+            ))),
+        ),
+    )
+
+
+# One small query per risk type, so each can be refreshed on its own cadence
+RISK_QUERIES = {risk_type: build_risk_query(risk_type) for risk_type in RISK_SELECTIONS}
+
+
+class QueryDocument(NamedTuple):
+    """A minified query with everything needed to send it precomputed."""
+
+    text: str
+    sha256: str
+    encoded: str  # `text` as a JSON string literal, ready to splice into a request body
+
+
+_TOKEN_RE = re.compile(r'''
+    (?P<block_string>"""(?:\\"""|[^"]|"(?!""))*""")
+    |(?P<string>"(?:\\.|[^"\\])*")
+    |(?P<ignored>(?:[\s,\ufeff]|\#[^\n]*)+)
+    |(?P<token>\.\.\.|[A-Za-z0-9_.+-]+|.)
+''', re.VERBOSE)
+
+
+def minify_query(query: str) -> str:
+    """
+    Strip comments, commas and insignificant whitespace from a GraphQL document.
+
+    A single space is kept only where two names or numbers would otherwise run
+    together; string literals are left untouched.
+    """
+    parts = []
+    for match in _TOKEN_RE.finditer(query):
+        if match.lastgroup == "ignored":
+            continue
+        token = match.group()
+        if parts and parts[-1][-1] in _WORD_CHARS and token[0] in _WORD_CHARS:
+            parts.append(" ")
+        parts.append(token)
+    return "".join(parts)
+
+
+def compile_query(query: str, minified: bool = False) -> QueryDocument:
+    """
+    Minify a query and precompute its SHA-256 and JSON encoding.
+
+    :param query: The GraphQL document
+    :param minified: Skip minification for documents built with `sel`
+    """
+    text = query if minified else minify_query(query)
+    return QueryDocument(
+        text=text,
+        sha256=hashlib.sha256(text.encode("utf-8")).hexdigest(),
+        encoded=json.dumps(text),
+    )
+
+
+PROPERTY_BY_FSID_DOCUMENT = compile_query(PROPERTY_BY_FSID_QUERY, minified=True)
+RISK_DOCUMENTS = {
+    risk_type: compile_query(query, minified=True) for risk_type, query in RISK_QUERIES.items()
 }
 
-"""
 
-# You can add more queries here in the future if needed
\ No newline at end of file
+def build_exists_query(count: int) -> str:
+    """
+    Build a query checking that `count` properties (and buildings) exist, one alias each.
+
+    Alias `p<i>` selects only the FSID and how many buildings match
+    `$buildingId<i>`, so a batch of checks costs one small response.
+    """
+    variables = "".join(f"$fsid{index}:Int64!$buildingId{index}:[Int!]" for index in range(count))
+    return sel(f"query PropertiesExist({variables})", *(
+        sel(
+            f"p{index}:property(fsid:$fsid{index})",
+            "fsid",
+            sel(f"buildingConnection(filter:{{buildingId:$buildingId{index}}})", "totalCount"),
+        )
+        for index in range(count)
+    ))
+
+
+@functools.lru_cache(maxsize=8)
+def exists_document(count: int) -> QueryDocument:
+    """The compiled `build_exists_query` for a batch size; batches mostly share one size."""
+    return compile_query(build_exists_query(count), minified=True)
@@ -0,0 +1,145 @@
+"""Remember responses so unchanged ones skip decoding and parsing."""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, NamedTuple, Optional, Tuple
+
+DEFAULT_RESPONSE_MAXSIZE = 256
+DEFAULT_NEGATIVE_TTL = 6 * 3600
+DEFAULT_NEGATIVE_MAXSIZE = 4096
+
+
+def body_digest(content: bytes) -> bytes:
+    """Hash a response body; equal digests mean byte-identical documents."""
+    return hashlib.blake2b(content, digest_size=16).digest()
+
+
+class CachedResponse(NamedTuple):
+    """The last successful response to one request."""
+
+    body_hash: bytes
+    etag: Optional[str]
+    last_modified: Optional[str]
+    data: Dict[str, Any]
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """Headers asking the server to answer 304 if nothing changed."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """
+    Decoded responses keyed by request (endpoint and body).
+
+    The request body already encodes the query and its variables, so one
+    entry exists per (fsid, building ID, query). Only successful GraphQL
+    responses are kept, at most `maxsize` of them: the least recently used
+    is evicted first. Safe to share between threads, e.g. the workers of
+    `fetch_properties`.
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_RESPONSE_MAXSIZE):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[bytes, CachedResponse]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(endpoint: str, body: bytes) -> bytes:
+        digest = hashlib.blake2b(endpoint.encode("utf-8"), digest_size=16)
+        digest.update(b"\0")
+        digest.update(body)
+        return digest.digest()
+
+    def get(self, key: bytes) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def store(self, key: bytes, response: Any, digest: bytes, data: Dict[str, Any]) -> None:
+        """Remember a decoded response unless it carries GraphQL errors, evicting the least recently used when full."""
+        with self._lock:
+            self._entries.pop(key, None)
+            if "errors" in data or "data" not in data:
+                return
+            self._entries[key] = CachedResponse(
+                digest,
+                response.headers.get("ETag"),
+                response.headers.get("Last-Modified"),
+                data,
+            )
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class NotFound(NamedTuple):
+    """A remembered "property not found" answer."""
+
+    expires_at: float
+    details: Any
+
+
+class NegativeCache:
+    """
+    (fsid, building_id) pairs the API reported as not found, each kept for `ttl` seconds.
+
+    Only missing properties are remembered; transport and other API errors
+    never are, so a flaky connection cannot mark a valid FSID as bad. Safe to
+    share between clients and threads.
+    """
+
+    def __init__(
+        self,
+        ttl: float = DEFAULT_NEGATIVE_TTL,
+        maxsize: int = DEFAULT_NEGATIVE_MAXSIZE,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._clock = clock
+        self._entries: "OrderedDict[Tuple[int, Optional[int]], NotFound]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, fsid: int, building_id: Optional[int]) -> Optional[NotFound]:
+        """Return the unexpired not-found answer for a property, or None."""
+        key = (fsid, building_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at <= self._clock():
+                del self._entries[key]
+                return None
+            return entry
+
+    def add(self, fsid: int, building_id: Optional[int], details: Any = None) -> None:
+        """Remember that a property was not found, evicting the oldest entry when full."""
+        key = (fsid, building_id)
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = NotFound(self._clock() + self.ttl, details)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def discard(self, fsid: int, building_id: Optional[int]) -> None:
+        with self._lock:
+            self._entries.pop((fsid, building_id), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
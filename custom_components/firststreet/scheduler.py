@@ -0,0 +1,180 @@
+"""Pace the fetches of many config entries: first fetches at startup, then periodic refreshes."""
+import asyncio
+import heapq
+import logging
+import time
+from typing import Any, Awaitable, Callable, List, Optional, Protocol, TypeVar
+
+_LOGGER = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class SetupScheduler:
+    """
+    Start first fetches no more than `max_concurrent` at a time, spread over a warm-up window.
+
+    Each fetch gets the next start slot: slots are `warmup / entries` seconds
+    apart, so the entries known at startup all start within `warmup`
+    seconds. A fetch whose slot has passed (an entry added later, or after
+    a slow warm-up) starts as soon as it is under the concurrency cap.
+
+    Everything runs in the event loop; the scheduler only waits, the fetch
+    itself decides where its work runs.
+    """
+
+    def __init__(
+        self,
+        entries: int,
+        max_concurrent: int = 4,
+        warmup: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        :param entries: How many config entries will set up during the warm-up
+        :param max_concurrent: How many first fetches may run at once
+        :param warmup: Seconds to spread the first fetches over
+        :param clock: Monotonic clock, replaceable in tests
+        """
+        if max_concurrent < 1:
+            raise ValueError("max_concurrent must be at least 1")
+        self.spacing = warmup / entries if entries > 1 else 0.0
+        self._clock = clock
+        self._next_start = clock()
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+
+    def _reserve(self) -> float:
+        """Take the next start slot, returning the seconds until it."""
+        now = self._clock()
+        start = max(now, self._next_start)
+        self._next_start = start + self.spacing
+        return start - now
+
+    async def run(self, fetch: Callable[[], Awaitable[T]]) -> T:
+        """
+        Wait for a start slot and a free fetch, then run `fetch`.
+
+        :param fetch: Coroutine function doing the first fetch
+        :return: What `fetch` returned
+        """
+        delay = self._reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        async with self._semaphore:
+            return await fetch()
+
+
+class Refreshable(Protocol):
+    """What `RefreshQueue` needs of a coordinator."""
+
+    def refresh_cost(self, now: Any) -> int:
+        """Requests the next refresh would send; 0 if nothing is due."""
+
+    def refresh_priority(self, now: Any) -> float:
+        """How urgent the refresh is; higher goes first."""
+
+    async def async_refresh_due(self) -> None:
+        """Refresh what is due, publishing the result (or the failure) to listeners."""
+
+
+def refresh_priority(overdue: float, importance: float, in_use: bool, in_use_weight: float = 2.0) -> float:
+    """
+    Weigh how overdue a refresh is by how much its property matters.
+
+    Staleness keeps growing while a refresh is deferred, so a property of
+    low importance is eventually refreshed ahead of fresher important ones.
+
+    :param overdue: Time since the last fetch over the refresh interval (1.0 = just due)
+    :param importance: Weight the user assigned to the property
+    :param in_use: Whether automations or scripts use the property's entities
+    :param in_use_weight: Extra weight of properties in use
+    :return: The priority
+    """
+    return overdue * importance * (in_use_weight if in_use else 1.0)
+
+
+class RefreshQueue:
+    """
+    Refresh the most urgent due coordinators each cycle, within a request budget.
+
+    Each `drain` orders the coordinators with something due by
+    `refresh_priority` and takes them until `budget` requests are planned;
+    the rest wait for the next cycle, more overdue and so more urgent.
+    """
+
+    def __init__(self, budget: Optional[int] = None, max_concurrent: int = 4):
+        """
+        :param budget: Requests per cycle, or None for no limit
+        :param max_concurrent: How many refreshes may run at once
+        """
+        self.budget = budget
+        self.max_concurrent = max_concurrent
+        self._items: List[Refreshable] = []
+        self._draining = False
+
+    def add(self, item: Refreshable) -> Callable[[], None]:
+        """
+        Queue a coordinator's refreshes.
+
+        :param item: The coordinator
+        :return: A function removing it again
+        """
+        self._items.append(item)
+        return lambda: self._items.remove(item)
+
+    def plan(self, now: Any) -> List[Refreshable]:
+        """
+        Pick this cycle's refreshes, most urgent first.
+
+        A refresh costing more than the budget left is skipped for cheaper
+        ones, except that the first refresh of a cycle always goes ahead.
+
+        :param now: Current time, passed on to the coordinators
+        :return: The coordinators to refresh
+        """
+        due = []
+        for sequence, item in enumerate(self._items):
+            cost = item.refresh_cost(now)
+            if cost:
+                due.append((-item.refresh_priority(now), sequence, cost, item))
+        heap = list(due)
+        heapq.heapify(heap)
+        remaining = self.budget
+        planned: List[Refreshable] = []
+        while heap and remaining != 0:
+            _, _, cost, item = heapq.heappop(heap)
+            if remaining is not None:
+                if cost > remaining and planned:
+                    continue
+                remaining = max(remaining - cost, 0)
+            planned.append(item)
+        deferred = len(due) - len(planned)
+        if deferred:
+            _LOGGER.debug("Deferring %d due refreshes to the next cycle", deferred)
+        return planned
+
+    async def drain(self, now: Any) -> int:
+        """
+        Run this cycle's refreshes, at most `max_concurrent` at once.
+
+        A cycle starting while the last one still runs is skipped.
+
+        :param now: Current time, passed on to the coordinators
+        :return: How many refreshes ran
+        """
+        if self._draining:
+            _LOGGER.debug("Skipping a refresh cycle, the last one is still running")
+            return 0
+        self._draining = True
+        try:
+            planned = self.plan(now)
+            semaphore = asyncio.Semaphore(self.max_concurrent)
+
+            async def refresh(item: Refreshable) -> None:
+                async with semaphore:
+                    await item.async_refresh_due()
+
+            await asyncio.gather(*(refresh(item) for item in planned))
+            return len(planned)
+        finally:
+            self._draining = False
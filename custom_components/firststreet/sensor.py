@@ -2,7 +2,6 @@
 from __future__ import annotations
 
 import logging
-from datetime import timedelta
 
 from homeassistant.components.sensor import (
     SensorEntity,
@@ -11,67 +10,40 @@ from homeassistant.components.sensor import (
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import (
-    CoordinatorEntity,
-    DataUpdateCoordinator,
-    UpdateFailed,
-)
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
+from .buildings import RISK_TYPES
 from .const import DOMAIN
-from .firststreet_api import FirstStreetAPI
+from .coordinator import FirstStreetDataUpdateCoordinator
 
 _LOGGER = logging.getLogger(__name__)
 
-SCAN_INTERVAL = timedelta(hours=1)
-
 async def async_setup_entry(
     hass: HomeAssistant,
     config_entry: ConfigEntry,
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up the FirstStreet sensor platform."""
-    api: FirstStreetAPI = hass.data[DOMAIN][config_entry.entry_id]
-    fsid = config_entry.data["fsid"]
-    building_id = config_entry.data.get("building_id", 0)
-
-    coordinator = FirstStreetDataUpdateCoordinator(hass, api, fsid, building_id)
-
-    await coordinator.async_config_entry_first_refresh()
-
-    async_add_entities(
-        [
-            FirstStreetFloodSensor(coordinator),
-            FirstStreetFireSensor(coordinator),
-            FirstStreetHeatSensor(coordinator),
-            FirstStreetWindSensor(coordinator),
-            FirstStreetAirSensor(coordinator),
-        ]
-    )
-
-class FirstStreetDataUpdateCoordinator(DataUpdateCoordinator):
-    """Class to manage fetching FirstStreet data."""
-
-    def __init__(self, hass, api, fsid, building_id):
-        """Initialize."""
-        self.api = api
-        self.fsid = fsid
-        self.building_id = building_id
-
-        super().__init__(
-            hass,
-            _LOGGER,
-            name=DOMAIN,
-            update_interval=SCAN_INTERVAL,
+    # Refreshed (or restored from storage) by `async_setup_entry` before forwarding
+    coordinator: FirstStreetDataUpdateCoordinator = hass.data[DOMAIN][config_entry.entry_id]
+
+    entities = [
+        FirstStreetFloodSensor(coordinator),
+        FirstStreetFireSensor(coordinator),
+        FirstStreetHeatSensor(coordinator),
+        FirstStreetWindSensor(coordinator),
+        FirstStreetAirSensor(coordinator),
+    ]
+    for building_id in coordinator.data.get('buildings', {}):
+        if building_id == coordinator.building_id:
+            # The property-level sensors already show the building this entry targets
+            continue
+        entities.extend(
+            FirstStreetBuildingSensor(coordinator, building_id, risk_type)
+            for risk_type in RISK_TYPES
         )
 
-    async def _async_update_data(self):
-        """Fetch data from FirstStreet API."""
-        try:
-            return await self.hass.async_add_executor_job(
-                self.api.get_all_risk_data, self.fsid, self.building_id
-            )
-        except Exception as err:
-            raise UpdateFailed(f"Error communicating with API: {err}")
+    async_add_entities(entities)
 
 class FirstStreetBaseSensor(CoordinatorEntity, SensorEntity):
     """Base representation of a FirstStreet Sensor."""
@@ -96,6 +68,16 @@ class FirstStreetBaseSensor(CoordinatorEntity, SensorEntity):
         """Return the state class of the sensor."""
         return SensorStateClass.MEASUREMENT
 
+    @property
+    def _risk_data(self):
+        data = self.coordinator.data
+        return data.get(self._risk_type) if data else None
+
+    @property
+    def available(self):
+        """Return True if the last refresh returned usable data for this risk type."""
+        return super().available and self._risk_data is not None
+
 class FirstStreetFloodSensor(FirstStreetBaseSensor):
     """Representation of a FirstStreet Flood Sensor."""
 
@@ -106,12 +88,13 @@ class FirstStreetFloodSensor(FirstStreetBaseSensor):
     @property
     def state(self):
         """Return the state of the sensor."""
-        return self.coordinator.data['flood']['flood_factor']
+        risk_data = self._risk_data
+        return risk_data['flood_factor'] if risk_data else None
 
     @property
     def extra_state_attributes(self):
         """Return the state attributes."""
-        return self.coordinator.data['flood']
+        return self._risk_data
 
 class FirstStreetFireSensor(FirstStreetBaseSensor):
     """Representation of a FirstStreet Fire Sensor."""
@@ -123,12 +106,13 @@ class FirstStreetFireSensor(FirstStreetBaseSensor):
     @property
     def state(self):
         """Return the state of the sensor."""
-        return self.coordinator.data['fire']['fire_factor']
+        risk_data = self._risk_data
+        return risk_data['fire_factor'] if risk_data else None
 
     @property
     def extra_state_attributes(self):
         """Return the state attributes."""
-        return self.coordinator.data['fire']
+        return self._risk_data
 
 class FirstStreetHeatSensor(FirstStreetBaseSensor):
     """Representation of a FirstStreet Heat Sensor."""
@@ -140,12 +124,13 @@ class FirstStreetHeatSensor(FirstStreetBaseSensor):
     @property
     def state(self):
         """Return the state of the sensor."""
-        return self.coordinator.data['heat']['heat_factor']
+        risk_data = self._risk_data
+        return risk_data['heat_factor'] if risk_data else None
 
     @property
     def extra_state_attributes(self):
         """Return the state attributes."""
-        return self.coordinator.data['heat']
+        return self._risk_data
 
 class FirstStreetWindSensor(FirstStreetBaseSensor):
     """Representation of a FirstStreet Wind Sensor."""
@@ -157,12 +142,13 @@ class FirstStreetWindSensor(FirstStreetBaseSensor):
     @property
     def state(self):
         """Return the state of the sensor."""
-        return self.coordinator.data['wind']['wind_factor']
+        risk_data = self._risk_data
+        return risk_data['wind_factor'] if risk_data else None
 
     @property
     def extra_state_attributes(self):
         """Return the state attributes."""
-        return self.coordinator.data['wind']
+        return self._risk_data
 
 class FirstStreetAirSensor(FirstStreetBaseSensor):
     """Representation of a FirstStreet Air Quality Sensor."""
@@ -174,9 +160,44 @@ class FirstStreetAirSensor(FirstStreetBaseSensor):
     @property
     def state(self):
         """Return the state of the sensor."""
-        return self.coordinator.data['air']['air_factor']
+        risk_data = self._risk_data
+        return risk_data['air_factor'] if risk_data else None
+
+    @property
+    def extra_state_attributes(self):
+        """Return the state attributes."""
+        return self._risk_data
+
+class FirstStreetBuildingSensor(FirstStreetBaseSensor):
+    """Representation of one risk type of a single building on the parcel."""
+
+    def __init__(self, coordinator, building_id: int, risk_type: str):
+        """Initialize the sensor."""
+        super().__init__(coordinator, risk_type)
+        self._building_id = building_id
+
+    @property
+    def _risk_data(self):
+        building = (self.coordinator.data or {}).get('buildings', {}).get(self._building_id)
+        return building[self._risk_type] if building else None
+
+    @property
+    def name(self):
+        """Return the name of the sensor."""
+        return f"FirstStreet Building {self._building_id} {self._risk_type.capitalize()}"
+
+    @property
+    def unique_id(self):
+        """Return a unique ID to use for this entity."""
+        return f"{DOMAIN}_{self.coordinator.fsid}_{self._building_id}_{self._risk_type}"
+
+    @property
+    def state(self):
+        """Return the state of the sensor."""
+        risk_data = self._risk_data
+        return risk_data[f'{self._risk_type}_factor'] if risk_data else None
 
     @property
     def extra_state_attributes(self):
         """Return the state attributes."""
-        return self.coordinator.data['air']
\ No newline at end of file
+        return self._risk_data
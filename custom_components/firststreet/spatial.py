@@ -0,0 +1,296 @@
+"""In-memory spatial index over property centroids."""
+import heapq
+import math
+import threading
+from typing import Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+EARTH_RADIUS_KM = 6371.0088
+
+Point = Tuple[float, float]
+
+
+def _to_unit_vector(lon: float, lat: float) -> Tuple[float, float, float]:
+    """Project a longitude/latitude pair onto the unit sphere."""
+    lon_rad = math.radians(lon)
+    lat_rad = math.radians(lat)
+    cos_lat = math.cos(lat_rad)
+    return (cos_lat * math.cos(lon_rad), cos_lat * math.sin(lon_rad), math.sin(lat_rad))
+
+
+def _chord_for_distance(distance_km: float) -> float:
+    """Straight-line distance through the sphere for a great-circle distance."""
+    angle = min(distance_km / EARTH_RADIUS_KM, math.pi)
+    return 2.0 * math.sin(angle / 2.0)
+
+
+def _distance_for_chord(chord: float) -> float:
+    """Great-circle distance in km for a straight-line distance on the unit sphere."""
+    return 2.0 * EARTH_RADIUS_KM * math.asin(min(chord / 2.0, 1.0))
+
+
+def _local_xy(point: Point, origin: Point) -> Tuple[float, float]:
+    """Project a point onto the plane tangent at `origin`, in km (accurate over a few hundred km)."""
+    scale = math.radians(1.0) * EARTH_RADIUS_KM
+    delta_lon = (point[0] - origin[0] + 180.0) % 360.0 - 180.0
+    return delta_lon * scale * math.cos(math.radians(origin[1])), (point[1] - origin[1]) * scale
+
+
+def distance_to_polygon_km(point: Point, ring: Sequence[Point]) -> float:
+    """
+    Distance in km from a point to a polygon, 0 if the point is inside it.
+
+    :param point: `(lon, lat)` of the point
+    :param ring: `(lon, lat)` vertices of the polygon's outer ring, closed or not
+    :return: The distance to the nearest edge, or 0.0 inside the polygon
+    """
+    vertices = [_local_xy(vertex, point) for vertex in ring]
+    inside = False
+    nearest = math.inf
+    for (x1, y1), (x2, y2) in zip(vertices, vertices[1:] + vertices[:1]):
+        # Cast a ray from the point (the origin) along +x and count the edges it crosses
+        if (y1 > 0) != (y2 > 0) and x1 - y1 * (x2 - x1) / (y2 - y1) > 0:
+            inside = not inside
+        dx, dy = x2 - x1, y2 - y1
+        length_sq = dx * dx + dy * dy
+        along = 0.0 if length_sq == 0 else max(0.0, min(1.0, -(x1 * dx + y1 * dy) / length_sq))
+        nearest = min(nearest, math.hypot(x1 + along * dx, y1 + along * dy))
+    return 0.0 if inside else nearest
+
+
+def centroid_from_geometry(geometry: Optional[dict]) -> Optional[Point]:
+    """
+    Extract a `(lon, lat)` centroid from a FirstStreet geometry block.
+
+    Uses `center` when present and falls back to the middle of `bbox`.
+
+    :param geometry: The `geometry` block of a property or building
+    :return: The centroid, or None if the geometry has no usable coordinates
+    """
+    if not geometry:
+        return None
+    center = (geometry.get("center") or {}).get("coordinates")
+    if center and len(center) >= 2:
+        return (float(center[0]), float(center[1]))
+    bbox = (geometry.get("bbox") or {}).get("coordinates")
+    if bbox:
+        ring = bbox[0] if isinstance(bbox[0][0], (list, tuple)) else bbox
+        lons = [float(coord[0]) for coord in ring]
+        lats = [float(coord[1]) for coord in ring]
+        return ((min(lons) + max(lons)) / 2.0, (min(lats) + max(lats)) / 2.0)
+    return None
+
+
+class PropertyIndex:
+    """Static KD-tree over property centroids.
+
+    Points are stored as 3D unit vectors so that Euclidean (chord) distance is
+    monotonic in great-circle distance, which keeps radius and nearest
+    neighbour queries exact everywhere on the globe, including across the
+    antimeridian. Build once per portfolio snapshot; queries are logarithmic in
+    the number of properties.
+    """
+
+    def __init__(self, centroids: Dict[Hashable, Point]):
+        self._keys: List[Hashable] = list(centroids)
+        self._centroids = [centroids[key] for key in self._keys]
+        self._points = [_to_unit_vector(*centroids[key]) for key in self._keys]
+        # Implicit tree: each node is (index, axis, left, right)
+        self._nodes: List[Tuple[int, int, int, int]] = []
+        self._root = self._build(list(range(len(self._keys))), 0)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def _build(self, indices: List[int], depth: int) -> int:
+        if not indices:
+            return -1
+        axis = depth % 3
+        indices.sort(key=lambda i: self._points[i][axis])
+        middle = len(indices) // 2
+        node_id = len(self._nodes)
+        self._nodes.append((indices[middle], axis, -1, -1))
+        left = self._build(indices[:middle], depth + 1)
+        right = self._build(indices[middle + 1:], depth + 1)
+        self._nodes[node_id] = (indices[middle], axis, left, right)
+        return node_id
+
+    def within_radius(self, lon: float, lat: float, radius_km: float) -> List[Tuple[Hashable, float]]:
+        """
+        Find all properties within a great-circle distance of a point.
+
+        :param lon: Longitude of the query point
+        :param lat: Latitude of the query point
+        :param radius_km: Search radius in kilometres
+        :return: `(key, distance_km)` pairs sorted by distance
+        """
+        found = [
+            (self._keys[index], _distance_for_chord(chord))
+            for index, chord in self._within_chord(_to_unit_vector(lon, lat), _chord_for_distance(radius_km))
+        ]
+        found.sort(key=lambda item: item[1])
+        return found
+
+    def _within_chord(self, target: Tuple[float, float, float], limit: float) -> List[Tuple[int, float]]:
+        """Return `(index, chord)` of the points within `limit` of `target` on the unit sphere."""
+        limit_sq = limit * limit
+        found = []
+        stack = [self._root]
+        while stack:
+            node_id = stack.pop()
+            if node_id < 0:
+                continue
+            index, axis, left, right = self._nodes[node_id]
+            point = self._points[index]
+            dist_sq = sum((a - b) ** 2 for a, b in zip(point, target))
+            if dist_sq <= limit_sq:
+                found.append((index, math.sqrt(dist_sq)))
+            delta = target[axis] - point[axis]
+            if delta <= limit:
+                stack.append(left)
+            if delta >= -limit:
+                stack.append(right)
+        return found
+
+    def within_distance_of(self, points: Iterable[Point], radius_km: float) -> Dict[Hashable, float]:
+        """
+        Find all properties within a distance of any of several points.
+
+        Useful for facility lists; for an area such as a wildfire perimeter,
+        use `within_distance_of_polygon`, which also measures to its edges.
+
+        :param points: `(lon, lat)` query points
+        :param radius_km: Search radius in kilometres
+        :return: Mapping of property key to the smallest distance found
+        """
+        matches: Dict[Hashable, float] = {}
+        for lon, lat in points:
+            for key, distance in self.within_radius(lon, lat, radius_km):
+                if distance < matches.get(key, math.inf):
+                    matches[key] = distance
+        return matches
+
+    def within_distance_of_polygon(self, ring: Sequence[Point], radius_km: float) -> Dict[Hashable, float]:
+        """
+        Find all properties inside a polygon or within a distance of its edges.
+
+        Candidates come from one radius query around the ring; each is then
+        measured to the edges themselves (see `distance_to_polygon_km`), so
+        long edges need no densifying.
+
+        :param ring: `(lon, lat)` vertices of the polygon's outer ring, e.g. a wildfire perimeter
+        :param radius_km: Search radius in kilometres
+        :return: Mapping of property key to its distance from the polygon, 0.0 inside it
+        """
+        ring = [(float(lon), float(lat)) for lon, lat in ring]
+        if not ring:
+            return {}
+        vectors = [_to_unit_vector(lon, lat) for lon, lat in ring]
+        mean = [sum(axis) / len(vectors) for axis in zip(*vectors)]
+        norm = math.sqrt(sum(axis * axis for axis in mean)) or 1.0
+        center = tuple(axis / norm for axis in mean)
+        # Every vertex, and so the whole polygon, is within `spread` of the center
+        spread = max(math.sqrt(sum((a - b) ** 2 for a, b in zip(center, vector))) for vector in vectors)
+        limit = _chord_for_distance(_distance_for_chord(spread) + radius_km)
+        matches: Dict[Hashable, float] = {}
+        for index, _ in self._within_chord(center, limit):
+            distance = distance_to_polygon_km(self._centroids[index], ring)
+            if distance <= radius_km:
+                matches[self._keys[index]] = distance
+        return matches
+
+    def nearest(self, lon: float, lat: float, count: int = 1) -> List[Tuple[Hashable, float]]:
+        """
+        Find the properties closest to a point.
+
+        :param lon: Longitude of the query point
+        :param lat: Latitude of the query point
+        :param count: Number of neighbours to return
+        :return: `(key, distance_km)` pairs sorted by distance
+        """
+        if count <= 0:
+            return []
+        target = _to_unit_vector(lon, lat)
+        best: List[Tuple[float, int]] = []  # max-heap of (-dist_sq, index)
+
+        def visit(node_id: int) -> None:
+            if node_id < 0:
+                return
+            index, axis, left, right = self._nodes[node_id]
+            point = self._points[index]
+            dist_sq = sum((a - b) ** 2 for a, b in zip(point, target))
+            if len(best) < count:
+                heapq.heappush(best, (-dist_sq, index))
+            elif dist_sq < -best[0][0]:
+                heapq.heapreplace(best, (-dist_sq, index))
+            delta = target[axis] - point[axis]
+            near, far = (left, right) if delta < 0 else (right, left)
+            visit(near)
+            if len(best) < count or delta * delta < -best[0][0]:
+                visit(far)
+
+        visit(self._root)
+        return [
+            (self._keys[index], _distance_for_chord(math.sqrt(-neg_dist_sq)))
+            for neg_dist_sq, index in sorted(best, reverse=True)
+        ]
+
+
+def build_index(centroids: Dict[Hashable, Optional[Point]]) -> PropertyIndex:
+    """Build an index, skipping properties without a known centroid."""
+    return PropertyIndex({key: point for key, point in centroids.items() if point is not None})
+
+
+class PropertyLocations:
+    """
+    Centroids of every property fetched, shared by the clients of a portfolio.
+
+    Home Assistant creates one client per config entry, so an index kept by
+    a client would only ever hold its own property. Clients, bulk parses and
+    portfolio fetches all record centroids here instead; a change only marks
+    the index stale, and it is rebuilt on the next query. Safe to share
+    between threads.
+    """
+
+    def __init__(self):
+        self._centroids: Dict[Hashable, Point] = {}
+        self._index: Optional[PropertyIndex] = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._centroids)
+
+    def update(self, key: Hashable, center: Optional[Point]) -> None:
+        """
+        Record where a property is.
+
+        :param key: The property, e.g. `(fsid, building_id)`
+        :param center: Its centroid, or None to drop a property without coordinates
+        """
+        with self._lock:
+            if center is None:
+                changed = self._centroids.pop(key, None) is not None
+            else:
+                changed = self._centroids.get(key) != center
+                self._centroids[key] = center
+            if changed:
+                self._index = None
+
+    def discard(self, key: Hashable) -> None:
+        """Forget a property, e.g. when its entry is removed."""
+        self.update(key, None)
+
+    @property
+    def index(self) -> PropertyIndex:
+        """Index over the current centroids, rebuilt if any changed since the last query."""
+        with self._lock:
+            if self._index is None:
+                self._index = PropertyIndex(self._centroids)
+            return self._index
+
+
+def haversine_km(a: Sequence[float], b: Sequence[float]) -> float:
+    """Great-circle distance in km between two `(lon, lat)` points."""
+    lon1, lat1, lon2, lat2 = map(math.radians, (a[0], a[1], b[0], b[1]))
+    h = (math.sin((lat2 - lat1) / 2) ** 2
+         + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(h))
@@ -0,0 +1,147 @@
+"""Decode a property response incrementally, keeping only the fields the parsers read."""
+import hashlib
+from typing import Any, Dict, FrozenSet, Iterable, Iterator, NamedTuple, Optional
+
+# Top-level property fields read by `parse_all_risk_data` and `parse_location_data`;
+# everything else (state, city, county, ... geographies) is skipped while streaming
+PARSED_FIELDS = frozenset({
+    'fsid', 'flood', 'fire', 'heat', 'wind', 'air', 'buildingConnection', 'geometry', 'footprint',
+})
+
+# ijson tokenizes a whole chunk into events before yielding them, so the
+# chunk size also bounds how many events are buffered at once
+STREAM_CHUNK_SIZE = 8 * 1024
+MAX_RESPONSE_BYTES = 32 * 1024 * 1024
+
+_PROPERTY_PREFIX = 'data.property'
+_CONTAINER_START = frozenset({'start_map', 'start_array'})
+_CONTAINER_END = frozenset({'end_map', 'end_array'})
+
+
+class StreamDecodeError(ValueError):
+    """The response body is not valid JSON or is larger than allowed."""
+
+
+class DecodedBody(NamedTuple):
+    """A streamed response body after decoding."""
+
+    data: Dict[str, Any]
+    size: int  # decompressed bytes read
+    body_hash: bytes  # `response_cache.body_digest` of the body
+
+
+class _ChunkReader:
+    """A file-like view of a chunk iterator that counts and hashes what is read."""
+
+    def __init__(self, chunks: Iterable[bytes], max_bytes: int):
+        self._chunks = iter(chunks)
+        self._max_bytes = max_bytes
+        self.bytes_read = 0
+        self.digest = hashlib.blake2b(digest_size=16)
+
+    def read(self, size: int = -1) -> bytes:
+        # ijson probes with read(0) to tell bytes from text
+        if not size:
+            return b''
+        for chunk in self._chunks:
+            if not chunk:
+                continue
+            self.bytes_read += len(chunk)
+            if self.bytes_read > self._max_bytes:
+                raise StreamDecodeError(f"Response is larger than {self._max_bytes} bytes")
+            self.digest.update(chunk)
+            return chunk
+        return b''
+
+
+def iter_body(response: Any, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[bytes]:
+    """Iterate over the decompressed body of a streamed requests or httpx response."""
+    if hasattr(response, 'iter_content'):
+        return response.iter_content(chunk_size)
+    return response.iter_bytes(chunk_size)
+
+
+class StreamDecoder:
+    """
+    Build only the needed parts of a GraphQL property response from an event stream.
+
+    The body is read in chunks and tokenized with ijson. Fields of
+    `data.property` outside `fields` are tokenized and dropped without being
+    built, so peak memory is one chunk plus the kept subtrees instead of the
+    whole body plus the whole decoded document. Top-level `errors` are kept
+    for validation.
+    """
+
+    def __init__(
+        self,
+        fields: FrozenSet[str] = PARSED_FIELDS,
+        chunk_size: int = STREAM_CHUNK_SIZE,
+        max_bytes: int = MAX_RESPONSE_BYTES,
+    ):
+        """
+        :param fields: The `data.property` fields to keep
+        :param chunk_size: Bytes read from the connection at a time
+        :param max_bytes: Give up on responses larger than this (decompressed)
+        :raises ImportError: If ijson is not installed
+        """
+        try:
+            import ijson
+        except ImportError as err:
+            raise ImportError("The streaming decoder needs ijson: pip install ijson") from err
+        self._ijson = ijson
+        self.chunk_size = chunk_size
+        self.max_bytes = max_bytes
+        self._targets = {f'{_PROPERTY_PREFIX}.{field}': field for field in fields}
+
+    def decode(self, chunks: Iterable[bytes]) -> DecodedBody:
+        """
+        Decode a response body.
+
+        :param chunks: The body, e.g. from `iter_body`
+        :raises StreamDecodeError: If the body is not valid JSON or too large
+        """
+        reader = _ChunkReader(chunks, self.max_bytes)
+        try:
+            data = self._build(self._ijson.parse(reader, use_float=True))
+        except self._ijson.JSONError as err:
+            raise StreamDecodeError(str(err)) from err
+        return DecodedBody(data, reader.bytes_read, reader.digest.digest())
+
+    def _build(self, events: Iterator[Any]) -> Dict[str, Any]:
+        data: Dict[str, Any] = {}
+        kept: Optional[Dict[str, Any]] = None
+        targets = self._targets
+        for prefix, event, value in events:
+            if event == 'map_key':
+                continue
+            if prefix == _PROPERTY_PREFIX:
+                if event == 'start_map':
+                    kept = data.setdefault('data', {})['property'] = {}
+                elif event == 'null':
+                    data.setdefault('data', {})['property'] = None
+                continue
+            if prefix == 'data' and event == 'start_map':
+                data.setdefault('data', {})
+                continue
+            if kept is not None and prefix in targets:
+                kept[targets[prefix]] = self._subtree(events, event, value)
+            elif prefix == 'errors':
+                data['errors'] = self._subtree(events, event, value)
+        return data
+
+    def _subtree(self, events: Iterator[Any], event: str, value: Any) -> Any:
+        """Build the value that starts with `event` from the following events."""
+        if event not in _CONTAINER_START:
+            return value
+        builder = self._ijson.ObjectBuilder()
+        builder.event(event, value)
+        depth = 1
+        for _, event, value in events:
+            builder.event(event, value)
+            if event in _CONTAINER_START:
+                depth += 1
+            elif event in _CONTAINER_END:
+                depth -= 1
+                if not depth:
+                    return builder.value
+        raise StreamDecodeError("Response ended inside a value")
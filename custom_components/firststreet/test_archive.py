@@ -0,0 +1,87 @@
+import json
+import os
+import tempfile
+import unittest
+from archive import ResponseArchive
+from bulk import bulk_parse_archive, parse_raw_document
+from test_support import make_property
+
+class TestResponseArchive(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'responses.bin')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def body(self, fsid, factor):
+        return json.dumps({'data': {'property': make_property(fsid, factor)}}).encode()
+
+    def test_append_and_read(self):
+        with ResponseArchive(self.path) as archive:
+            archive.append(1, 0, self.body(1, 3), fetched_at=100.0)
+            archive.append(1, 0, self.body(1, 4), fetched_at=200.0)
+            archive.append(2, None, self.body(2, 5), fetched_at=150.0)
+
+            self.assertEqual(len(archive), 3)
+            self.assertEqual(parse_raw_document(archive.latest(1))['flood']['flood_factor'], 4)
+            self.assertEqual(parse_raw_document(archive.at(1, 0, 150.0))['flood']['flood_factor'], 3)
+            self.assertIsNone(archive.at(1, 0, 50.0))
+            self.assertIsNone(archive.latest(2))
+            self.assertEqual(bytes(archive.latest(2, None)), self.body(2, 5))
+
+    def test_reopen_keeps_index(self):
+        with ResponseArchive(self.path) as archive:
+            archive.append(1, 0, self.body(1, 3), fetched_at=200.0)
+            archive.append(1, 0, self.body(1, 4), fetched_at=100.0)
+        with ResponseArchive(self.path) as archive:
+            self.assertEqual([entry.fetched_at for entry in archive.entries(1)], [100.0, 200.0])
+            self.assertEqual(parse_raw_document(archive.latest(1))['flood']['flood_factor'], 3)
+
+    def test_ignores_entries_past_the_data(self):
+        with ResponseArchive(self.path) as archive:
+            archive.append(1, 0, self.body(1, 3))
+            archive.append(2, 0, self.body(2, 3))
+        # Simulate a crash while the second body was being written
+        with open(self.path, 'r+b') as data:
+            data.truncate(os.path.getsize(self.path) - 10)
+        with ResponseArchive(self.path) as archive:
+            self.assertEqual([entry.fsid for entry in archive.entries()], [1])
+
+    def test_torn_records_are_truncated_before_appending(self):
+        with ResponseArchive(self.path) as archive:
+            archive.append(1, 0, self.body(1, 3), fetched_at=100.0)
+            archive.append(2, 0, self.body(2, 3), fetched_at=100.0)
+        # Simulate a crash while the second index record was being written,
+        # and one after a third body was written but before its record
+        with open(f'{self.path}.idx', 'r+b') as index:
+            index.truncate(os.path.getsize(f'{self.path}.idx') - 7)
+        with open(self.path, 'ab') as data:
+            data.write(b'{"data": {"prop')
+
+        with ResponseArchive(self.path) as archive:
+            self.assertEqual([entry.fsid for entry in archive.entries()], [1])
+            archive.append(3, 0, self.body(3, 5), fetched_at=300.0)
+        with ResponseArchive(self.path) as archive:
+            self.assertEqual([entry.fsid for entry in archive.entries()], [1, 3])
+            self.assertEqual(parse_raw_document(archive.latest(3))['flood']['flood_factor'], 5)
+            self.assertEqual(bytes(archive.latest(1)), self.body(1, 3))
+
+    def test_rejects_foreign_index(self):
+        with open(f'{self.path}.idx', 'wb') as index:
+            index.write(b'not an index')
+        with self.assertRaises(ValueError):
+            ResponseArchive(self.path)
+
+    def test_bulk_parse_archive(self):
+        with ResponseArchive(self.path) as archive:
+            for fsid in range(20):
+                archive.append(fsid, 0, self.body(fsid, fsid % 10 + 1))
+            in_process = bulk_parse_archive(archive, workers=1)
+            pooled = bulk_parse_archive(archive, workers=2, chunksize=4)
+        self.assertEqual(pooled, in_process)
+        self.assertEqual([summary.fsid for summary in pooled], list(range(20)))
+
+if __name__ == '__main__':
+    unittest.main()
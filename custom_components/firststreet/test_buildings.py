@@ -0,0 +1,52 @@
+import unittest
+from unittest.mock import patch
+from buildings import BUILDING_PARSERS, parse_buildings, parse_property_list, requested_building_id
+
+PROPERTY_DATA = {
+    'buildingConnection': {
+        'totalCount': 2,
+        'edges': [
+            {'node': {'buildingId': 11, 'stories': 2, 'flood': {'floodFactor': 4}, 'heat': {'heatFactor': 6, 'insights': []}}},
+            {'node': {'buildingId': 12, 'stories': 1, 'flood': {'floodFactor': 1}}}
+        ]
+    }
+}
+
+class TestBuildings(unittest.TestCase):
+
+    def test_parse_buildings(self):
+        buildings = parse_buildings(PROPERTY_DATA)
+        self.assertEqual(list(buildings), [11, 12])
+        self.assertEqual(buildings[11]['flood']['flood_factor'], 4)
+        self.assertEqual(buildings[11]['heat']['heat_factor'], 6)
+        self.assertIsNone(buildings[12]['heat'])
+        self.assertEqual(buildings[11].details, {'buildingId': 11, 'stories': 2})
+        self.assertEqual(list(buildings[12]), ['flood', 'fire', 'heat', 'wind', 'air'])
+
+    def test_risk_blocks_are_parsed_lazily(self):
+        with patch.dict(BUILDING_PARSERS, {'heat': lambda data: self.fail('heat parsed eagerly')}):
+            building = parse_buildings(PROPERTY_DATA)[11]
+            self.assertEqual(building['flood']['flood_factor'], 4)
+
+    def test_no_buildings(self):
+        self.assertEqual(parse_buildings({}), {})
+        self.assertEqual(parse_buildings({'buildingConnection': None}), {})
+
+    def test_requested_building_id(self):
+        self.assertEqual(requested_building_id({'fsid': 1}), 0)
+        self.assertEqual(requested_building_id({'fsid': 1, 'building_id': 7}), 7)
+        self.assertIsNone(requested_building_id({'fsid': 1, 'building_id': 7, 'all_buildings': True}))
+
+    def test_parse_property_list(self):
+        self.assertEqual(parse_property_list("12\n 34:5, 56:ALL;\n\n"), [
+            {'fsid': 12, 'building_id': 0, 'all_buildings': False},
+            {'fsid': 34, 'building_id': 5, 'all_buildings': False},
+            {'fsid': 56, 'building_id': 0, 'all_buildings': True},
+        ])
+        self.assertEqual(parse_property_list("  "), [])
+        for text in ("12 abc", "12:x", "-1"):
+            with self.assertRaises(ValueError):
+                parse_property_list(text)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+import json
+import pickle
+import unittest
+from bulk import RiskSummary, bulk_parse, parse_raw_document
+from spatial import PropertyLocations
+from test_support import make_property
+
+class TestBulkParse(unittest.TestCase):
+
+    def setUp(self):
+        self.raw = [json.dumps({'data': {'property': make_property(fsid, fsid % 10 + 1)}}).encode() for fsid in range(40)]
+
+    def test_parse_raw_document(self):
+        document = make_property(5, 3)
+        parsed = parse_raw_document(json.dumps(document))
+        self.assertEqual(parsed['fsid'], 5)
+        self.assertEqual(parsed['wind']['historic_events'],
+                         [edge['node'] for edge in document['wind']['historicConnection']['edges']])
+        self.assertEqual(parsed['center'], tuple(document['geometry']['center']['coordinates']))
+
+    def test_summaries_match_in_process_parse(self):
+        expected = bulk_parse(self.raw, workers=1)
+        self.assertEqual(bulk_parse(self.raw, workers=2, chunksize=8), expected)
+        center = tuple(make_property(3, 4)['geometry']['center']['coordinates'])
+        self.assertEqual(expected[3], RiskSummary(3, 4, 4, 4, 4, 4, ((7, 4, 4, 4, 4, 4),), center))
+
+    def test_full_results_and_failures(self):
+        raw = self.raw[:3] + [b'{"data": {"property": {"fsid": 99}}}', b'not json']
+        results = bulk_parse(raw, workers=2, chunksize=2, summary=False)
+        self.assertEqual(results[1]['flood']['flood_factor'], 2)
+        self.assertEqual(results[1]['buildings'][7]['flood']['flood_factor'], 2)
+        self.assertEqual(results[3:], [None, None])
+
+    def test_centroids_reach_locations(self):
+        documents = [dict(make_property(fsid, 1), geometry={'center': {'coordinates': [-87.6, 41.9 + fsid / 100]}})
+                     for fsid in range(4)]
+        raw = [json.dumps(document).encode() for document in documents]
+        locations = PropertyLocations()
+        summaries = bulk_parse(raw, workers=2, chunksize=2, locations=locations)
+        self.assertEqual(summaries[2].center, (-87.6, 41.92))
+        self.assertEqual([key for key, _ in locations.index.nearest(-87.6, 41.9, 2)], [(0, 0), (1, 0)])
+
+    def test_summary_pickles_as_tuple(self):
+        summary = RiskSummary(1, 2, 3, 4, 5, 6)
+        self.assertEqual(pickle.loads(pickle.dumps(summary)), summary)
+        self.assertNotIn(b'flood_factor', pickle.dumps(summary))
+
+if __name__ == '__main__':
+    unittest.main()
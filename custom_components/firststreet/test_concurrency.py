@@ -0,0 +1,143 @@
+import heapq
+import json
+import threading
+import unittest
+from unittest.mock import MagicMock
+from concurrency import AIMDLimiter, is_congestion
+from firststreet_api import FirstStreetAPI
+
+class TestAIMDLimiter(unittest.TestCase):
+
+    def setUp(self):
+        self.now = [0.0]
+        self.limiter = AIMDLimiter(initial=4, max_limit=8, clock=lambda: self.now[0])
+
+    def _round_trip(self, congested=False, latency=0.1):
+        slots = [self.limiter.acquire() for _ in range(self.limiter.limit)]
+        self.now[0] += latency
+        for slot in slots:
+            self.limiter.release(slot, congested)
+
+    def test_grows_by_one_per_round_trip_up_to_max(self):
+        self._round_trip()
+        self.assertEqual(self.limiter.limit, 5)
+        for _ in range(10):
+            self._round_trip()
+        self.assertEqual(self.limiter.limit, 8)
+
+    def test_shrinks_once_per_round_trip_on_throttling(self):
+        self._round_trip()
+        self._round_trip(congested=True)
+        # Five throttled responses, one decrease
+        self.assertEqual(self.limiter.limit, 3)
+        for _ in range(3):
+            self._round_trip(congested=True)
+        self.assertEqual(self.limiter.limit, 1)
+
+    def test_rising_latency_is_congestion(self):
+        self._round_trip(latency=0.1)
+        self._round_trip(latency=0.12)  # jitter
+        self.assertEqual(self.limiter.limit, 6)
+        self._round_trip(latency=0.5)
+        self.assertEqual(self.limiter.limit, 4)
+
+    def test_does_not_grow_while_underused(self):
+        slot = self.limiter.acquire()
+        self.now[0] += 0.1
+        self.limiter.release(slot)
+        self.assertEqual(self.limiter.limit, 4)
+
+    def test_congestion_statuses(self):
+        self.assertTrue(is_congestion(429))
+        self.assertTrue(is_congestion(503))
+        self.assertFalse(is_congestion(404))
+        self.assertFalse(is_congestion(None))
+        with self.assertRaises(ValueError):
+            AIMDLimiter(initial=10, max_limit=8)
+
+class TestFetchProperties(unittest.TestCase):
+
+    def test_status_code_reaches_the_error(self):
+        import requests
+
+        api = FirstStreetAPI()
+        response = MagicMock(status_code=503)
+        response.raise_for_status.side_effect = requests.HTTPError("503 Server Error", response=response)
+        api.session = MagicMock()
+        api.session.post.return_value = response
+        results = api.fetch_properties([(1, 0)], retries=2)
+        self.assertEqual(api.session.post.call_count, 3)
+        self.assertIsNone(results[0].data)
+        self.assertEqual(results[0].error.status_code, 503)
+
+    def test_throttled_requests_are_retried_at_a_lower_limit(self):
+        import requests
+
+        throttled = set()
+        lock = threading.Lock()
+
+        def post(endpoint, data, **kwargs):
+            fsid = int(json.loads(data)['variables']['fsid'])
+            with lock:
+                first = fsid not in throttled
+                throttled.add(fsid)
+            if first:
+                response = MagicMock(status_code=429)
+                response.raise_for_status.side_effect = requests.HTTPError("429 Too Many Requests", response=response)
+                return response
+            response = MagicMock(status_code=200)
+            response.json.return_value = {'data': {'property': {'fsid': fsid}}}
+            return response
+
+        api = FirstStreetAPI()
+        api.session = MagicMock()
+        api.session.post.side_effect = post
+        limiter = AIMDLimiter(initial=4, max_limit=8)
+        targets = [(fsid, 0) for fsid in range(12)]
+        progress = []
+        results = api.fetch_properties(
+            targets, limiter=limiter, retries=1, progress=lambda done, total: progress.append(done)
+        )
+        self.assertEqual([result.data for result in results], [{'fsid': fsid} for fsid, _ in targets])
+        self.assertEqual(api.session.post.call_count, 24)
+        self.assertEqual(progress[-1], 12)
+        self.assertLess(limiter.limit, 4)
+
+class TestConvergence(unittest.TestCase):
+    """The limiter against a simulated API, on a simulated clock."""
+
+    def _simulate(self, capacity, latency, responses, throttle_latency=0.002):
+        """
+        Keep `limiter.limit` requests in flight against an API answering
+        `capacity` at once in `latency` seconds and 429 to the rest.
+        """
+        now = [0.0]
+        limiter = AIMDLimiter(initial=1, max_limit=16, clock=lambda: now[0])
+        in_flight = []  # (finishes at, sequence, slot, throttled)
+        sequence = served = throttled = 0
+        limits = []
+        while served < responses:
+            while len(in_flight) < limiter.limit:
+                busy = sum(1 for *_, rejected in in_flight if not rejected)
+                rejected = busy >= capacity
+                finishes = now[0] + (throttle_latency if rejected else latency)
+                heapq.heappush(in_flight, (finishes, sequence, limiter.acquire(), rejected))
+                sequence += 1
+            now[0], _, slot, rejected = heapq.heappop(in_flight)
+            limiter.release(slot, congested=rejected)
+            served += not rejected
+            throttled += rejected
+            limits.append(limiter.limit)
+        return now[0], throttled, limits
+
+    def test_converges_below_a_throttling_api(self):
+        capacity, latency, responses = 4, 0.04, 400
+        elapsed, throttled, limits = self._simulate(capacity, latency, responses)
+        # Close to the API's capacity (one at a time would take responses * latency),
+        # settled around it, and few requests wasted on 429s
+        self.assertLess(elapsed, responses * latency / capacity * 2)
+        self.assertTrue(all(limit in range(2, capacity + 3) for limit in limits[len(limits) // 2:]))
+        self.assertLess(throttled, responses * 0.25)
+
+if __name__ == '__main__':
+    unittest.main()
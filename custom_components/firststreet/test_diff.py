@@ -0,0 +1,61 @@
+import copy
+import unittest
+from diff import ADDED, CHANGED, REMOVED, SnapshotDiffer, diff_risk_data
+
+SNAPSHOT = {
+    'flood': {
+        'flood_factor': 5,
+        'risk_direction': 'increasing',
+        'probability': {'cumulative': [{'threshold': 1, 'mid': 0.5}]},
+        'historic_events': [{'eventId': '123', 'name': 'Flood 2020'}],
+        'insights': [{'name': 'Insight 1', 'details': [{'name': 'Detail 1', 'value': 'Value 1'}]}]
+    },
+    'fire': {
+        'fire_factor': 3,
+        'insurance_quotes': None,
+        'historic_events': []
+    }
+}
+
+class TestDiff(unittest.TestCase):
+
+    def test_identical_snapshots(self):
+        self.assertEqual(diff_risk_data(SNAPSHOT, copy.deepcopy(SNAPSHOT)), [])
+
+    def test_reordered_keys_are_not_changes(self):
+        reordered = {'fire': dict(reversed(list(SNAPSHOT['fire'].items()))), 'flood': SNAPSHOT['flood']}
+        self.assertEqual(diff_risk_data(SNAPSHOT, reordered), [])
+
+    def test_changed_added_removed_fields(self):
+        new = copy.deepcopy(SNAPSHOT)
+        new['flood']['probability']['cumulative'][0]['mid'] = 0.6
+        new['flood']['adaptation_count'] = 2
+        del new['fire']['insurance_quotes']
+
+        changes = {(c.risk_type, c.field): c for c in diff_risk_data(SNAPSHOT, new)}
+
+        self.assertEqual(set(changes), {('flood', 'probability'), ('flood', 'adaptation_count'), ('fire', 'insurance_quotes')})
+        self.assertEqual(changes[('flood', 'probability')].kind, CHANGED)
+        self.assertEqual(changes[('flood', 'probability')].new['cumulative'][0]['mid'], 0.6)
+        self.assertEqual(changes[('flood', 'adaptation_count')].kind, ADDED)
+        self.assertEqual(changes[('fire', 'insurance_quotes')].kind, REMOVED)
+
+    def test_snapshot_differ(self):
+        differ = SnapshotDiffer()
+        first = differ.update({(1, 0): SNAPSHOT, (2, 0): SNAPSHOT})
+        self.assertEqual(first.added, [(1, 0), (2, 0)])
+        self.assertEqual(first.changed, {})
+
+        changed = copy.deepcopy(SNAPSHOT)
+        changed['fire']['fire_factor'] = 4
+        second = differ.update({(1, 0): changed, (3, 0): SNAPSHOT})
+
+        self.assertEqual(second.added, [(3, 0)])
+        self.assertEqual(second.removed, [(2, 0)])
+        self.assertEqual(list(second.changed), [(1, 0)])
+        self.assertEqual(second.changed[(1, 0)][0].field, 'fire_factor')
+        self.assertEqual(second.changed[(1, 0)][0].old, 3)
+        self.assertEqual(second.changed[(1, 0)][0].new, 4)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,13 +1,20 @@
+import json
+import os
+import subprocess
+import sys
 import unittest
 from unittest.mock import patch, MagicMock
-from firststreet_api import FirstStreetAPI, FirstStreetAPIError
+from firststreet_api import FirstStreetAPI, FirstStreetAPIError, PropertyCheck
+from property_queries import PROPERTY_BY_FSID_DOCUMENT, RISK_DOCUMENTS
+from response_cache import NegativeCache
+from spatial import PropertyLocations
 
 class TestFirstStreetAPI(unittest.TestCase):
 
     def setUp(self):
         self.api = FirstStreetAPI()
 
-    @patch('firststreet_api.requests.Session')
+    @patch('requests.Session')
     def test_get_property_data_success(self, mock_session):
         mock_response = MagicMock()
         mock_response.json.return_value = {
@@ -31,7 +38,7 @@ class TestFirstStreetAPI(unittest.TestCase):
         self.assertEqual(result['wind']['windFactor'], 2)
         self.assertEqual(result['air']['airFactor'], 1)
 
-    @patch('firststreet_api.requests.Session')
+    @patch('requests.Session')
     def test_get_property_data_api_error(self, mock_session):
         mock_response = MagicMock()
         mock_response.json.return_value = {'errors': ['API Error']}
@@ -41,7 +48,7 @@ class TestFirstStreetAPI(unittest.TestCase):
         with self.assertRaises(FirstStreetAPIError):
             self.api.get_property_data(12345)
 
-    @patch('firststreet_api.requests.Session')
+    @patch('requests.Session')
     def test_get_property_data_unexpected_structure(self, mock_session):
         mock_response = MagicMock()
         mock_response.json.return_value = {'unexpected': 'structure'}
@@ -237,5 +244,202 @@ class TestFirstStreetAPI(unittest.TestCase):
         mock_wind.assert_called_once()
         mock_air.assert_called_once()
 
+    @patch.object(FirstStreetAPI, 'get_property_data')
+    @patch.object(FirstStreetAPI, 'parse_flood_data')
+    @patch.object(FirstStreetAPI, 'parse_fire_data')
+    @patch.object(FirstStreetAPI, 'parse_heat_data')
+    @patch.object(FirstStreetAPI, 'parse_wind_data')
+    @patch.object(FirstStreetAPI, 'parse_air_data')
+    def test_properties_within(self, mock_air, mock_wind, mock_heat, mock_fire, mock_flood, mock_get_property):
+        mock_get_property.side_effect = [
+            {'fsid': 1, 'geometry': {'center': {'coordinates': [-87.6, 41.9]}}},
+            {'fsid': 2, 'geometry': {'center': {'coordinates': [-87.7, 41.9]}}},
+        ]
+        self.api.get_all_risk_data(1)
+        self.api.get_all_risk_data(2)
+
+        result = self.api.properties_within(-87.6, 41.9, 2.0)
+        self.assertEqual([key for key, _ in result], [(1, 0)])
+        self.assertEqual(len(self.api.properties_within(-87.65, 41.9, 10.0)), 2)
+
+    @patch.object(FirstStreetAPI, 'get_property_data')
+    def test_clients_sharing_locations_search_the_portfolio(self, mock_get_property):
+        mock_get_property.side_effect = lambda fsid, building_id=0, query=None: {
+            'fsid': fsid, 'geometry': {'center': {'coordinates': [-87.6 - fsid / 100, 41.9]}}
+        }
+        locations = PropertyLocations()
+        entries = [FirstStreetAPI(locations=locations) for _ in range(2)]
+        with patch.object(FirstStreetAPI, 'parse_all_risk_data', return_value={}):
+            entries[0].get_all_risk_data(1)
+            entries[1].get_all_risk_data(2, None)
+        portfolio = FirstStreetAPI(locations=locations)
+        portfolio.fetch_properties([(3, 0)])
+
+        found = [key for key, _ in entries[0].properties_within(-87.6, 41.9, 10.0)]
+        self.assertEqual(found, [(1, 0), (2, 0), (3, 0)])
+
+    def test_persisted_query_fallback(self):
+        api = FirstStreetAPI(persisted_queries=True)
+        api.session = MagicMock()
+        miss = MagicMock()
+        miss.json.return_value = {'errors': [{'message': 'PersistedQueryNotFound', 'extensions': {'code': 'PERSISTED_QUERY_NOT_FOUND'}}]}
+        hit = MagicMock()
+        hit.json.return_value = {'data': {'property': {'fsid': 12345}}}
+        api.session.post.side_effect = [miss, hit]
+
+        self.assertEqual(api.get_property_data(12345), {'fsid': 12345})
+
+        first, second = [json.loads(call.kwargs['data']) for call in api.session.post.call_args_list]
+        self.assertNotIn('query', first)
+        self.assertEqual(first['extensions']['persistedQuery']['sha256Hash'], PROPERTY_BY_FSID_DOCUMENT.sha256)
+        self.assertEqual(second['query'], PROPERTY_BY_FSID_DOCUMENT.text)
+        self.assertEqual(second['variables'], {'fsid': '12345', 'buildingId': '0'})
+
+    def test_merge_property_data(self):
+        cached = {
+            'flood': {'floodFactor': 5},
+            'heat': {'heatFactor': 4},
+            'buildingConnection': {
+                'totalCount': 2,
+                'edges': [
+                    {'node': {'buildingId': 1, 'stories': 2, 'flood': {'floodFactor': 5}}},
+                    {'node': {'buildingId': 2, 'stories': 1, 'flood': {'floodFactor': 3}}}
+                ]
+            }
+        }
+        partial = {
+            'fsid': 12345,
+            'flood': {'floodFactor': 6},
+            'buildingConnection': {'edges': [{'node': {'buildingId': 2, 'flood': {'floodFactor': 4}}}]}
+        }
+        merged = self.api.merge_property_data(cached, partial)
+
+        self.assertEqual(merged['flood']['floodFactor'], 6)
+        self.assertEqual(merged['heat']['heatFactor'], 4)
+        self.assertEqual(merged['buildingConnection']['totalCount'], 2)
+        nodes = [edge['node'] for edge in merged['buildingConnection']['edges']]
+        self.assertEqual(nodes[0]['flood']['floodFactor'], 5)
+        self.assertEqual(nodes[1], {'buildingId': 2, 'stories': 1, 'flood': {'floodFactor': 4}})
+        self.assertEqual(cached['flood']['floodFactor'], 5)
+
+    @patch.object(FirstStreetAPI, 'parse_all_risk_data')
+    @patch.object(FirstStreetAPI, 'get_property_data')
+    def test_get_all_risk_data_partial_refresh(self, mock_get_property, mock_parse_all):
+        mock_get_property.side_effect = [
+            {'flood': {'floodFactor': 5}, 'air': {'airFactor': 1}},
+            {'air': {'airFactor': 2}},
+        ]
+        self.api.get_all_risk_data(12345)
+        self.api.get_all_risk_data(12345, risk_types=['air'])
+
+        self.assertEqual(mock_get_property.call_count, 2)
+        self.assertEqual(mock_get_property.call_args_list[1].args[2], RISK_DOCUMENTS['air'])
+        mock_parse_all.assert_called_with({'flood': {'floodFactor': 5}, 'air': {'airFactor': 2}})
+
+class TestCheckProperties(unittest.TestCase):
+
+    def setUp(self):
+        self.api = FirstStreetAPI(negative_cache=NegativeCache())
+        self.api.session = MagicMock()
+        self.api.session.post.side_effect = self._respond
+        self.bodies = []
+
+    def _respond(self, endpoint, data, **kwargs):
+        # Even FSIDs exist with building 1; FSID 13 fails with an error on its alias
+        body = json.loads(data)
+        self.bodies.append(body)
+        variables = body['variables']
+        found, errors = {}, []
+        for index in range(len(variables) // 2):
+            fsid = int(variables[f'fsid{index}'])
+            building = variables[f'buildingId{index}']
+            if fsid == 13:
+                found[f'p{index}'] = None
+                errors.append({'message': 'boom', 'path': [f'p{index}']})
+            elif fsid % 2:
+                found[f'p{index}'] = None
+            else:
+                total = 1 if building in (None, '1') else 0
+                found[f'p{index}'] = {'fsid': fsid, 'buildingConnection': {'totalCount': total}}
+        response = MagicMock(status_code=200)
+        response.json.return_value = {'data': found, 'errors': errors} if errors else {'data': found}
+        return response
+
+    def test_batches_and_results(self):
+        targets = [(2, 0), (3, 0), (4, 1), (6, 2), (8, None), (13, 0), (10, 0)]
+        progress = []
+
+        checks = self.api.check_properties(targets, batch_size=3, concurrency=2, progress=lambda *args: progress.append(args))
+
+        self.assertEqual(len(self.bodies), 3)
+        self.assertTrue(all(body['query'].startswith('query PropertiesExist') for body in self.bodies))
+        self.assertEqual([check.found for check in checks], [True, False, True, False, True, False, True])
+        self.assertEqual(checks[5], PropertyCheck(13, 0, False, 'boom'))
+        self.assertIsNone(checks[1].error)
+        self.assertEqual(progress[0], (0, 7))
+        self.assertEqual(progress[-1], (7, 7))
+
+    def test_negative_cache(self):
+        self.api.check_properties([(3, 0), (13, 0)])
+        checks = self.api.check_properties([(3, 0), (13, 0)])
+        # Only the property not found is remembered, not the one that failed
+        self.assertEqual(len(self.bodies), 2)
+        self.assertEqual(self.bodies[1]['variables'], {'fsid0': '13', 'buildingId0': '0'})
+        self.assertFalse(checks[0].found)
+
+    def test_failed_request(self):
+        self.api.session.post.side_effect = FirstStreetAPI().request_errors[0]("down")
+        checks = self.api.check_properties([(2, 0), (4, 0)])
+        self.assertEqual([check.found for check in checks], [False, False])
+        self.assertTrue(all('down' in check.error for check in checks))
+
+class TestImportTime(unittest.TestCase):
+
+    # Generous ceiling for the API module's own import, excluding the HTTP
+    # stack and query text that must stay deferred to the first fetch
+    IMPORT_BUDGET_US = 50000
+
+    def test_import_defers_http_and_queries(self):
+        package_dir = os.path.dirname(os.path.abspath(__file__))
+        code = (
+            "import sys, types; "
+            "package = types.ModuleType('firststreet'); "
+            f"package.__path__ = [{package_dir!r}]; "
+            "sys.modules['firststreet'] = package; "
+            "import firststreet.firststreet_api; "
+            "assert 'requests' not in sys.modules, 'requests was registered at import'"
+        )
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', code],
+            capture_output=True, text=True, check=True
+        )
+        cumulative = {}
+        for line in result.stderr.splitlines():
+            if not line.startswith('import time:') or '|' not in line:
+                continue
+            _, cumulative_us, name = line[len('import time:'):].split('|')
+            if cumulative_us.strip().isdigit():
+                cumulative[name.strip()] = int(cumulative_us)
+
+        self.assertIn('firststreet.firststreet_api', cumulative)
+        self.assertNotIn('requests', cumulative)
+        self.assertNotIn('firststreet.property_queries', cumulative)
+        self.assertLess(cumulative['firststreet.firststreet_api'], self.IMPORT_BUDGET_US)
+
+class TestRestoreDocument(unittest.TestCase):
+
+    def test_restored_document_is_parsed_and_merged_into(self):
+        api = FirstStreetAPI()
+        document = {"fsid": 1}
+        api.parse_location_data = lambda data, building_id: {'center': None}
+        api.parse_all_risk_data = lambda data: {'flood': data.get('flood')}
+        self.assertIsNone(api.export_document(1, 0))
+        self.assertEqual(api.restore_document(1, 0, document), {'flood': None})
+        self.assertIs(api.export_document(1, 0), document)
+
+        api.get_property_data = lambda fsid, building_id, query=None: {"fsid": 1, "flood": {"floodFactor": 2}}
+        data = api.get_all_risk_data(1, 0, ["flood"])
+        self.assertEqual(data, {'flood': {"floodFactor": 2}})
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,121 @@
+import threading
+import unittest
+from firststreet_api import FirstStreetAPI
+from hedging import HedgePolicy
+from test_support import StubServer
+
+class Response:
+
+    def __init__(self, name):
+        self.name = name
+        self.closed = threading.Event()
+
+    def close(self):
+        self.closed.set()
+
+class TestHedgePolicy(unittest.TestCase):
+    """Attempts are ordered by events, so no assertion depends on how long anything takes."""
+
+    def _warm(self, policy, latency=0.001):
+        for _ in range(policy.min_samples):
+            policy.record(latency)
+
+    def test_hedge_wins_over_slow_request_and_loser_is_closed(self):
+        policy = HedgePolicy(max_extra=1.0, min_samples=5)
+        # Long enough for the first attempt to be counted before the hedge
+        self._warm(policy, latency=0.05)
+        responses = [Response("slow"), Response("hedge")]
+        hedge_answered = threading.Event()
+        calls = []
+
+        def request():
+            index = len(calls)
+            calls.append(index)
+            if index == 0:
+                # The first attempt only answers once the hedge has
+                hedge_answered.wait()
+            else:
+                hedge_answered.set()
+            return responses[index]
+
+        hedged = []
+        self.assertIs(policy.send(request, lambda: hedged.append(True)), responses[1])
+        self.assertEqual(hedged, [True])
+        self.assertTrue(responses[0].closed.wait(5))
+        self.assertFalse(responses[1].closed.is_set())
+        policy.close()
+
+    def test_no_hedge_before_enough_samples(self):
+        policy = HedgePolicy(max_extra=1.0, min_samples=5)
+        policy.record(0.001)
+        self.assertIsNone(policy.delay)
+        self.assertEqual(policy.send(lambda: "done"), "done")
+        self.assertEqual(policy.hedges, 0)
+
+    def test_hedges_stay_within_the_extra_load_budget(self):
+        policy = HedgePolicy(max_extra=0.1, max_burst=1.0, min_samples=5)
+        self._warm(policy)
+        for _ in range(20):
+            hedged = threading.Event()
+            # Slower than the delay until hedged, or for good if the budget is spent
+            policy.send(lambda: hedged.wait(0.01), hedged.set)
+        self.assertLessEqual(policy.hedges, 2)
+        policy.close()
+
+    def test_time_queued_for_a_thread_is_not_latency(self):
+        policy = HedgePolicy(max_extra=1.0, min_samples=5, max_workers=1)
+        self._warm(policy)
+        busy, release = threading.Event(), threading.Event()
+
+        def occupy():
+            busy.set()
+            release.wait()
+
+        policy._pool().submit(occupy)
+        busy.wait()
+        # The request waits for the only thread far longer than the hedge delay
+        threading.Timer(0.05, release.set).start()
+        self.assertEqual(policy.send(lambda: "done"), "done")
+        self.assertEqual(policy.hedges, 0)
+        policy.close()
+
+    def test_failed_attempt_waits_for_the_other(self):
+        policy = HedgePolicy(max_extra=1.0, min_samples=5)
+        self._warm(policy, latency=0.05)
+        hedge_sent, first_failed = threading.Event(), threading.Event()
+        calls = []
+
+        def request():
+            calls.append(None)
+            if len(calls) == 1:
+                hedge_sent.wait()
+                first_failed.set()
+                raise ConnectionError("reset")
+            first_failed.wait()
+            return "hedge"
+
+        self.assertEqual(policy.send(request, hedge_sent.set), "hedge")
+
+        def down():
+            raise ConnectionError("down")
+
+        with self.assertRaises(ConnectionError):
+            policy.send(down)
+        policy.close()
+
+class TestHedgedClient(unittest.TestCase):
+
+    def test_smoke(self):
+        policy = HedgePolicy(max_extra=0.2, min_samples=20)
+        count = 60
+        with StubServer(latency=0.002, outlier_every=10, outlier_latency=0.2) as stub:
+            api = FirstStreetAPI(base_url=stub.url, hedge_policy=policy)
+            for fsid in range(count):
+                self.assertEqual(api.get_property_data(fsid), {"fsid": fsid})
+            api.session.close()
+        policy.close()
+        self.assertGreater(policy.hedges, 0)
+        self.assertLessEqual(stub.requests, count + policy.hedges)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import json
+import sys
+import unittest
+from firststreet_api import FirstStreetAPI
+from interning import intern_enumerations
+from test_support import make_property
+
+def property_json():
+    insights = [{'name': 'flood-risk-rank', 'details': [{'name': 'percentile', 'value': '0.42'}]}]
+    block = {'riskDirection': 'INCREASING', 'floodType': 'PLUVIAL', 'insights': insights}
+    wind = {'riskDirection': 'STABLE', 'greatestWindRisk': 'TORNADO', 'primaryWindDirection': 'NW'}
+    return json.dumps({
+        'flood': block,
+        'wind': wind,
+        'heat': None,
+        'buildingConnection': {'edges': [{'node': {'buildingId': 1, 'flood': block, 'wind': wind}}]},
+    })
+
+class TestInterning(unittest.TestCase):
+
+    def test_documents_share_enumeration_strings(self):
+        # Separate decodes create separate string objects
+        first, second = json.loads(property_json()), json.loads(property_json())
+        self.assertIsNot(first['wind']['greatestWindRisk'], second['wind']['greatestWindRisk'])
+
+        intern_enumerations(first)
+        intern_enumerations(second)
+        building = second['buildingConnection']['edges'][0]['node']
+        for document in (second, building):
+            self.assertIs(document['flood']['riskDirection'], first['flood']['riskDirection'])
+            self.assertIs(document['flood']['floodType'], first['flood']['floodType'])
+            self.assertIs(document['wind']['greatestWindRisk'], first['wind']['greatestWindRisk'])
+            self.assertIs(document['wind']['primaryWindDirection'], first['wind']['primaryWindDirection'])
+            insight = document['flood']['insights'][0]
+            self.assertIs(insight['name'], first['flood']['insights'][0]['name'])
+            self.assertIs(insight['details'][0]['name'], first['flood']['insights'][0]['details'][0]['name'])
+        self.assertEqual(second['flood']['insights'][0]['details'][0]['value'], '0.42')
+
+    def test_tolerates_missing_and_non_string_values(self):
+        document = {'flood': {'riskDirection': 1, 'insights': None}, 'fire': {}, 'buildingConnection': None}
+        intern_enumerations(document)
+        self.assertEqual(document['flood'], {'riskDirection': 1, 'insights': None})
+        intern_enumerations({})
+
+    def test_skips_malformed_items(self):
+        insights = [None, 'insight', ['list'], {'name': 'Flood risk', 'details': [None, 7, {'name': 'Depth'}]},
+                    {'name': 'Other', 'details': 'not a list'}]
+        document = {
+            'flood': {'riskDirection': 'STABLE', 'insights': insights},
+            'fire': {'insights': 'not a list'},
+            'buildingConnection': {'edges': [None, 'edge', {'node': ['list']}, {'node': {'wind': {'insights': [1]}}}]},
+        }
+        expected = json.loads(json.dumps(document))
+        intern_enumerations(document)
+        self.assertEqual(document, expected)
+        self.assertIs(document['flood']['insights'][3]['details'][2]['name'], sys.intern('Depth'))
+        intern_enumerations({'buildingConnection': []})
+
+    def test_tolerant_parse_survives_malformed_insights(self):
+        document = make_property(1, 3)
+        document['flood']['insights'] = [None, 'insight', {'name': 'Flood risk', 'details': [None]}]
+        parsed = FirstStreetAPI(tolerant=True).parse_all_risk_data(document)
+        self.assertEqual(parsed['flood']['flood_factor'], 3)
+
+if __name__ == '__main__':
+    unittest.main()
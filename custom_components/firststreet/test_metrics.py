@@ -0,0 +1,98 @@
+import unittest
+from unittest.mock import MagicMock
+import requests
+from firststreet_api import FirstStreetAPI, FirstStreetAPIError
+from metrics import ClientMetrics, MetricsRegistry
+
+class TestMetricsRegistry(unittest.TestCase):
+
+    def test_render_openmetrics(self):
+        registry = MetricsRegistry()
+        counter = registry.counter("demo_events", "Demo events.", ["kind"])
+        histogram = registry.histogram("demo_seconds", "Demo latency.", [0.1, 1.0])
+        counter.inc(kind="a")
+        counter.inc(2, kind="a")
+        histogram.observe(0.05)
+        histogram.observe(0.5)
+        histogram.observe(5)
+
+        text = registry.render()
+        self.assertIn('# TYPE demo_events counter', text)
+        self.assertIn('demo_events_total{kind="a"} 3', text)
+        self.assertIn('demo_seconds_bucket{le="0.1"} 1', text)
+        self.assertIn('demo_seconds_bucket{le="1"} 2', text)
+        self.assertIn('demo_seconds_bucket{le="+Inf"} 3', text)
+        self.assertIn('demo_seconds_count 3', text)
+        self.assertTrue(text.endswith('# EOF\n'))
+
+    def test_callback_sees_families(self):
+        registry = MetricsRegistry()
+        registry.counter("demo_events", "Demo events.").inc()
+        seen = []
+        remove = registry.add_callback(seen.append)
+        registry.collect()
+        remove()
+        registry.collect()
+        self.assertEqual(len(seen), 1)
+        self.assertEqual(seen[0][0].samples[0].value, 1)
+
+class TestClientMetrics(unittest.TestCase):
+
+    def setUp(self):
+        self.metrics = ClientMetrics()
+        self.api = self._api()
+
+    def _api(self, **kwargs):
+        api = FirstStreetAPI(metrics=self.metrics, **kwargs)
+        api.session = MagicMock()
+        for risk_type in ('flood', 'fire', 'heat', 'wind', 'air'):
+            setattr(api, f'parse_{risk_type}_data', MagicMock(return_value={}))
+        return api
+
+    def test_successful_fetch(self):
+        response = MagicMock()
+        response.content = b'x' * 100
+        response.json.return_value = {'data': {'property': {'fsid': 12345, 'flood': {'floodFactor': 5}}}}
+        self.api.session.post.return_value = response
+
+        self.api.get_all_risk_data(12345)
+
+        self.assertEqual(self.metrics.requests.value(outcome="success"), 1)
+        self.assertEqual(self.metrics.request_duration.count(), 1)
+        self.assertEqual(self.metrics.response_bytes.count(), 1)
+        self.assertEqual(self.metrics.decode_duration.count(), 1)
+        self.assertEqual(self.metrics.parse_duration.count(parser="parse_flood_data"), 1)
+
+    def test_document_cache_and_retries(self):
+        api = self._api(persisted_queries=True)
+        miss = MagicMock()
+        miss.json.return_value = {'errors': [{'message': 'PersistedQueryNotFound'}]}
+        hit = MagicMock()
+        hit.json.return_value = {'data': {'property': {'fsid': 12345}}}
+        api.session.post.side_effect = [miss, hit, hit]
+
+        api.get_all_risk_data(12345, risk_types=['flood'])
+        api.get_all_risk_data(12345, risk_types=['flood'])
+
+        self.assertEqual(self.metrics.retries.value(reason="persisted_query_miss"), 1)
+        self.assertEqual(self.metrics.cache.value(cache="document", result="miss"), 1)
+        self.assertEqual(self.metrics.cache.value(cache="document", result="hit"), 1)
+
+    def test_errors_by_class(self):
+        self.api.session.post.side_effect = requests.ConnectionError("refused")
+        with self.assertRaises(FirstStreetAPIError):
+            self.api.get_property_data(12345)
+
+        response = MagicMock()
+        response.json.return_value = {'data': {'property': None}}
+        self.api.session.post.side_effect = None
+        self.api.session.post.return_value = response
+        with self.assertRaises(FirstStreetAPIError):
+            self.api.get_property_data(12345)
+
+        self.assertEqual(self.metrics.requests.value(outcome="error"), 2)
+        self.assertEqual(self.metrics.errors.value(error_class="ConnectionError"), 1)
+        self.assertEqual(self.metrics.errors.value(error_class="FirstStreetPropertyNotFound"), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import json
+import unittest
+from firststreet_api import FirstStreetAPI
+from payload_profile import field_costs, format_report, prune_document, prune_query, record_access
+from property_queries import PROPERTY_BY_FSID_QUERY, WIND_SELECTION
+from test_support import make_property, sample_document
+from validation import validate_property
+
+QUERY = "query Q($fsid:Int64!){property(fsid:$fsid){a b{c d}e{f}list:edges(first:2){node{x y}}}}"
+
+class TestFieldCosts(unittest.TestCase):
+
+    def test_bytes_per_path(self):
+        costs = {cost.path: cost for cost in field_costs({'a': 1, 'b': {'c': 'xy'}})}
+        self.assertEqual(costs['a'].bytes, len('"a":1'))
+        self.assertEqual(costs['b'].bytes, len('"b":{"c":"xy"}'))
+        self.assertEqual(costs['b.c'].bytes, len('"c":"xy"'))
+        self.assertEqual(costs['a'].decode_seconds, 0.0)
+
+    def test_list_items_share_a_path(self):
+        costs = field_costs({'edges': [{'node': {'x': 1}}, {'node': {'x': 22}}]})
+        self.assertEqual([cost.path for cost in costs], ['edges', 'edges.node', 'edges.node.x'])
+        node_x = costs[-1]
+        self.assertEqual((node_x.bytes, node_x.occurrences), (len('"x":1') + len('"x":22'), 2))
+
+    def test_report(self):
+        document = make_property(1, 5)
+        costs = field_costs(document)
+        report = format_report(costs, len(json.dumps(document, separators=(',', ':'))), top=3, max_depth=1)
+        lines = report.splitlines()
+        self.assertEqual(len(lines), 4)
+        self.assertTrue(all('.' not in line.split()[-1] for line in lines[1:]))
+
+class TestPruneQuery(unittest.TestCase):
+
+    def setUp(self):
+        self.document = {'a': 1, 'b': {'c': 2, 'd': 3}, 'e': {'f': 4}, 'list': [{'node': {'x': 5, 'y': 6}}]}
+
+    def test_keeps_only_fields_read(self):
+        accessed = record_access(self.document, lambda data: {'c': data['b']['c'], 'x': data['list'][0]['node']['x']})
+        self.assertEqual(sorted(accessed.paths()), ['b.c', 'list.node.x'])
+        self.assertEqual(prune_document(self.document, accessed), {'b': {'c': 2}, 'list': [{'node': {'x': 5}}]})
+        self.assertEqual(
+            prune_query(QUERY, accessed),
+            "query Q($fsid:Int64!){property(fsid:$fsid){b{c}list:edges(first:2){node{x}}}}",
+        )
+
+    def test_passed_through_objects_are_kept_whole(self):
+        def parse(data):
+            data['b'].get('c')
+            return {'b': data['b'], 'a': data.get('a'), 'missing': data.get('z'), 'e': data['e'].get('f')}
+
+        del self.document['e']['f']
+        accessed = record_access(self.document, parse)
+        self.assertEqual(prune_query(QUERY, accessed), "query Q($fsid:Int64!){property(fsid:$fsid){a b{c d}e{f}}}")
+
+    def test_everything_read_round_trips(self):
+        accessed = record_access(self.document, lambda data: data)
+        self.assertEqual(prune_query(QUERY, accessed), QUERY)
+
+    def test_prune_property_query_to_flood_parser(self):
+        api = FirstStreetAPI()
+        pruned = prune_query(PROPERTY_BY_FSID_QUERY, record_access(make_property(1, 5), api.parse_flood_data))
+        self.assertTrue(pruned.startswith('query PropertyByFSID($fsid:Int64!$buildingId:[Int!]){property(fsid:$fsid){flood{'))
+        for field in ('floodFactor', 'riskDirection', 'insuranceRequirement', 'adaptationConnection{totalCount}'):
+            self.assertIn(field, pruned)
+        for field in ('fire{', 'county{', 'buildingConnection', 'floodType'):
+            self.assertNotIn(field, pruned)
+
+    def test_fields_used_whole_keep_their_selection(self):
+        # Wind historic events include inline fragments
+        accessed = record_access(make_property(1, 5), lambda data: {'wind': data['wind'], 'fsid': data['fsid']})
+        pruned = prune_query(PROPERTY_BY_FSID_QUERY, accessed)
+        self.assertEqual(
+            pruned, f'query PropertyByFSID($fsid:Int64!$buildingId:[Int!]){{property(fsid:$fsid){{{WIND_SELECTION}fsid}}}}'
+        )
+
+class TestSampleDocument(unittest.TestCase):
+
+    def test_follows_the_query_selection(self):
+        document = sample_document(QUERY, list_length=3)
+        self.assertEqual(set(document), {'a', 'b', 'e', 'list'})
+        self.assertEqual(set(document['b']), {'c', 'd'})
+        self.assertEqual(len(document['list']), 3)
+        self.assertEqual(set(document['list'][0]['node']), {'x', 'y'})
+
+    def test_property_query(self):
+        document = sample_document(PROPERTY_BY_FSID_QUERY, seed=1)
+        self.assertEqual(document, sample_document(PROPERTY_BY_FSID_QUERY, seed=1))
+        self.assertEqual(validate_property(document), [])
+        self.assertIsInstance(document['flood']['floodFactor'], int)
+        self.assertIsInstance(document['air']['historic'], dict)
+        self.assertEqual(len(document['geometry']['center']['coordinates']), 2)
+        FirstStreetAPI().parse_all_risk_data(document)
+
+if __name__ == '__main__':
+    unittest.main()
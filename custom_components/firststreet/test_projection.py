@@ -0,0 +1,87 @@
+import importlib.util
+import json
+import unittest
+from unittest.mock import MagicMock
+from firststreet_api import FirstStreetAPI, FirstStreetAPIError
+from projection import ProjectedDecoder, ProjectionDecodeError, WindData
+from test_support import make_property
+
+HAS_MSGSPEC = bool(importlib.util.find_spec("msgspec"))
+
+def with_unused_fields(property_data):
+    document = json.loads(json.dumps(property_data))
+    document['county'] = {'name': 'Cook', 'geometry': {'polygon': {'coordinates': [[[1.5, 2.5]] * 100]}}}
+    document['address'] = {'formattedAddress': '1 Main St'}
+    document['flood']['link'] = 'https://example.com'
+    document['buildingConnection']['edges'][0]['node'].update(stories=2, exclusion={'reason': None})
+    return document
+
+def parse(api, property_data):
+    parsed = api.parse_all_risk_data(property_data)
+    parsed['buildings'] = {
+        building_id: (dict(building), building.details) for building_id, building in parsed['buildings'].items()
+    }
+    return parsed
+
+@unittest.skipUnless(HAS_MSGSPEC, "msgspec is not installed")
+class TestProjectedDecoder(unittest.TestCase):
+
+    def test_drops_unread_fields(self):
+        document = with_unused_fields(make_property(1, 3))
+        raw = json.dumps({'data': {'property': document}}).encode()
+
+        decoded = ProjectedDecoder().decode(raw)['data']['property']
+
+        self.assertNotIn('county', decoded)
+        self.assertNotIn('address', decoded)
+        self.assertNotIn('link', decoded['flood'])
+        wind = document['wind']
+        self.assertEqual(decoded['wind'], {
+            **{key: wind[key] for key in WindData.__annotations__},
+            'historicConnection': {'edges': wind['historicConnection']['edges']},
+        })
+        node = decoded['buildingConnection']['edges'][0]['node']
+        self.assertEqual(node['stories'], 2)
+        self.assertEqual(node['exclusion'], {'reason': None})
+
+    def test_parses_like_whole_documents(self):
+        api = FirstStreetAPI()
+        document = with_unused_fields(make_property(1, 3))
+        decoded = ProjectedDecoder().decode(json.dumps({'data': {'property': document}}).encode())
+        self.assertEqual(parse(api, decoded['data']['property']), parse(api, document))
+
+    def test_keeps_errors_and_null_property(self):
+        document = {'errors': [{'message': 'not found', 'extensions': {'code': 'X'}}], 'data': {'property': None}}
+        self.assertEqual(ProjectedDecoder().decode(json.dumps(document).encode()), document)
+
+    def test_invalid_bodies(self):
+        with self.assertRaises(ProjectionDecodeError):
+            ProjectedDecoder().decode(b'{"data": {"prop')
+        with self.assertRaises(ProjectionDecodeError):
+            ProjectedDecoder().decode(b'{"data": {"property": {"flood": [1]}}}')
+
+@unittest.skipUnless(HAS_MSGSPEC, "msgspec is not installed")
+class TestProjectedClient(unittest.TestCase):
+
+    def setUp(self):
+        self.api = FirstStreetAPI(decoder="msgspec")
+        self.api.session = MagicMock()
+
+    def test_get_property_data(self):
+        document = with_unused_fields(make_property(12345, 5))
+        self.api.session.post.return_value = MagicMock(
+            status_code=200, content=json.dumps({'data': {'property': document}}).encode()
+        )
+
+        data = self.api.get_property_data(12345)
+
+        self.assertEqual(data['flood']['floodFactor'], 5)
+        self.assertNotIn('county', data)
+
+    def test_invalid_body_raises_api_error(self):
+        self.api.session.post.return_value = MagicMock(status_code=200, content=b'{"data": {"prop')
+        with self.assertRaises(FirstStreetAPIError):
+            self.api.get_property_data(12345)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import hashlib
+import unittest
+from property_queries import (
+    PROPERTY_BY_FSID_DOCUMENT,
+    PROPERTY_BY_FSID_QUERY,
+    RISK_DOCUMENTS,
+    RISK_QUERIES,
+    build_exists_query,
+    exists_document,
+    minify_query,
+    sel,
+)
+
+class TestPropertyQueries(unittest.TestCase):
+
+    def test_minify_query(self):
+        query = """
+        query A($a: [Int!] = [1, 2]) {
+          # comment
+          x(s: "a,  b # c") {
+            ... on T { y }
+          }
+          z: w(f: -1.5e3)
+        }
+        """
+        self.assertEqual(minify_query(query), 'query A($a:[Int!]=[1 2]){x(s:"a,  b # c"){...on T{y}}z:w(f:-1.5e3)}')
+
+    def test_composed_queries_are_minified(self):
+        self.assertEqual(minify_query(PROPERTY_BY_FSID_QUERY), PROPERTY_BY_FSID_QUERY)
+        for query in RISK_QUERIES.values():
+            self.assertEqual(minify_query(query), query)
+
+    def test_sel(self):
+        self.assertEqual(sel('a', 'b', 'c', sel('d', 'e'), 'f', sel('...on T', 'g')), 'a{b c d{e}f...on T{g}}')
+
+    def test_documents_are_hashed(self):
+        for document in [PROPERTY_BY_FSID_DOCUMENT, *RISK_DOCUMENTS.values()]:
+            self.assertEqual(document.sha256, hashlib.sha256(document.text.encode('utf-8')).hexdigest())
+
+    def test_exists_query(self):
+        query = build_exists_query(3)
+        self.assertEqual(minify_query(query), query)
+        self.assertIn('p2:property(fsid:$fsid2){fsid buildingConnection(filter:{buildingId:$buildingId2}){totalCount}}', query)
+        self.assertIs(exists_document(3), exists_document(3))
+
+if __name__ == '__main__':
+    unittest.main()
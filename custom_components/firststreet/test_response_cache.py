@@ -0,0 +1,160 @@
+import json
+import unittest
+from unittest.mock import MagicMock
+import requests
+from firststreet_api import FirstStreetAPI, FirstStreetAPIError, FirstStreetPropertyNotFound
+from metrics import ClientMetrics
+from response_cache import NegativeCache, ResponseCache
+
+def make_response(document, status_code=200, headers=None):
+    response = MagicMock(status_code=status_code, headers=headers or {})
+    response.content = json.dumps(document).encode() if document is not None else b''
+    response.json.side_effect = lambda: json.loads(response.content)
+    return response
+
+class TestResponseCache(unittest.TestCase):
+
+    def setUp(self):
+        self.api = FirstStreetAPI(cache_responses=True, metrics=ClientMetrics())
+        self.api.session = MagicMock()
+        self.api.parse_all_risk_data = MagicMock(side_effect=lambda data: {'fsid': data['fsid']})
+        self.document = {'data': {'property': {'fsid': 12345, 'flood': {'floodFactor': 5}}}}
+
+    def test_identical_body_skips_decode_and_parse(self):
+        first, second = make_response(self.document), make_response(self.document)
+        self.api.session.post.side_effect = [first, second]
+
+        parsed = self.api.get_all_risk_data(12345)
+        self.assertIs(self.api.get_all_risk_data(12345), parsed)
+
+        second.json.assert_not_called()
+        self.assertEqual(self.api.parse_all_risk_data.call_count, 1)
+        self.assertEqual(self.api.metrics.cache.value(cache="response", result="unchanged"), 1)
+        self.assertEqual(self.api.metrics.cache.value(cache="parsed", result="hit"), 1)
+
+    def test_conditional_request_not_modified(self):
+        self.api.session.post.side_effect = [
+            make_response(self.document, headers={'ETag': '"v1"', 'Last-Modified': 'Mon, 19 Oct 2026 10:00:00 GMT'}),
+            make_response(None, status_code=304),
+        ]
+        data = self.api.get_property_data(12345)
+        self.assertIs(self.api.get_property_data(12345), data)
+
+        headers = self.api.session.post.call_args_list[1].kwargs['headers']
+        self.assertEqual(headers['If-None-Match'], '"v1"')
+        self.assertEqual(headers['If-Modified-Since'], 'Mon, 19 Oct 2026 10:00:00 GMT')
+        self.assertEqual(self.api.metrics.cache.value(cache="response", result="not_modified"), 1)
+
+    def test_not_modified_without_cached_response_is_sent_again(self):
+        self.api.session.post.side_effect = [make_response(None, status_code=304), make_response(self.document)]
+        self.assertEqual(self.api.get_property_data(12345), self.document['data']['property'])
+        self.assertNotIn('headers', self.api.session.post.call_args_list[0].kwargs)
+        self.assertEqual(self.api.session.post.call_args_list[1].kwargs['headers'], {'Cache-Control': 'no-cache'})
+
+        self.api.response_cache.clear()
+        self.api.session.post.side_effect = [make_response(None, status_code=304)] * 2
+        with self.assertRaises(FirstStreetAPIError) as raised:
+            self.api.get_property_data(12345)
+        self.assertEqual(raised.exception.status_code, 304)
+
+    def test_changed_body_is_decoded_and_parsed(self):
+        changed = {'data': {'property': {'fsid': 12345, 'flood': {'floodFactor': 6}}}}
+        self.api.session.post.side_effect = [make_response(self.document), make_response(changed)]
+
+        self.api.get_all_risk_data(12345)
+        self.api.get_all_risk_data(12345)
+
+        self.assertEqual(self.api.parse_all_risk_data.call_count, 2)
+        self.assertEqual(self.api._documents[(12345, 0)]['flood']['floodFactor'], 6)
+
+    def test_errors_are_not_cached(self):
+        cache = ResponseCache()
+        key = cache.key('https://firststreet.org/api/fsfapi/', b'{}')
+        cache.store(key, make_response(None), b'digest', {'errors': ['boom']})
+        self.assertIsNone(cache.get(key))
+        cache.store(key, make_response(None), b'digest', self.document)
+        self.assertIs(cache.get(key).data, self.document)
+        self.assertNotEqual(key, cache.key('https://firststreet.org/api/fsfapi/', b'{"x":1}'))
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = ResponseCache(maxsize=2)
+        keys = [cache.key('https://firststreet.org/api/fsfapi/', str(fsid).encode()) for fsid in range(3)]
+        cache.store(keys[0], make_response(None), b'digest', self.document)
+        cache.store(keys[1], make_response(None), b'digest', self.document)
+        cache.get(keys[0])
+        cache.store(keys[2], make_response(None), b'digest', self.document)
+        self.assertIsNone(cache.get(keys[1]))
+        self.assertIsNotNone(cache.get(keys[0]))
+        self.assertEqual(len(cache), 2)
+
+class TestNegativeCache(unittest.TestCase):
+
+    def setUp(self):
+        self.now = 1000.0
+        self.cache = NegativeCache(ttl=60, maxsize=2, clock=lambda: self.now)
+
+    def test_entries_expire(self):
+        self.cache.add(1, 0, {'property': None})
+        self.assertEqual(self.cache.get(1, 0).details, {'property': None})
+        self.assertIsNone(self.cache.get(1, None))
+        self.now += 60
+        self.assertIsNone(self.cache.get(1, 0))
+        self.assertEqual(len(self.cache), 0)
+
+    def test_oldest_entry_is_evicted(self):
+        for fsid in (1, 2, 3):
+            self.cache.add(fsid, 0)
+        self.assertIsNone(self.cache.get(1, 0))
+        self.assertIsNotNone(self.cache.get(3, 0))
+
+class TestNegativeCaching(unittest.TestCase):
+
+    def setUp(self):
+        self.negative_cache = NegativeCache()
+        self.api = FirstStreetAPI(metrics=ClientMetrics(), negative_cache=self.negative_cache)
+        self.api.session = MagicMock()
+
+    def test_missing_property_fails_without_a_request(self):
+        self.api.session.post.return_value = make_response({'data': {'property': None}})
+        with self.assertRaises(FirstStreetPropertyNotFound):
+            self.api.get_property_data(404)
+
+        # Another client sharing the cache doesn't ask again either
+        other = FirstStreetAPI(negative_cache=self.negative_cache)
+        other.session = MagicMock()
+        for api in (self.api, other):
+            with self.assertRaises(FirstStreetPropertyNotFound) as raised:
+                api.get_all_risk_data(404)
+            self.assertEqual(raised.exception.details, {'property': None})
+        self.assertEqual(self.api.session.post.call_count, 1)
+        other.session.post.assert_not_called()
+        self.assertEqual(self.api.metrics.cache.value(cache="negative", result="hit"), 1)
+
+        # Other buildings of the same FSID are separate entries
+        self.api.session.post.return_value = make_response({'data': {'property': {'fsid': 404}}})
+        self.assertEqual(self.api.get_property_data(404, building_id=2), {'fsid': 404})
+
+    def test_miss_is_logged_once(self):
+        self.api.session.post.return_value = make_response({'data': {'property': None}})
+        with self.assertLogs(level='ERROR'):
+            with self.assertRaises(FirstStreetPropertyNotFound):
+                self.api.get_property_data(404)
+        with self.assertNoLogs(level='ERROR'):
+            for _ in range(3):
+                with self.assertRaises(FirstStreetPropertyNotFound):
+                    self.api.get_property_data(404)
+            results = self.api.fetch_properties([(404, 0)])
+        self.assertIsInstance(results[0].error, FirstStreetPropertyNotFound)
+
+    def test_other_errors_are_not_cached(self):
+        self.api.session.post.side_effect = requests.ConnectionError("refused")
+        with self.assertRaises(FirstStreetAPIError):
+            self.api.get_property_data(1)
+        self.api.session.post.side_effect = None
+        self.api.session.post.return_value = make_response({'errors': ['rate limited']})
+        with self.assertRaises(FirstStreetAPIError):
+            self.api.get_property_data(1)
+        self.assertEqual(len(self.negative_cache), 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+import asyncio
+import unittest
+from unittest.mock import patch
+from scheduler import RefreshQueue, SetupScheduler, refresh_priority
+
+class TestSetupScheduler(unittest.TestCase):
+    """The scheduler runs on a fixed clock, and its sleeps are recorded rather than waited out."""
+
+    def _run_all(self, scheduler, count, steps=0):
+        sleep = asyncio.sleep
+        sleeps = []
+        started = []
+        running = [0, 0]  # now, most at once
+
+        async def fake_sleep(delay):
+            sleeps.append(delay)
+            await sleep(0)
+
+        async def fetch(index):
+            started.append(index)
+            running[0] += 1
+            running[1] = max(running)
+            for _ in range(steps):
+                await sleep(0)
+            running[0] -= 1
+            return index
+
+        async def main():
+            return await asyncio.gather(
+                *(scheduler.run(lambda index=index: fetch(index)) for index in range(count))
+            )
+
+        with patch('scheduler.asyncio.sleep', fake_sleep):
+            results = asyncio.run(main())
+        return results, sleeps, started, running[1]
+
+    def test_spreads_starts_over_warmup(self):
+        scheduler = SetupScheduler(entries=5, max_concurrent=5, warmup=50.0, clock=lambda: 0.0)
+        results, sleeps, started, _ = self._run_all(scheduler, 5)
+        self.assertEqual(results, list(range(5)))
+        # The first fetch starts at once, the others 10s apart
+        self.assertEqual(sleeps, [10.0, 20.0, 30.0, 40.0])
+        self.assertEqual(sorted(started), list(range(5)))
+
+    def test_caps_concurrent_fetches(self):
+        scheduler = SetupScheduler(entries=8, max_concurrent=2, warmup=0.0, clock=lambda: 0.0)
+        results, sleeps, _, most_at_once = self._run_all(scheduler, 8, steps=3)
+        self.assertEqual(results, list(range(8)))
+        self.assertEqual(sleeps, [])
+        self.assertEqual(most_at_once, 2)
+
+    def test_single_entry_and_late_entries_start_immediately(self):
+        now = [0.0]
+        scheduler = SetupScheduler(entries=1, warmup=60.0, clock=lambda: now[0])
+        self.assertEqual(scheduler._reserve(), 0.0)
+        self.assertEqual(scheduler._reserve(), 0.0)
+
+        scheduler = SetupScheduler(entries=4, warmup=60.0, clock=lambda: now[0])
+        self.assertEqual([scheduler._reserve() for _ in range(4)], [0.0, 15.0, 30.0, 45.0])
+        now[0] = 100.0
+        self.assertEqual(scheduler._reserve(), 0.0)
+
+    def test_rejects_no_concurrency(self):
+        with self.assertRaises(ValueError):
+            SetupScheduler(entries=3, max_concurrent=0)
+
+class FakeCoordinator:
+
+    def __init__(self, name, cost, priority, log):
+        self.name = name
+        self.cost = cost
+        self.priority = priority
+        self.log = log
+
+    def refresh_cost(self, now):
+        return self.cost
+
+    def refresh_priority(self, now):
+        return self.priority
+
+    async def async_refresh_due(self):
+        self.log.append(self.name)
+        await asyncio.sleep(0)
+
+class TestRefreshQueue(unittest.TestCase):
+
+    def _queue(self, budget, items):
+        log = []
+        queue = RefreshQueue(budget)
+        for name, cost, priority in items:
+            queue.add(FakeCoordinator(name, cost, priority, log))
+        return queue, log
+
+    def test_plans_most_urgent_within_budget(self):
+        queue, _ = self._queue(3, [("a", 1, 1.0), ("b", 1, 4.0), ("fresh", 0, 9.0), ("c", 1, 2.0), ("d", 1, 0.5)])
+        self.assertEqual([item.name for item in queue.plan(None)], ["b", "c", "a"])
+
+    def test_no_budget_plans_every_due_refresh(self):
+        queue, _ = self._queue(None, [("a", 1, 1.0), ("b", 5, 4.0), ("fresh", 0, 9.0)])
+        self.assertEqual([item.name for item in queue.plan(None)], ["b", "a"])
+
+    def test_skips_refreshes_past_the_remaining_budget(self):
+        queue, _ = self._queue(4, [("big", 4, 1.0), ("small", 1, 3.0), ("other", 2, 2.0)])
+        self.assertEqual([item.name for item in queue.plan(None)], ["small", "other"])
+        # Alone in a cycle, a refresh over the whole budget still goes ahead
+        queue, _ = self._queue(2, [("big", 4, 1.0)])
+        self.assertEqual([item.name for item in queue.plan(None)], ["big"])
+
+    def test_drain_refreshes_and_removed_items_are_skipped(self):
+        queue, log = self._queue(None, [("a", 1, 1.0), ("b", 1, 2.0)])
+        remove = queue.add(FakeCoordinator("c", 1, 3.0, log))
+        remove()
+        self.assertEqual(asyncio.run(queue.drain(None)), 2)
+        self.assertEqual(sorted(log), ["a", "b"])
+
+    def test_deferred_property_overtakes_important_ones(self):
+        # Low importance, long overdue vs. critical, just due
+        self.assertGreater(refresh_priority(10.0, 0.5, False), refresh_priority(1.0, 4.0, False))
+        self.assertEqual(refresh_priority(1.5, 2.0, True), 6.0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import random
+import unittest
+from spatial import (
+    PropertyIndex, PropertyLocations, build_index, centroid_from_geometry, distance_to_polygon_km, haversine_km,
+)
+
+class TestPropertyIndex(unittest.TestCase):
+
+    def setUp(self):
+        rng = random.Random(42)
+        self.points = {
+            (fsid, 0): (rng.uniform(-88.0, -87.5), rng.uniform(41.6, 42.1))
+            for fsid in range(2000)
+        }
+        self.index = PropertyIndex(self.points)
+
+    def test_within_radius_matches_linear_scan(self):
+        query = (-87.75, 41.85)
+        expected = {key for key, point in self.points.items() if haversine_km(query, point) <= 2.0}
+        result = self.index.within_radius(query[0], query[1], 2.0)
+        self.assertEqual({key for key, _ in result}, expected)
+        distances = [distance for _, distance in result]
+        self.assertEqual(distances, sorted(distances))
+
+    def test_nearest_matches_linear_scan(self):
+        query = (-87.6, 41.9)
+        expected = sorted(self.points, key=lambda key: haversine_km(query, self.points[key]))[:5]
+        result = self.index.nearest(query[0], query[1], count=5)
+        self.assertEqual([key for key, _ in result], expected)
+
+    def test_across_antimeridian(self):
+        index = PropertyIndex({'east': (179.99, 0.0), 'west': (-179.99, 0.0), 'far': (0.0, 0.0)})
+        result = index.within_radius(179.995, 0.0, 5.0)
+        self.assertEqual({key for key, _ in result}, {'east', 'west'})
+
+    def test_within_distance_of_points(self):
+        matches = self.index.within_distance_of([(-87.75, 41.85), (-87.6, 41.9)], 1.0)
+        for key, distance in matches.items():
+            self.assertLessEqual(distance, 1.0 + 1e-9)
+
+    def test_within_distance_of_polygon(self):
+        # A 20 km wide square: its vertices are far from the middle of its edges and its inside
+        square = [(-88.0, 41.8), (-87.76, 41.8), (-87.76, 41.98), (-88.0, 41.98), (-88.0, 41.8)]
+        index = PropertyIndex({
+            'edge': (-87.88, 41.795),  # ~0.56 km south of the middle of the south edge
+            'inside': (-87.88, 41.89),
+            'outside': (-87.88, 41.75),  # ~5.6 km south
+        })
+        matches = index.within_distance_of_polygon(square, 1.0)
+        self.assertEqual(set(matches), {'edge', 'inside'})
+        self.assertAlmostEqual(matches['edge'], haversine_km((-87.88, 41.8), (-87.88, 41.795)), places=2)
+        self.assertEqual(matches['inside'], 0.0)
+        self.assertEqual(index.within_distance_of(square, 1.0), {})
+
+    def test_within_distance_of_polygon_matches_linear_scan(self):
+        ring = [(-87.9, 41.7), (-87.6, 41.75), (-87.7, 42.0)]
+        expected = {key for key, point in self.points.items() if distance_to_polygon_km(point, ring) <= 2.0}
+        self.assertEqual(set(self.index.within_distance_of_polygon(ring, 2.0)), expected)
+        self.assertGreater(len(expected), 100)
+
+    def test_centroid_from_geometry(self):
+        self.assertEqual(centroid_from_geometry({'center': {'coordinates': [-87.6, 41.9], 'type': 'Point'}}), (-87.6, 41.9))
+        bbox = {'bbox': {'coordinates': [[[-88, 41], [-87, 41], [-87, 42], [-88, 42], [-88, 41]]], 'type': 'Polygon'}}
+        self.assertEqual(centroid_from_geometry(bbox), (-87.5, 41.5))
+        self.assertIsNone(centroid_from_geometry(None))
+
+    def test_build_index_skips_missing_centroids(self):
+        self.assertEqual(len(build_index({(1, 0): (-87.6, 41.9), (2, 0): None})), 1)
+
+    def test_locations_rebuild_after_changes(self):
+        locations = PropertyLocations()
+        locations.update((1, 0), (-87.6, 41.9))
+        index = locations.index
+        self.assertIs(locations.index, index)
+        locations.update((1, 0), (-87.6, 41.9))
+        self.assertIs(locations.index, index)
+        locations.update((2, 0), (-87.61, 41.9))
+        self.assertEqual(len(locations.index), 2)
+        locations.update((2, 0), None)
+        locations.discard((1, 0))
+        self.assertEqual(len(locations.index), 0)
+
+if __name__ == '__main__':
+    unittest.main()
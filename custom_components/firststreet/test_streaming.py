@@ -0,0 +1,90 @@
+import importlib.util
+import json
+import unittest
+from unittest.mock import MagicMock
+from firststreet_api import FirstStreetAPI, FirstStreetAPIError
+from response_cache import body_digest
+from streaming import StreamDecodeError, StreamDecoder
+
+HAS_IJSON = bool(importlib.util.find_spec("ijson"))
+
+DOCUMENT = {
+    'data': {'property': {
+        'fsid': 12345,
+        'flood': {'floodFactor': 5, 'insights': [{'name': 'a', 'details': []}]},
+        'county': {'name': 'Cook', 'geometry': {'polygon': {'coordinates': [[[1.5, 2.5]] * 100]}}},
+        'state': {'name': 'IL'},
+        'geometry': {'center': {'coordinates': [-87.6, 41.8]}},
+        'buildingConnection': {'edges': [{'node': {'buildingId': 1, 'stories': 2, 'flood': None}}]},
+    }},
+}
+
+def chunked(document, size=16):
+    raw = json.dumps(document).encode()
+    return [raw[start:start + size] for start in range(0, len(raw), size)]
+
+def make_response(document, status_code=200):
+    response = MagicMock(status_code=status_code, headers={})
+    response.iter_content.side_effect = lambda chunk_size: iter(chunked(document))
+    return response
+
+@unittest.skipUnless(HAS_IJSON, "ijson is not installed")
+class TestStreamDecoder(unittest.TestCase):
+
+    def test_keeps_only_parsed_fields(self):
+        body = StreamDecoder().decode(chunked(DOCUMENT))
+        expected = dict(DOCUMENT['data']['property'])
+        del expected['county'], expected['state']
+        self.assertEqual(body.data, {'data': {'property': expected}})
+        raw = json.dumps(DOCUMENT).encode()
+        self.assertEqual(body.size, len(raw))
+        self.assertEqual(body.body_hash, body_digest(raw))
+
+    def test_keeps_errors_and_null_property(self):
+        document = {'errors': [{'message': 'not found'}], 'data': {'property': None}}
+        self.assertEqual(StreamDecoder().decode(chunked(document)).data, document)
+
+    def test_invalid_and_oversized_bodies(self):
+        with self.assertRaises(StreamDecodeError):
+            StreamDecoder().decode(chunked(DOCUMENT)[:-3])
+        with self.assertRaises(StreamDecodeError):
+            StreamDecoder(max_bytes=64).decode(chunked(DOCUMENT))
+
+@unittest.skipUnless(HAS_IJSON, "ijson is not installed")
+class TestStreamingClient(unittest.TestCase):
+
+    def setUp(self):
+        self.api = FirstStreetAPI(decoder="stream", cache_responses=True)
+        self.api.session = MagicMock()
+
+    def test_get_property_data_streams(self):
+        response = make_response(DOCUMENT)
+        self.api.session.post.return_value = response
+
+        data = self.api.get_property_data(12345)
+
+        self.assertTrue(self.api.session.post.call_args.kwargs['stream'])
+        self.assertEqual(data['flood']['floodFactor'], 5)
+        self.assertNotIn('county', data)
+        response.close.assert_called_once()
+
+    def test_unchanged_body_returns_cached_data(self):
+        self.api.session.post.side_effect = [make_response(DOCUMENT), make_response(DOCUMENT)]
+        first = self.api.get_property_data(12345)
+        self.assertIs(self.api.get_property_data(12345), first)
+
+    def test_invalid_body_raises_api_error(self):
+        response = make_response(DOCUMENT)
+        response.iter_content.side_effect = lambda chunk_size: iter([b'{"data": {"prop'])
+        self.api.session.post.return_value = response
+        with self.assertRaises(FirstStreetAPIError):
+            self.api.get_property_data(12345)
+
+class TestDecoderOption(unittest.TestCase):
+
+    def test_unknown_decoder(self):
+        with self.assertRaises(ValueError):
+            FirstStreetAPI(decoder="yaml")
+
+if __name__ == '__main__':
+    unittest.main()
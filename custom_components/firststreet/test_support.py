@@ -0,0 +1,177 @@
+"""Fixtures shared by the test modules."""
+import copy
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+try:
+    from payload_profile import _parse_query
+    from property_queries import PROPERTY_BY_FSID_QUERY
+except ImportError:
+    # Loaded as `firststreet.test_support` by the benchmarks
+    from .payload_profile import _parse_query
+    from .property_queries import PROPERTY_BY_FSID_QUERY
+
+# Object fields the API returns as lists, by field name (not alias) or as `parent.name`
+LIST_FIELDS = frozenset({
+    "edges", "insights", "details", "alternativeAddresses", "cumulative", "depth", "depthMean",
+    "burn", "speed", "direction", "annualized", "annualLossByYear", "conditional", "temperatureAverageHigh",
+    "cooling", "hotHeatWave", "distribution", "hotDays", "anomalyDays", "coolingDays", "dangerousDays",
+    "healthCautionDays", "outdoorDays", "aqi", "worstCities", "bestCities", "facilitiesCategory", "risks",
+    "nonAttainments", "historic", "historic.days", "historic.data",
+})
+# Exceptions to LIST_FIELDS: `air.historic` is one object
+OBJECT_FIELDS = frozenset({"air.historic"})
+
+_BOOLEAN_FIELDS = frozenset({"insuranceRequirement", "missileEnvironment"})
+_TEXT_FIELDS = frozenset({
+    "name", "description", "disclaimer", "link", "riskfactorLink", "purchaseLink", "logo", "slug", "formattedAddress",
+    "riskDirection", "factorScale", "floodType", "greatestWindRisk", "primaryWindDirection", "riskLevel", "level",
+    "femaZone", "type", "date", "worstDate", "color", "material", "combustibility", "buildingOrientation",
+    "windDesignStandard", "hudWindZone", "policyExclusion", "eventType", "emberZone", "rating", "ssp", "scenario",
+    "classification", "part", "value", "endCursor",
+})
+_INTEGER_SUFFIXES = (
+    "Factor", "Id", "Count", "Days", "days", "year", "Year", "Built", "month", "fsid", "stories", "units", "sqft",
+    "Period", "percentile", "national", "state", "threshold", "bin", "count", "length", "injuries", "fatalities",
+    "Properties", "Nationwide", "triNearby", "defensibleSpace", "RankInCity",
+)
+
+def sample_document(query, root_field="property", list_length=2, seed=0):
+    """
+    Build a response document with exactly the fields a query selects.
+
+    Values are random but typed by field name: factors, ids and counts are
+    ints, `has...`/`is...` flags booleans, enumerations short repeated
+    strings, `coordinates` a point for `center` and a ring otherwise.
+    Fields in `LIST_FIELDS` hold `list_length` items.
+
+    :param query: The GraphQL query, e.g. `PROPERTY_BY_FSID_QUERY`
+    :param root_field: The response key of the top-level field to build
+    :param list_length: Items in every list
+    :param seed: Seed of the random values
+    :return: The object under `data.<root_field>` of a response
+    """
+    _, fields = _parse_query(query)
+    root = next(field for field in fields if field.key == root_field)
+    rng = random.Random(seed)
+    origin = (round(rng.uniform(-120, -75), 6), round(rng.uniform(28, 47), 6))
+    return _sample_object(root.children or [], root_field, rng, list_length, origin)
+
+def _sample_object(fields, parent, rng, list_length, origin):
+    sample = {}
+    for field in fields:
+        if field.key is None:
+            sample.update(_sample_object(field.children or [], parent, rng, list_length, origin))
+            continue
+        name = field.head.split("(", 1)[0].rsplit(":", 1)[-1]
+        if field.children is None:
+            sample[field.key] = _sample_leaf(name, parent, rng, origin)
+        elif (name in LIST_FIELDS or f"{parent}.{name}" in LIST_FIELDS) and f"{parent}.{name}" not in OBJECT_FIELDS:
+            sample[field.key] = [
+                _sample_object(field.children, name, rng, list_length, origin) for _ in range(list_length)
+            ]
+        else:
+            sample[field.key] = _sample_object(field.children, name, rng, list_length, origin)
+    return sample
+
+def _sample_leaf(key, parent, rng, origin):
+    longitude, latitude = origin
+    if key == "coordinates":
+        if parent == "center":
+            return [longitude, latitude]
+        size = rng.uniform(0.0001, 0.01)
+        return [[
+            [longitude - size, latitude - size], [longitude + size, latitude - size],
+            [longitude + size, latitude + size], [longitude - size, latitude + size],
+            [longitude - size, latitude - size],
+        ]]
+    if key == "type" and parent in ("center", "polygon", "bbox"):
+        return "Point" if parent == "center" else "Polygon"
+    if key in _BOOLEAN_FIELDS or key.startswith(("has", "is")):
+        return rng.random() < 0.5
+    if key in _TEXT_FIELDS:
+        return f"{key}-{rng.randrange(3)}"
+    if key.endswith("Factor"):
+        return rng.randint(1, 10)
+    if key.endswith(_INTEGER_SUFFIXES):
+        return rng.randrange(1000)
+    return rng.random() * 100
+
+FACTOR_KEYS = {'flood': 'floodFactor', 'fire': 'fireFactor', 'heat': 'heatFactor', 'wind': 'windFactor', 'air': 'airFactor'}
+
+def make_property(fsid, factor, buildings=(7,)):
+    """A `PROPERTY_BY_FSID_QUERY` result for `fsid`, with every risk factor `factor` and the given building ids."""
+    document = sample_document(PROPERTY_BY_FSID_QUERY, seed=fsid)
+    document['fsid'] = fsid
+    template = document['buildingConnection']['edges'][0]
+    edges = [copy.deepcopy(template) for _ in buildings]
+    for building_id, edge in zip(buildings, edges):
+        edge['node']['buildingId'] = building_id
+    document['buildingConnection'] = {'totalCount': len(buildings), 'edges': edges}
+    document['buildingConnectionTotalCount'] = {'totalCount': len(buildings)}
+    for block in [document] + [edge['node'] for edge in edges]:
+        for risk_type, key in FACTOR_KEYS.items():
+            block[risk_type][key] = factor
+    return document
+
+class StubServer:
+    """
+    A local API answering property queries with `{"fsid": <requested fsid>}` after `latency` seconds.
+
+    Every `outlier_every`-th request takes `outlier_latency` seconds instead.
+    """
+
+    def __init__(self, latency=0.0, outlier_every=None, outlier_latency=0.0):
+        self.latency = latency
+        self.outlier_every = outlier_every
+        self.outlier_latency = outlier_latency
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    @property
+    def url(self):
+        host, port = self.server.server_address
+        return f"http://{host}:{port}/"
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                with stub.lock:
+                    stub.requests += 1
+                    outlier = stub.outlier_every and stub.requests % stub.outlier_every == 0
+                time.sleep(stub.outlier_latency if outlier else stub.latency)
+                fsid = int(request["variables"]["fsid"])
+                body = json.dumps({"data": {"property": {"fsid": fsid}}}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
@@ -0,0 +1,105 @@
+import contextlib
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock
+from firststreet_api import FirstStreetAPI
+from metrics import ClientMetrics
+from tracing import OpenTelemetryTracer, SlowestProfiles, TimingTracer, format_breakdown
+
+class TestTimingTracer(unittest.TestCase):
+
+    def setUp(self):
+        self.tracer = TimingTracer()
+        self.api = FirstStreetAPI(tracer=self.tracer, metrics=ClientMetrics())
+        self.api.session = MagicMock()
+        self.api.session.post.return_value.json.return_value = {'data': {'property': {'fsid': 12345}}}
+        for risk_type in ('flood', 'fire', 'heat', 'wind', 'air'):
+            setattr(self.api, f'parse_{risk_type}_data', MagicMock(return_value={}))
+
+    def test_breakdown_covers_each_phase(self):
+        with self.tracer.capture() as timings:
+            self.api.get_all_risk_data(12345)
+
+        for phase in ('get_all_risk_data', 'get_property_data', 'request', 'decode', 'validate', 'parse.flood', 'parse.buildings'):
+            self.assertIn(f'firststreet.{phase}', timings)
+        self.assertEqual(self.api.metrics.parse_duration.count(parser='parse_air_data'), 1)
+        self.assertTrue(format_breakdown(timings).startswith('get_all_risk_data='))
+
+    def test_no_capture_records_nothing(self):
+        self.api.get_all_risk_data(12345)
+        with self.tracer.capture() as timings:
+            pass
+        self.assertEqual(timings, {})
+
+    def test_forwards_spans_to_inner_tracer(self):
+        spans = []
+
+        @contextlib.contextmanager
+        def start_as_current_span(name, attributes=None):
+            spans.append((name, attributes))
+            yield
+
+        otel = MagicMock()
+        otel.start_as_current_span.side_effect = start_as_current_span
+        self.tracer.inner = OpenTelemetryTracer(otel)
+
+        with self.tracer.capture():
+            self.api.get_all_risk_data(12345, 2)
+
+        self.assertEqual(spans[0], ('firststreet.get_all_risk_data', {'fsid': 12345, 'building_id': 2}))
+        self.assertIn('firststreet.request', [name for name, _ in spans])
+
+class TestSlowestProfiles(unittest.TestCase):
+
+    def test_keeps_only_slowest(self):
+        with tempfile.TemporaryDirectory() as directory:
+            profiles = SlowestProfiles(directory, keep=2)
+            for delay in (0.001, 0.03, 0.02, 0.002):
+                with profiles.profile('refresh'):
+                    time.sleep(delay)
+
+            self.assertEqual(len(profiles.paths), 2)
+            self.assertEqual(sorted(os.listdir(directory)), sorted(os.path.basename(path) for path in profiles.paths))
+            self.assertIn('-1-', os.path.basename(profiles.paths[0]))
+
+    def test_concurrent_blocks_profile_one_at_a_time(self):
+        # Python 3.12+ refuses a second active profiler; the others run unprofiled
+        with tempfile.TemporaryDirectory() as directory:
+            profiles = SlowestProfiles(directory, keep=5)
+            inside = threading.Barrier(4, timeout=5)
+            errors = []
+
+            def refresh(index):
+                try:
+                    with profiles.profile(f'refresh{index}'):
+                        inside.wait()
+                except Exception as err:
+                    errors.append(err)
+
+            threads = [threading.Thread(target=refresh, args=(index,)) for index in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            self.assertEqual(errors, [])
+            self.assertEqual(len(profiles.paths), 1)
+            with profiles.profile('later'):
+                pass
+            self.assertEqual(len(profiles.paths), 2)
+
+    def test_unwritable_directory_does_not_fail_the_block(self):
+        with tempfile.NamedTemporaryFile() as not_a_directory:
+            profiles = SlowestProfiles(os.path.join(not_a_directory.name, 'profiles'))
+            with self.assertLogs(level='WARNING') as logs:
+                with profiles.profile('refresh'):
+                    result = 42
+            self.assertEqual(result, 42)
+            self.assertEqual(profiles.paths, [])
+            self.assertIn('Could not save the profile of refresh', logs.output[0])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import gzip
+import importlib.util
+import json
+import unittest
+from unittest.mock import MagicMock
+from firststreet_api import FirstStreetAPI, FirstStreetAPIError
+from transport import Http2Session, TransportConfig, close_shared_sessions, compress_body, create_session, shared_session
+
+HAS_HTTP2 = bool(importlib.util.find_spec("httpx") and importlib.util.find_spec("h2"))
+
+class TestTransport(unittest.TestCase):
+
+    def tearDown(self):
+        close_shared_sessions()
+
+    def test_equal_configs_share_a_session(self):
+        config = TransportConfig(pool_maxsize=4)
+        self.assertIs(shared_session(config), shared_session(TransportConfig(pool_maxsize=4)))
+        self.assertIsNot(shared_session(config), shared_session(TransportConfig()))
+        self.assertIs(FirstStreetAPI(transport=config).session, FirstStreetAPI(transport=config).session)
+        self.assertIsNot(FirstStreetAPI().session, FirstStreetAPI().session)
+
+    def test_session_pool_and_headers(self):
+        session = create_session(TransportConfig(pool_maxsize=3))
+        adapter = session.get_adapter("https://firststreet.org/")
+        self.assertEqual(adapter._pool_maxsize, 3)
+        self.assertTrue(adapter._pool_block)
+        self.assertIn("gzip", session.headers["Accept-Encoding"])
+        self.assertEqual(session.headers["Content-Type"], "application/json; charset=utf-8")
+
+    def test_compress_body(self):
+        body = json.dumps({"query": "x" * 4096}).encode()
+        self.assertEqual(compress_body(body, TransportConfig()), (body, None))
+        self.assertEqual(compress_body(b"{}", TransportConfig(compress_requests=True)), (b"{}", None))
+
+        compressed, headers = compress_body(body, TransportConfig(compress_requests=True))
+        self.assertEqual(headers, {"Content-Encoding": "gzip"})
+        self.assertEqual(gzip.decompress(compressed), body)
+
+    def test_falls_back_when_compression_is_rejected(self):
+        api = FirstStreetAPI(transport=TransportConfig(compress_requests=True, compress_min_bytes=0))
+        api.session = MagicMock()
+        rejected = MagicMock(status_code=415)
+        accepted = MagicMock(status_code=200)
+        accepted.json.return_value = {'data': {'property': {'fsid': 12345}}}
+        api.session.post.side_effect = [rejected, accepted, accepted]
+
+        self.assertEqual(api.get_property_data(12345), {'fsid': 12345})
+        api.get_property_data(12345)
+
+        first, second, third = api.session.post.call_args_list
+        self.assertEqual(first.kwargs['headers'], {"Content-Encoding": "gzip"})
+        self.assertNotIn('headers', second.kwargs)
+        self.assertNotIn('headers', third.kwargs)
+        self.assertEqual(json.loads(second.kwargs['data'])['variables']['fsid'], '12345')
+
+@unittest.skipUnless(HAS_HTTP2, "httpx[http2] is not installed")
+class TestHttp2Transport(unittest.TestCase):
+
+    def test_session_wraps_httpx_client(self):
+        session = create_session(TransportConfig(http2=True, pool_maxsize=2))
+        self.assertIsInstance(session, Http2Session)
+        self.assertIn("gzip", session.headers["Accept-Encoding"])
+        session.close()
+
+        client = MagicMock()
+        Http2Session(client).post("https://firststreet.org/", data=b"{}", timeout=5)
+        client.post.assert_called_once_with("https://firststreet.org/", content=b"{}", headers=None, timeout=5)
+
+    def test_transport_errors_become_api_errors(self):
+        import httpx
+
+        api = FirstStreetAPI(transport=TransportConfig(http2=True))
+        api.session = MagicMock()
+        api.session.post.side_effect = httpx.ConnectError("refused")
+        with self.assertRaises(FirstStreetAPIError):
+            api.get_property_data(12345)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import json
+import unittest
+from unittest.mock import MagicMock
+from firststreet_api import FirstStreetAPI, FirstStreetAPIError, FirstStreetPropertyNotFound
+from test_support import make_property
+from validation import ANY, ListOf, Nullable, Problem, compile_schema, validate_property, validate_response
+
+def copy_property(fsid=1, factor=3):
+    return json.loads(json.dumps(make_property(fsid, factor)))
+
+class TestCompileSchema(unittest.TestCase):
+
+    def test_reports_every_problem(self):
+        validate = compile_schema({
+            'a': ANY,
+            'b': {'c': ANY},
+            'd': Nullable({'e': ANY}),
+            'f': ListOf({'g': ANY}),
+        })
+        self.assertEqual(validate({'a': None, 'b': {'c': 1}, 'd': None, 'f': [], 'extra': 1}), [])
+        self.assertEqual(validate({'b': None, 'd': {}, 'f': [{'g': 1}, {}, 5]}), [
+            Problem('a', 'missing'),
+            Problem('b', 'null'),
+            Problem('d.e', 'missing'),
+            Problem('f[1].g', 'missing'),
+            Problem('f[2]', 'invalid'),
+        ])
+        self.assertEqual(validate([]), [Problem('', 'invalid')])
+
+    def test_response_envelope(self):
+        self.assertEqual(validate_response({'data': {'property': None}}), [])
+        self.assertEqual(validate_response({}), [Problem('data', 'missing')])
+        self.assertEqual(validate_response({'data': {}}), [Problem('data.property', 'missing')])
+
+    def test_property(self):
+        self.assertEqual(validate_property(make_property(1, 3)), [])
+        document = copy_property()
+        del document['air']
+        document['fire']['prescribedBurns'] = None
+        document['fire']['insuranceHippo'] = None
+        del document['flood']['adaptationConnection']['totalCount']
+        self.assertEqual(validate_property(document), [
+            Problem('air', 'missing'),
+            Problem('flood.adaptationConnection.totalCount', 'missing'),
+            Problem('fire.prescribedBurns', 'null'),
+        ])
+
+class TestParseValidation(unittest.TestCase):
+
+    def setUp(self):
+        self.document = copy_property()
+        self.document['fire']['historicConnection'] = None
+        self.document['air'] = None
+
+    def test_strict_reports_all_problems(self):
+        with self.assertRaises(FirstStreetAPIError) as caught:
+            FirstStreetAPI().parse_all_risk_data(self.document)
+        self.assertEqual(caught.exception.details, [
+            Problem('fire.historicConnection', 'null'),
+            Problem('air', 'null'),
+        ])
+
+    def test_tolerant_returns_partial_results(self):
+        with self.assertLogs(level='WARNING'):
+            parsed = FirstStreetAPI(tolerant=True).parse_all_risk_data(self.document)
+        self.assertIsNone(parsed['fire'])
+        self.assertIsNone(parsed['air'])
+        self.assertEqual(parsed['flood']['flood_factor'], 3)
+        self.assertEqual(parsed['buildings'][7]['flood']['flood_factor'], 3)
+
+    def test_envelope_problems(self):
+        api = FirstStreetAPI()
+        api.session = MagicMock()
+        api.session.post.return_value.json.return_value = {'data': {}}
+        with self.assertRaises(FirstStreetAPIError) as caught:
+            api.get_property_data(1)
+        self.assertEqual(caught.exception.details, [Problem('data.property', 'missing')])
+        api.session.post.return_value.json.return_value = {'data': {'property': None}}
+        with self.assertRaises(FirstStreetPropertyNotFound):
+            api.get_property_data(1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,238 @@
+"""Tracing spans and profiling hooks around the FirstStreet client's hot path."""
+import contextlib
+import heapq
+import itertools
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, ContextManager, Dict, Iterator, List, Optional, Tuple
+
+_LOGGER = logging.getLogger(__name__)
+
+Attributes = Optional[Dict[str, Any]]
+
+SPAN_PREFIX = "firststreet."
+
+
+class Tracer:
+    """
+    Interface for span hooks; the default implementation records nothing.
+
+    `start_span` has the shape of OpenTelemetry's `start_as_current_span`, so an
+    OpenTelemetry tracer can be adapted with `OpenTelemetryTracer`.
+    """
+
+    def start_span(self, name: str, attributes: Attributes = None) -> ContextManager[Any]:
+        return contextlib.nullcontext()
+
+
+class OpenTelemetryTracer(Tracer):
+    """Forward spans to OpenTelemetry (requires `opentelemetry-api`)."""
+
+    def __init__(self, tracer: Any = None):
+        """
+        :param tracer: An OpenTelemetry tracer (default is the global provider's
+            tracer for this integration)
+        :raises ImportError: If OpenTelemetry is not installed
+        """
+        if tracer is None:
+            from opentelemetry import trace
+
+            tracer = trace.get_tracer("custom_components.firststreet")
+        self._tracer = tracer
+
+    def start_span(self, name: str, attributes: Attributes = None) -> ContextManager[Any]:
+        return self._tracer.start_as_current_span(name, attributes=attributes)
+
+
+class TimingTracer(Tracer):
+    """
+    Sum the wall time spent in each span name while a `capture()` is active.
+
+    Captures are per thread, so refreshes running concurrently in the executor
+    each get their own breakdown. Spans are also forwarded to `inner`.
+    """
+
+    def __init__(self, inner: Optional[Tracer] = None):
+        self.inner = inner
+        self._local = threading.local()
+
+    def start_span(self, name: str, attributes: Attributes = None) -> ContextManager[Any]:
+        timings = getattr(self._local, "timings", None)
+        if timings is None:
+            return self.inner.start_span(name, attributes) if self.inner else contextlib.nullcontext()
+        return _TimedSpan(timings, name, self.inner.start_span(name, attributes) if self.inner else None)
+
+    @contextlib.contextmanager
+    def capture(self) -> Iterator[Dict[str, float]]:
+        """Collect `{span name: seconds}` for the spans closed inside the block."""
+        previous = getattr(self._local, "timings", None)
+        timings: Dict[str, float] = {}
+        self._local.timings = timings
+        try:
+            yield timings
+        finally:
+            self._local.timings = previous
+
+
+class _TimedSpan:
+    __slots__ = ("_timings", "_name", "_inner", "_start")
+
+    def __init__(self, timings: Dict[str, float], name: str, inner: Optional[ContextManager[Any]]):
+        self._timings = timings
+        self._name = name
+        self._inner = inner
+
+    def __enter__(self) -> Any:
+        span = self._inner.__enter__() if self._inner is not None else None
+        self._start = time.perf_counter()
+        return span
+
+    def __exit__(self, *exc_info) -> Optional[bool]:
+        elapsed = time.perf_counter() - self._start
+        self._timings[self._name] = self._timings.get(self._name, 0.0) + elapsed
+        if self._inner is not None:
+            return self._inner.__exit__(*exc_info)
+        return None
+
+
+class _Phase:
+    """A span and a metrics timer entered and exited together."""
+
+    __slots__ = ("_span", "_timer")
+
+    def __init__(self, span: ContextManager[Any], timer: ContextManager[Any]):
+        self._span = span
+        self._timer = timer
+
+    def __enter__(self) -> None:
+        self._span.__enter__()
+        self._timer.__enter__()
+
+    def __exit__(self, *exc_info) -> Optional[bool]:
+        self._timer.__exit__(*exc_info)
+        return self._span.__exit__(*exc_info)
+
+
+def phase(span: Optional[ContextManager[Any]], timer: Optional[ContextManager[Any]]) -> ContextManager[Any]:
+    """Combine an optional span and an optional timer into one context manager."""
+    if span is None:
+        return timer if timer is not None else _NO_PHASE
+    if timer is None:
+        return span
+    return _Phase(span, timer)
+
+
+_NO_PHASE = contextlib.nullcontext()
+
+
+def format_breakdown(timings: Dict[str, float]) -> str:
+    """Render a timing breakdown, slowest phase first, e.g. `request=1.204s decode=0.031s`."""
+    ordered = sorted(timings.items(), key=lambda item: item[1], reverse=True)
+    return " ".join(f"{name.rpartition(SPAN_PREFIX)[2]}={seconds:.3f}s" for name, seconds in ordered)
+
+
+class SlowestProfiles:
+    """
+    Profile calls and keep the dumps of only the slowest `keep` of them.
+
+    cProfile dumps (`.prof`, readable with `pstats` or snakeviz) are written by
+    default; `profiler="pyinstrument"` writes pyinstrument HTML reports instead.
+
+    Only one block is profiled at a time: since Python 3.12 a second profiler
+    in the process fails to start. Blocks entered while another is being
+    profiled (refreshes run in parallel) run unprofiled instead.
+    """
+
+    def __init__(self, directory: str, keep: int = 5, profiler: str = "cprofile"):
+        if profiler not in ("cprofile", "pyinstrument"):
+            raise ValueError(f"Unknown profiler: {profiler}")
+        self.directory = directory
+        self.keep = keep
+        self.profiler = profiler
+        self._kept: List[Tuple[float, int, str]] = []
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+        self._active = threading.Lock()
+
+    @property
+    def paths(self) -> List[str]:
+        """Paths of the kept profiles, slowest first."""
+        with self._lock:
+            return [path for _, _, path in sorted(self._kept, reverse=True)]
+
+    @contextlib.contextmanager
+    def profile(self, label: str) -> Iterator[None]:
+        """Profile the block and keep its dump if it is among the slowest so far."""
+        if not self._active.acquire(blocking=False):
+            _LOGGER.debug("Another block is being profiled; not profiling %s", label)
+            yield
+            return
+        try:
+            profiler, stop_profiler = self._start()
+        except (ValueError, RuntimeError) as err:
+            # Another profiling tool (e.g. Home Assistant's profiler) is running
+            self._active.release()
+            _LOGGER.debug("Could not profile %s: %s", label, err)
+            yield
+            return
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            stop_profiler()
+            try:
+                self._keep(profiler, label, time.perf_counter() - start)
+            finally:
+                self._active.release()
+
+    def _start(self) -> Tuple[Any, Callable[[], Any]]:
+        """Create and start a profiler, returning it and the function stopping it."""
+        if self.profiler == "pyinstrument":
+            from pyinstrument import Profiler
+
+            profiler = Profiler()
+            profiler.start()
+            return profiler, profiler.stop
+        import cProfile
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+        return profiler, profiler.disable
+
+    def _keep(self, profiler: Any, label: str, duration: float) -> None:
+        # The dump is written, the heap updated and the evicted dump deleted
+        # together, so no file is deleted while it is still being written
+        with self._lock:
+            if len(self._kept) >= self.keep and duration <= self._kept[0][0]:
+                return
+            extension = "html" if self.profiler == "pyinstrument" else "prof"
+            sequence = next(self._counter)
+            path = os.path.join(self.directory, f"{label}-{sequence}-{int(duration * 1000)}ms.{extension}")
+            try:
+                os.makedirs(self.directory, exist_ok=True)
+                if self.profiler == "pyinstrument":
+                    with open(path, "w", encoding="utf-8") as report:
+                        report.write(profiler.output_html())
+                else:
+                    profiler.dump_stats(path)
+            except OSError as err:
+                # A full disk or read-only directory must not fail the profiled refresh
+                _LOGGER.warning("Could not save the profile of %s to %s: %s", label, path, err)
+                with contextlib.suppress(OSError):
+                    os.remove(path)
+                return
+            entry = (duration, sequence, path)
+            if len(self._kept) >= self.keep:
+                evicted = heapq.heappushpop(self._kept, entry)
+                try:
+                    os.remove(evicted[2])
+                except FileNotFoundError:
+                    pass
+                except OSError as err:
+                    _LOGGER.warning("Could not delete the profile %s: %s", evicted[2], err)
+            else:
+                heapq.heappush(self._kept, entry)
+        _LOGGER.debug("Saved profile of %s (%.3fs) to %s", label, duration, path)
@@ -0,0 +1,164 @@
+"""HTTP session setup for the FirstStreet client: pooling, keep-alive and compression."""
+import gzip
+import importlib.util
+import threading
+from typing import Any, Dict, NamedTuple, Optional, Tuple, Type
+
+JSON_CONTENT_TYPE = "application/json; charset=utf-8"
+
+
+class TransportConfig(NamedTuple):
+    """
+    How `FirstStreetAPI` talks HTTP.
+
+    Clients constructed with equal configs share one session, so all config
+    entries reuse the same kept-alive connections.
+    """
+
+    # Number of hosts to keep pools for, and connections kept per host
+    pool_connections: int = 4
+    pool_maxsize: int = 16
+    # Wait for a free connection instead of opening one past pool_maxsize
+    pool_block: bool = True
+    # Seconds to wait for the server to connect / send a response
+    timeout: float = 30.0
+    # Gzip request bodies of at least compress_min_bytes (full query text)
+    compress_requests: bool = False
+    compress_min_bytes: int = 2048
+    compress_level: int = 6
+    # Multiplex requests over HTTP/2 with httpx (needs `httpx[http2]`); pool
+    # sizes then bound connections, each carrying many concurrent streams
+    http2: bool = False
+    # Speak HTTP/2 without ALPN negotiation, e.g. to a cleartext h2c server
+    http2_prior_knowledge: bool = False
+
+
+def accept_encoding() -> str:
+    """Return the response encodings urllib3 and httpx can decode in this environment."""
+    encodings = ["gzip", "deflate"]
+    if importlib.util.find_spec("brotli") or importlib.util.find_spec("brotlicffi"):
+        encodings.append("br")
+    return ", ".join(encodings)
+
+
+class Http2Session:
+    """The subset of the `requests.Session` interface the client uses, over httpx."""
+
+    def __init__(self, client: Any):
+        self.client = client
+        self.headers = client.headers
+
+    def post(
+        self,
+        url: str,
+        data: bytes = b"",
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None,
+        stream: bool = False,
+    ) -> Any:
+        if stream:
+            request = self.client.build_request("POST", url, content=data, headers=headers, timeout=timeout)
+            return self.client.send(request, stream=True)
+        return self.client.post(url, content=data, headers=headers, timeout=timeout)
+
+    def close(self) -> None:
+        self.client.close()
+
+
+def _create_http2_session(config: TransportConfig) -> Http2Session:
+    try:
+        import httpx
+        import h2  # noqa: F401
+    except ImportError as err:
+        raise ImportError(
+            "The HTTP/2 transport needs httpx with HTTP/2 support: pip install 'httpx[http2]'"
+        ) from err
+
+    client = httpx.Client(
+        http1=not config.http2_prior_knowledge,
+        http2=True,
+        limits=httpx.Limits(
+            max_connections=config.pool_maxsize,
+            max_keepalive_connections=config.pool_maxsize,
+        ),
+        timeout=config.timeout,
+        headers={
+            "Content-Type": JSON_CONTENT_TYPE,
+            "Accept-Encoding": accept_encoding(),
+        },
+    )
+    return Http2Session(client)
+
+
+def transport_errors(config: TransportConfig) -> Tuple[Type[BaseException], ...]:
+    """Return the exceptions the transport for `config` raises for failed requests."""
+    if config.http2:
+        import httpx
+
+        return (httpx.HTTPError, httpx.InvalidURL)
+    import requests
+
+    return (requests.RequestException,)
+
+
+def response_status(error: BaseException) -> Optional[int]:
+    """Return the HTTP status of the response a transport error was raised for, if any."""
+    # requests.HTTPError and httpx.HTTPStatusError both carry the response
+    response = getattr(error, "response", None)
+    return getattr(response, "status_code", None)
+
+
+def create_session(config: TransportConfig) -> Any:
+    """Create a session with a size-bounded pool for `config`."""
+    if config.http2:
+        return _create_http2_session(config)
+
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=config.pool_connections,
+        pool_maxsize=config.pool_maxsize,
+        pool_block=config.pool_block,
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({
+        "Content-Type": JSON_CONTENT_TYPE,
+        "Accept-Encoding": accept_encoding(),
+    })
+    return session
+
+
+_shared_sessions: Dict[TransportConfig, Any] = {}
+_shared_lock = threading.Lock()
+
+
+def shared_session(config: TransportConfig) -> Any:
+    """Return the process-wide session for `config`, creating it on first use."""
+    with _shared_lock:
+        session = _shared_sessions.get(config)
+        if session is None:
+            session = _shared_sessions[config] = create_session(config)
+        return session
+
+
+def close_shared_sessions() -> None:
+    """Close every shared session, e.g. when the last config entry unloads."""
+    with _shared_lock:
+        sessions = list(_shared_sessions.values())
+        _shared_sessions.clear()
+    for session in sessions:
+        session.close()
+
+
+def compress_body(body: bytes, config: TransportConfig) -> Tuple[bytes, Optional[Dict[str, str]]]:
+    """
+    Gzip a request body if the config asks for it and the body is large enough.
+
+    :return: The body to send and the extra headers it needs (None if unchanged)
+    """
+    if not config.compress_requests or len(body) < config.compress_min_bytes:
+        return body, None
+    return gzip.compress(body, config.compress_level, mtime=0), {"Content-Encoding": "gzip"}
@@ -0,0 +1,208 @@
+"""Check API responses against the shape the parsers read, reporting every problem in one pass."""
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+# A field that must be present, with any value (null included)
+ANY = object()
+_MISSING = object()
+
+
+class Nullable(NamedTuple):
+    """An object field that may also be null."""
+
+    schema: Dict[str, Any]
+
+
+class ListOf(NamedTuple):
+    """A list field whose items all match `item`."""
+
+    item: Any
+
+
+class Problem(NamedTuple):
+    """A field of a response that does not match the schema."""
+
+    path: str  # e.g. "fire.historicConnection.edges[2].node"
+    kind: str  # "missing", "null" or "invalid" (not an object or list)
+
+    def __str__(self) -> str:
+        return f"{self.path} ({self.kind})"
+
+
+Check = Callable[[Any], bool]
+Report = Callable[[Any, str, List[Problem]], None]
+
+_CONNECTION = {'edges': ListOf({'node': ANY})}
+_TOTAL_COUNT = {'totalCount': ANY}
+
+# What `parse_<risk>_data` reads from each risk block
+RISK_SCHEMAS = {
+    'flood': {
+        'floodFactor': ANY, 'riskDirection': ANY, 'insuranceRequirement': ANY,
+        'adaptationConnection': _TOTAL_COUNT, 'probability': ANY, 'historic': ANY, 'insights': ANY,
+    },
+    'fire': {
+        'fireFactor': ANY, 'riskDirection': ANY, 'defensibleSpace': ANY, 'usfsRelativeRisk': ANY,
+        'prescribedBurns': _TOTAL_COUNT, 'probability': ANY, 'historicConnection': _CONNECTION,
+        'insuranceHippo': Nullable({'rates': ANY}), 'insights': ANY,
+    },
+    'heat': {
+        'heatFactor': ANY, 'hotTemperature': ANY, 'anomalyTemperature': ANY, 'temperatureAverageHigh': ANY,
+        'cooling': ANY, 'heatWaves': ANY, 'days': ANY, 'insights': ANY,
+    },
+    'wind': {
+        'windFactor': ANY, 'factorScale': ANY, 'riskDirection': ANY, 'hasTornadoRisk': ANY,
+        'hasThunderstormRisk': ANY, 'hasCycloneRisk': ANY, 'greatestWindRisk': ANY, 'missileEnvironment': ANY,
+        'primaryWindDirection': ANY, 'probability': ANY, 'historicConnection': _CONNECTION,
+    },
+    'air': {
+        'airFactor': ANY, 'factorScale': ANY, 'riskDirection': ANY, 'days': ANY, 'greatestRisk': ANY,
+        'triNearby': ANY, 'triFacilityConnection': _CONNECTION, 'historic': ANY, 'insights': ANY,
+        'percentile': ANY,
+    },
+}
+
+# What `parse_all_risk_data` reads from a property document; buildings are parsed tolerantly
+PROPERTY_SCHEMA = dict(RISK_SCHEMAS)
+
+# The envelope `get_property_data` unwraps; a null property means "not found"
+RESPONSE_SCHEMA = {'data': {'property': Nullable({})}}
+
+
+def _generate(schema: Any, value: str, depth: int, lines: List[str]) -> None:
+    """Append the statements returning False unless `value` matches `schema` (not null)."""
+    indent = "    " * (depth + 1)
+    if isinstance(schema, ListOf):
+        item = f"i{len(lines)}"
+        lines.append(f"{indent}if type({value}) is not list: return False")
+        if schema.item is not ANY:
+            lines.append(f"{indent}for {item} in {value}:")
+            _generate(schema.item, item, depth + 1, lines)
+        return
+    # Inline `in` tests beat a `keys() >= frozenset` comparison, which iterates generically
+    missing = "".join(f" or {key!r} not in {value}" for key in schema)
+    lines.append(f"{indent}if type({value}) is not dict{missing}: return False")
+    for key, child in schema.items():
+        nullable = isinstance(child, Nullable)
+        if nullable:
+            child = child.schema
+        if child is ANY:
+            continue
+        child_value = f"v{len(lines)}"  # unique: nested values stay live while siblings are checked
+        lines.append(f"{indent}{child_value} = {value}[{key!r}]")
+        if nullable:
+            lines.append(f"{indent}if {child_value} is not None:")
+            _generate(child, child_value, depth + 1, lines)
+        else:
+            lines.append(f"{indent}if {child_value} is None: return False")
+            _generate(child, child_value, depth, lines)
+
+
+def _compile_check(schema: Any) -> Check:
+    """
+    Generate one function checking a whole document against a schema.
+
+    Valid documents are the common case, so the check is a single flat
+    function: no calls per field and no paths, just type tests, `in`
+    tests and lookups. Rejected documents go through `_compile_report`.
+    """
+    lines = ["def check(v0):"]
+    if schema is not ANY:
+        _generate(schema, "v0", 0, lines)
+    lines.append("    return True")
+    namespace: Dict[str, Any] = {}
+    exec(compile("\n".join(lines), "<validation>", "exec"), namespace)
+    return namespace["check"]
+
+
+def _compile_report(schema: Any) -> Optional[Report]:
+    """Turn a schema into a function appending every problem with a value, or None if any value matches."""
+    if schema is ANY:
+        return None
+    if isinstance(schema, ListOf):
+        return _compile_list(schema.item)
+    return _compile_object(schema)
+
+
+def _compile_list(item_schema: Any) -> Report:
+    report_item = _compile_report(item_schema)
+
+    def report(value: Any, path: str, problems: List[Problem]) -> None:
+        if type(value) is not list:
+            problems.append(Problem(path, "invalid"))
+        elif report_item is not None:
+            for index, entry in enumerate(value):
+                report_item(entry, f"{path}[{index}]", problems)
+
+    return report
+
+
+def _compile_object(schema: Dict[str, Any]) -> Report:
+    children: List[Tuple[str, Report, bool]] = []
+    for key, child in schema.items():
+        nullable = isinstance(child, Nullable)
+        if nullable:
+            child = child.schema
+        child_report = _compile_report(child)
+        if child_report is not None:
+            children.append((key, child_report, nullable))
+
+    def report(value: Any, path: str, problems: List[Problem]) -> None:
+        if not isinstance(value, dict):
+            problems.append(Problem(path, "invalid"))
+            return
+        prefix = f"{path}." if path else ""
+        problems.extend(Problem(prefix + key, "missing") for key in schema if key not in value)
+        for key, child_report, nullable in children:
+            child_value = value.get(key, _MISSING)
+            if child_value is _MISSING:
+                continue
+            if child_value is None:
+                if not nullable:
+                    problems.append(Problem(prefix + key, "null"))
+            else:
+                child_report(child_value, prefix + key, problems)
+
+    return report
+
+
+def compile_schema(schema: Any) -> Callable[[Any], List[Problem]]:
+    """
+    Compile a schema into a validator.
+
+    A schema is a dict of field name to `ANY`, a nested schema, `Nullable`
+    or `ListOf`. Nested schemas and lists must be present and not null;
+    fields the schema does not name are ignored. A valid document is
+    checked in a single pass by generated code; only an invalid one is
+    walked again to collect every problem.
+
+    :param schema: The schema, e.g. `PROPERTY_SCHEMA`
+    :return: A function returning every problem with a document (empty if it matches)
+    """
+    check = _compile_check(schema)
+    report = _compile_report(schema)
+
+    def validate(document: Any) -> List[Problem]:
+        problems: List[Problem] = []
+        if report is not None and not check(document):
+            report(document, "", problems)
+        return problems
+
+    return validate
+
+
+validate_response = compile_schema(RESPONSE_SCHEMA)
+validate_property = compile_schema(PROPERTY_SCHEMA)
+
+
+def invalid_risk_types(problems: List[Problem]) -> Dict[str, List[Problem]]:
+    """Group `validate_property` problems by the risk type they affect."""
+    grouped: Dict[str, List[Problem]] = {}
+    for problem in problems:
+        risk_type = problem.path.split('.', 1)[0]
+        grouped.setdefault(risk_type, []).append(problem)
+    return grouped
+
+
+def describe(problems: List[Problem]) -> str:
+    """List problems for an error message."""
+    return ", ".join(str(problem) for problem in problems)